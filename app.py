@@ -1,4 +1,4 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, jsonify
+from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, Response, send_file, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_migrate import Migrate
 import os
@@ -10,9 +10,12 @@ pymysql.install_as_MySQLdb()
 from models import db, User, Project, TaskTemplate, PromotorTask, DailyUpdate, Product, Quote, QuoteItem, Supplier, GlassType, SupplierPricing, Reminder
 from config import config
 from forms import (LoginForm, UserForm, ProjectForm, TaskTemplateForm, 
-                   TaskAssignmentForm, TaskUpdateForm, DailyUpdateForm, ProductForm)
+                   TaskAssignmentForm, BulkTaskAssignmentForm, TaskUpdateForm, DailyUpdateForm, ProductForm)
 from utils.auth import admin_required, manager_or_admin_required
-from utils.task_rollover import rollover_incomplete_tasks, get_current_week_info, get_week_date_range
+from utils.task_rollover import rollover_incomplete_tasks, get_current_week_info
+from utils.iso_weeks import current_week, get_week, shift, week_of
+from utils.task_board import BOARD_COLUMNS, get_weekly_board
+from utils.dashboard_stats import get_project_stats, get_task_stats
 from utils.s3_upload import S3Uploader
 from datetime import datetime, timedelta
 from sqlalchemy import text
@@ -101,62 +104,24 @@ def logout():
 @login_required
 def dashboard():
     """Main dashboard"""
-    # Get statistics
-    total_projects = Project.query.count()
-    active_projects = Project.query.filter_by(status='In Progress').count()
-    completed_projects = Project.query.filter_by(status='Completed').count()
+    # Get statistics (cached for a few seconds; see utils/dashboard_stats.py)
+    project_stats = get_project_stats()
     
     # Get current week info
     week_info = get_current_week_info()
+    week = get_week(week_info['year'], week_info['week'])
     
     # Get tasks for current user
     if current_user.is_admin() or current_user.is_manager_or_admin():
         # Admins and managers see all tasks
-        total_tasks = PromotorTask.query.filter_by(
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year']
-        ).count()
-        pending_tasks = PromotorTask.query.filter_by(
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year'],
-            status='Pending'
-        ).count()
-        overdue_tasks = PromotorTask.query.filter_by(
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year'],
-            status='Overdue'
-        ).count()
+        task_stats = get_task_stats(week)
     else:
         # Users see only their tasks
-        total_tasks = PromotorTask.query.filter_by(
-            promotor_id=current_user.id,
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year']
-        ).count()
-        pending_tasks = PromotorTask.query.filter_by(
-            promotor_id=current_user.id,
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year'],
-            status='Pending'
-        ).count()
-        overdue_tasks = PromotorTask.query.filter_by(
-            promotor_id=current_user.id,
-            assigned_week=week_info['week'],
-            assigned_year=week_info['year'],
-            status='Overdue'
-        ).count()
-    
-    # Get recent projects
-    recent_projects = Project.query.order_by(Project.updated_at.desc()).limit(5).all()
+        task_stats = get_task_stats(week, promotor_id=current_user.id)
     
     return render_template('dashboard.html',
-                         total_projects=total_projects,
-                         active_projects=active_projects,
-                         completed_projects=completed_projects,
-                         total_tasks=total_tasks,
-                         pending_tasks=pending_tasks,
-                         overdue_tasks=overdue_tasks,
-                         recent_projects=recent_projects,
+                         **project_stats,
+                         **task_stats,
                          week_info=week_info)
 
 
@@ -167,25 +132,28 @@ def dashboard():
 @app.route('/projects')
 @login_required
 def projects_list():
-    """List all projects"""
+    """Projects, newest first, a page at a time"""
+    from utils.lookups import active_users
+    from utils.projects_list import get_projects_page
+    
     # Get filter parameters
     status_filter = request.args.get('status', '')
     owner_filter = request.args.get('owner', '')
+    cursor = request.args.get('cursor')
     
-    # Build query
-    query = Project.query
-    
-    if status_filter:
-        query = query.filter_by(status=status_filter)
-    if owner_filter:
-        query = query.filter_by(owner_id=int(owner_filter))
-    
-    projects = query.order_by(Project.created_at.desc()).all()
-    
-    # Get all users for filter dropdown
-    users = User.query.filter_by(is_active=True).all()
+    page = get_projects_page(
+        status=status_filter or None,
+        owner_id=int(owner_filter) if owner_filter.isdigit() else None,
+        cursor=cursor
+    )
     
-    return render_template('projects/list.html', projects=projects, users=users)
+    return render_template('projects/list.html',
+                         projects=page['projects'],
+                         next_cursor=page['next_cursor'],
+                         paged=bool(cursor),
+                         users=active_users(),
+                         selected_status=status_filter,
+                         selected_owner=owner_filter)
 
 
 @app.route('/projects/new', methods=['GET', 'POST'])
@@ -339,45 +307,32 @@ def tasks_weekly():
     week = request.args.get('week', type=int)
     year = request.args.get('year', type=int)
     
-    if not week or not year:
-        week_info = get_current_week_info()
-        week = week_info['week']
-        year = week_info['year']
+    try:
+        iso_week = get_week(year, week) if week and year else current_week()
+    except ValueError:
+        # No such ISO week (e.g. week 53 of a 52-week year)
+        iso_week = current_week()
+    week, year = iso_week.week, iso_week.year
     
     # Get date range for the week
-    date_range = get_week_date_range(week, year)
+    date_range = {'start': iso_week.start, 'end': iso_week.end}
     
-    # Get tasks for the week
+    # Get tasks for the week, grouped by status: one query
     if current_user.is_admin() or current_user.is_manager_or_admin():
         # Admins and managers see all tasks
-        tasks = PromotorTask.query.filter_by(
-            assigned_week=week,
-            assigned_year=year
-        ).order_by(PromotorTask.status, PromotorTask.priority).all()
+        tasks_by_status = get_weekly_board(iso_week)
     else:
         # Users see only their tasks
-        tasks = PromotorTask.query.filter_by(
-            promotor_id=current_user.id,
-            assigned_week=week,
-            assigned_year=year
-        ).order_by(PromotorTask.status, PromotorTask.priority).all()
-    
-    # Group tasks by status
-    tasks_by_status = {
-        'Pending': [],
-        'In Progress': [],
-        'Completed': [],
-        'Overdue': []
-    }
-    
-    for task in tasks:
-        tasks_by_status[task.status].append(task)
+        tasks_by_status = get_weekly_board(iso_week, promotor_id=current_user.id)
     
     return render_template('tasks/weekly_board.html',
                          tasks_by_status=tasks_by_status,
+                         board_columns=BOARD_COLUMNS,
                          week=week,
                          year=year,
-                         date_range=date_range)
+                         date_range=date_range,
+                         previous_week=shift(iso_week, -1),
+                         next_week=shift(iso_week, 1))
 
 
 @app.route('/tasks/assign', methods=['GET', 'POST'])
@@ -426,6 +381,77 @@ def task_assign():
     return render_template('tasks/assign.html', form=form)
 
 
+@app.route('/tasks/assign/bulk', methods=['GET', 'POST'])
+@manager_or_admin_required
+def task_assign_bulk():
+    """Assign task templates to many users over several weeks at once"""
+    from utils.task_assignment import BulkAssignmentError, assign_tasks
+    
+    form = BulkTaskAssignmentForm()
+    
+    # Populate dropdowns
+    form.template_ids.choices = [(t.id, t.name) for t in TaskTemplate.query.filter_by(is_active=True).order_by(TaskTemplate.name).all()]
+    form.promotor_ids.choices = [(u.id, f"{u.username} ({u.role})") for u in User.query.filter_by(is_active=True).order_by(User.username).all()]
+    form.project_id.choices = [(0, '-- None --')] + [(p.id, p.name) for p in Project.query.filter(Project.status.in_(['Not Started', 'In Progress'])).all()]
+    
+    if request.method == 'GET' and not form.first_week.data:
+        form.first_week.data = current_week().start
+    
+    if form.validate_on_submit():
+        try:
+            first = week_of(form.first_week.data)
+            result = assign_tasks(
+                form.template_ids.data,
+                form.promotor_ids.data,
+                [shift(first, i) for i in range(form.week_count.data)],
+                created_by=current_user.id,
+                project_id=form.project_id.data or None,
+                priority=form.priority.data,
+                task_name=form.task_name.data,
+                comments=form.comments.data,
+                due_weekday=form.due_weekday.data
+            )
+        except (BulkAssignmentError, ValueError) as e:
+            flash(str(e), 'danger')
+        else:
+            flash(f"Assigned {result['created']} tasks over {len(result['weeks'])} week(s)"
+                  + (f"; skipped {result['skipped_duplicates']} already assigned" if result['skipped_duplicates'] else '')
+                  + '.', 'success')
+            return redirect(url_for('tasks_weekly', week=first.week, year=first.year))
+    
+    return render_template('tasks/bulk_assign.html', form=form)
+
+
+@app.route('/api/tasks/bulk-assign', methods=['POST'])
+@manager_or_admin_required
+def api_task_assign_bulk():
+    """API endpoint to assign templates x users x weeks in one request
+    
+    JSON body: template_ids, promotor_ids, weeks ("2026-W43" or
+    {"year", "week"}), and optionally project_id, priority, task_name,
+    comments and due_weekday (0 = Monday ... 6 = Sunday, default 6).
+    """
+    from utils.task_assignment import BulkAssignmentError, assign_tasks, parse_weeks
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        result = assign_tasks(
+            [int(i) for i in data.get('template_ids') or []],
+            [int(i) for i in data.get('promotor_ids') or []],
+            parse_weeks(data.get('weeks') or []),
+            created_by=current_user.id,
+            project_id=int(data['project_id']) if data.get('project_id') else None,
+            priority=data.get('priority', 'Medium'),
+            task_name=data.get('task_name'),
+            comments=data.get('comments'),
+            due_weekday=int(data.get('due_weekday', 6))
+        )
+    except (BulkAssignmentError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, 'result': result}), 200
+
+
 @app.route('/tasks/<int:id>/update', methods=['GET', 'POST'])
 @login_required
 def task_update(id):
@@ -457,6 +483,82 @@ def task_update(id):
     return render_template('tasks/update.html', form=form, task=task)
 
 
+# ============================================================================
+# TASK ANALYTICS ROUTES
+# ============================================================================
+
+def _analytics_args():
+    """weeks and promotor_id query parameters for the analytics endpoints"""
+    from utils.task_analytics import DEFAULT_WEEKS, MAX_WEEKS
+
+    weeks = min(max(request.args.get('weeks', DEFAULT_WEEKS, type=int), 1), MAX_WEEKS)
+    return weeks, request.args.get('promotor_id', type=int)
+
+
+@app.route('/analytics')
+@manager_or_admin_required
+def analytics():
+    """Promotor performance charts (filled in from the analytics API)"""
+    from utils.task_analytics import DEFAULT_WEEKS, MAX_WEEKS
+
+    promotors = User.query.filter_by(is_active=True).order_by(User.username).all()
+    return render_template('analytics.html', promotors=promotors,
+                           default_weeks=DEFAULT_WEEKS, max_weeks=MAX_WEEKS)
+
+
+@app.route('/api/analytics/weekly')
+@manager_or_admin_required
+def api_analytics_weekly():
+    """Per-week assigned, completed, rolled over, lag and on-time figures"""
+    from utils.task_analytics import ensure_fresh, weekly_trend
+
+    weeks, promotor_id = _analytics_args()
+    ensure_fresh()
+    return jsonify({'success': True, 'weeks': weekly_trend(weeks, promotor_id)}), 200
+
+
+@app.route('/api/analytics/promotors')
+@manager_or_admin_required
+def api_analytics_promotors():
+    """Per-promotor throughput, completion and on-time rates and lag"""
+    from utils.task_analytics import ensure_fresh, promotor_summary
+
+    weeks, _ = _analytics_args()
+    ensure_fresh()
+    return jsonify({'success': True, 'promotors': promotor_summary(weeks)}), 200
+
+
+@app.route('/api/analytics/lag-distribution')
+@manager_or_admin_required
+def api_analytics_lag_distribution():
+    """Tasks per lag bucket, with percentiles"""
+    from utils.task_analytics import ensure_fresh, lag_distribution
+
+    weeks, promotor_id = _analytics_args()
+    ensure_fresh()
+    return jsonify({'success': True, 'distribution': lag_distribution(weeks, promotor_id)}), 200
+
+
+@app.route('/api/analytics/refresh', methods=['GET', 'POST'])
+def api_analytics_refresh():
+    """Cron endpoint to bring the analytics aggregates up to date (full=1 rebuilds them)"""
+    cron_secret = request.headers.get('X-Cron-Secret') or request.args.get('secret')
+    expected_secret = os.getenv('CRON_SECRET')
+
+    if not expected_secret or cron_secret != expected_secret:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    try:
+        from utils.task_analytics import refresh_analytics
+        result = refresh_analytics(full=request.args.get('full') == '1')
+
+        return jsonify({'success': True, 'result': result}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ============================================================================
 # USER MANAGEMENT ROUTES (Admin Only)
 # ============================================================================
@@ -541,48 +643,42 @@ def user_delete(id):
 @app.route('/daily-updates')
 @login_required
 def daily_updates_list():
-    """List all daily updates with filtering"""
-    from datetime import date, timedelta
-    from sqlalchemy import and_, or_
-    
-    # Get filter parameters
-    date_filter = request.args.get('date', '')
-    user_filter = request.args.get('user', '')
-    project_filter = request.args.get('project', '')
+    """Daily updates over a date range (default today), newest first, a page at a time"""
+    from datetime import date
+    from utils.daily_updates_feed import get_updates_feed
+    from utils.lookups import active_users, open_projects
     
-    # Default to today if no date specified
-    if date_filter:
+    def parse_date(value, default):
         try:
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else default
         except ValueError:
-            filter_date = date.today()
-    else:
-        filter_date = date.today()
-    
-    # Build query
-    query = DailyUpdate.query.filter_by(update_date=filter_date)
+            return default
     
-    if user_filter:
-        query = query.filter_by(user_id=int(user_filter))
-    
-    if project_filter:
-        if project_filter == 'general':
-            query = query.filter_by(is_general=True)
-        else:
-            query = query.filter_by(project_id=int(project_filter))
-    
-    # Order by created time (most recent first)
-    updates = query.order_by(DailyUpdate.created_at.desc()).all()
+    # Get filter parameters (date= is a one-day range)
+    date_filter = request.args.get('date', '')
+    start_date = parse_date(request.args.get('start', date_filter), date.today())
+    end_date = parse_date(request.args.get('end', date_filter), start_date)
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    user_filter = request.args.get('user', '')
+    project_filter = request.args.get('project', '')
+    cursor = request.args.get('cursor')
     
-    # Get all users and projects for filter dropdowns
-    users = User.query.filter_by(is_active=True).order_by(User.username).all()
-    projects = Project.query.filter(Project.status.in_(['Not Started', 'In Progress'])).order_by(Project.name).all()
+    feed = get_updates_feed(
+        start_date, end_date, current_user,
+        user_id=int(user_filter) if user_filter.isdigit() else None,
+        project=project_filter if project_filter == 'general' or project_filter.isdigit() else None,
+        cursor=cursor
+    )
     
     return render_template('daily_updates/list.html',
-                         updates=updates,
-                         users=users,
-                         projects=projects,
-                         filter_date=filter_date,
+                         updates=feed['updates'],
+                         next_cursor=feed['next_cursor'],
+                         paged=bool(cursor),
+                         users=active_users(),
+                         projects=open_projects(),
+                         start_date=start_date,
+                         end_date=end_date,
                          selected_user=user_filter,
                          selected_project=project_filter)
 
@@ -596,19 +692,8 @@ def daily_update_new():
     form = DailyUpdateForm()
     
     # Populate project choices - only projects user is involved with or all for managers/admins
-    if current_user.is_manager_or_admin():
-        # Managers and admins can update any project
-        projects = Project.query.filter(Project.status.in_(['Not Started', 'In Progress'])).order_by(Project.name).all()
-    else:
-        # Regular users can update projects they're assigned tasks on
-        user_project_ids = db.session.query(PromotorTask.project_id).filter(
-            PromotorTask.promotor_id == current_user.id,
-            PromotorTask.project_id.isnot(None)
-        ).distinct().all()
-        user_project_ids = [pid[0] for pid in user_project_ids]
-        projects = Project.query.filter(Project.id.in_(user_project_ids)).order_by(Project.name).all()
-    
-    form.project_id.choices = [(0, '-- Select Project --')] + [(p.id, p.name) for p in projects]
+    from utils.lookups import allowed_projects
+    form.project_id.choices = [(0, '-- Select Project --')] + allowed_projects(current_user)
     
     if form.validate_on_submit():
         # Check if update already exists for this user/project/date
@@ -654,17 +739,8 @@ def daily_update_edit(id):
     form = DailyUpdateForm(obj=update)
     
     # Populate project choices
-    if current_user.is_manager_or_admin():
-        projects = Project.query.filter(Project.status.in_(['Not Started', 'In Progress'])).order_by(Project.name).all()
-    else:
-        user_project_ids = db.session.query(PromotorTask.project_id).filter(
-            PromotorTask.promotor_id == current_user.id,
-            PromotorTask.project_id.isnot(None)
-        ).distinct().all()
-        user_project_ids = [pid[0] for pid in user_project_ids]
-        projects = Project.query.filter(Project.id.in_(user_project_ids)).order_by(Project.name).all()
-    
-    form.project_id.choices = [(0, '-- Select Project --')] + [(p.id, p.name) for p in projects]
+    from utils.lookups import allowed_projects
+    form.project_id.choices = [(0, '-- Select Project --')] + allowed_projects(current_user)
     
     if form.validate_on_submit():
         update.project_id = form.project_id.data if not form.is_general.data else None
@@ -696,6 +772,65 @@ def daily_update_delete(id):
     return redirect(url_for('daily_updates_list'))
 
 
+# ============================================================================
+# SEARCH ROUTES
+# ============================================================================
+
+def _search_args():
+    """search() keyword arguments from the query string"""
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            return None
+    
+    from utils.search_index import ENTITIES
+    entity = request.args.get('entity', '')
+    return {
+        'entity': entity if entity in ENTITIES else None,
+        'user_id': request.args.get('user', type=int),
+        'project_id': request.args.get('project', type=int),
+        'start': parse_date(request.args.get('start', '')),
+        'end': parse_date(request.args.get('end', ''))
+    }
+
+
+@app.route('/search')
+@manager_or_admin_required
+def search():
+    """Search daily updates and task comments"""
+    from utils.lookups import active_users, all_projects
+    from utils.search_index import search as search_index
+    
+    query = request.args.get('q', '').strip()
+    filters = _search_args()
+    found = search_index(query, **filters) if query else None
+    
+    return render_template('search.html',
+                         query=query,
+                         found=found,
+                         filters=filters,
+                         users=active_users(),
+                         projects=all_projects())
+
+
+@app.route('/api/search')
+@manager_or_admin_required
+def api_search():
+    """API endpoint to search daily updates and task comments
+    
+    q is the query ("quoted phrases" allowed); entity (update or task),
+    user, project, start and end (YYYY-MM-DD) narrow it. Snippets are HTML
+    with the matched words in <mark>.
+    """
+    from utils.search_index import search as search_index
+    
+    found = search_index(request.args.get('q', ''), **_search_args())
+    for result in found['results']:
+        result['date'] = result['date'].isoformat()
+    return jsonify({'success': True, **found}), 200
+
+
 # ============================================================================
 # PRODUCT CATALOG ROUTES
 # ============================================================================
@@ -920,6 +1055,38 @@ def catalog_upload_image(id, image_num):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/admin/catalog/export')
+@admin_required
+def catalog_export():
+    """Stream the product catalog as CSV, XLSX or NDJSON"""
+    from utils.catalog_export import CatalogExporter, EXPORT_FORMATS
+
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {export_format}'}), 400
+
+    exporter = CatalogExporter(
+        category=request.args.get('category') or None,
+        include_inactive=request.args.get('include_inactive') == '1'
+    )
+    filename = CatalogExporter.filename(export_format)
+    mimetype = EXPORT_FORMATS[export_format]['mimetype']
+
+    if export_format == 'xlsx':
+        # XLSX is a zip container, so spool it to a temp file and send that
+        import tempfile
+        spool = tempfile.TemporaryFile()
+        exporter.write_xlsx(spool)
+        spool.seek(0)
+        return send_file(spool, mimetype=mimetype, as_attachment=True, download_name=filename)
+
+    chunks = exporter.iter_csv() if export_format == 'csv' else exporter.iter_ndjson()
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 
 # ============================================================================
 # BOM CALCULATOR ROUTES
@@ -1035,17 +1202,89 @@ def wordpress_create_categories():
 @app.route('/api/wordpress/sync-all', methods=['POST'])
 @admin_required
 def wordpress_sync_all():
-    """Sync all products to WordPress"""
-    from utils.wordpress_sync import WordPressSync
+    """Queue a background sync of all products to WordPress
+    
+    Returns straight away with a job ID; a worker does the syncing and the
+    page polls /api/wordpress/sync-jobs/<id> for progress.
+    """
+    from utils.wordpress_sync_jobs import enqueue_sync_job
     
     # Check if incremental sync is requested (default: True)
-    data = request.get_json() or {}
-    incremental = data.get('incremental', True)
+    data = request.get_json(silent=True) or {}
+    incremental = bool(data.get('incremental', True))
     
-    wp_sync = WordPressSync()
-    result = wp_sync.sync_all_products(db.session, incremental=incremental)
+    job, created = enqueue_sync_job(incremental=incremental, user_id=current_user.id)
     
-    return jsonify(result)
+    return jsonify({
+        'success': True,
+        'created': created,
+        'job': job.to_dict(),
+        'message': 'Sync queued' if created else 'A sync is already in progress'
+    }), 202 if created else 200
+
+
+@app.route('/api/wordpress/sync-jobs/latest', methods=['GET'])
+@admin_required
+def wordpress_sync_job_latest():
+    """Get the most recent sync job, so the page can resume showing progress"""
+    from models import WordPressSyncJob
+    from utils.wordpress_sync_jobs import recent_failures
+    
+    job = WordPressSyncJob.query.order_by(WordPressSyncJob.id.desc()).first()
+    if not job:
+        return jsonify({'success': True, 'job': None})
+    
+    return jsonify({'success': True, 'job': job.to_dict(), 'errors': recent_failures(job.id)})
+
+
+@app.route('/api/wordpress/sync-jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def wordpress_sync_job_status(job_id):
+    """Progress of a sync job, polled by the admin page"""
+    from models import WordPressSyncJob
+    from utils.wordpress_sync_jobs import recent_failures
+    
+    job = WordPressSyncJob.query.get_or_404(job_id)
+    
+    return jsonify({'success': True, 'job': job.to_dict(), 'errors': recent_failures(job.id)})
+
+
+@app.route('/api/wordpress/sync-jobs/<int:job_id>/cancel', methods=['POST'])
+@admin_required
+def wordpress_sync_job_cancel(job_id):
+    """Cancel a queued or running sync job"""
+    from models import WordPressSyncJob
+    from utils.wordpress_sync_jobs import cancel_job
+    
+    job = WordPressSyncJob.query.get_or_404(job_id)
+    if not cancel_job(job):
+        return jsonify({'success': False, 'message': f'Job is already {job.status}'}), 409
+    
+    return jsonify({'success': True, 'job': job.to_dict(), 'message': 'Sync cancelled'})
+
+
+@app.route('/api/wordpress/sync-jobs/run', methods=['GET', 'POST'])
+def wordpress_sync_jobs_run():
+    """Cron endpoint that drains queued sync jobs within a time budget
+    
+    Unfinished jobs go back to the queue and continue on the next run, so a
+    sync of any size completes across invocations.
+    """
+    cron_secret = request.headers.get('X-Cron-Secret') or request.args.get('secret')
+    expected_secret = os.getenv('CRON_SECRET')
+    
+    if not expected_secret or cron_secret != expected_secret:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        from utils.wordpress_sync_jobs import DEFAULT_TIME_BUDGET, drain_jobs
+        time_budget = float(os.getenv('WORDPRESS_SYNC_TIME_BUDGET', DEFAULT_TIME_BUDGET))
+        jobs = drain_jobs(time_budget=time_budget)
+        
+        return jsonify({'success': True, 'jobs': jobs}), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/wordpress/changed-products', methods=['GET'])
@@ -1054,11 +1293,10 @@ def wordpress_changed_products():
     """Get list of products that have changed since last sync"""
     from models import Product
     
-    # Get products that need syncing
+    # Get products whose storefront payload changed since last sync
     changed_products = Product.query.filter(
         Product.is_active == True,
-        (Product.last_wordpress_sync == None) | 
-        (Product.updated_at > Product.last_wordpress_sync)
+        Product.wordpress_sync_pending()
     ).all()
     
     products_list = [{
@@ -1095,22 +1333,31 @@ def wordpress_sync_product(product_id):
 @app.route('/api/wordpress/sync-batch', methods=['POST'])
 @admin_required
 def wordpress_sync_batch():
-    """Sync a batch of products to WordPress (client-side batching)"""
+    """Sync a batch of products to WordPress (client-side batching)
+    
+    The batch goes to the plugin's multi-product endpoint in one request and
+    its results are written back in one UPDATE.
+    """
     from utils.wordpress_sync import WordPressSync
     from models import Product
     
     # Get batch size from request (default: 10)
-    data = request.get_json() or {}
-    batch_size = data.get('batch_size', 10)
-    
-    # Get products that need syncing
-    products = Product.query.filter(
+    data = request.get_json(silent=True) or {}
+    try:
+        batch_size = max(1, min(int(data.get('batch_size', 10)), 50))
+    except (TypeError, ValueError):
+        batch_size = 10
+    
+    # Products for this batch plus the total pending count, in one query
+    rows = db.session.query(
+        Product,
+        db.func.count().over().label('total_pending')
+    ).filter(
         Product.is_active == True,
-        (Product.last_wordpress_sync == None) | 
-        (Product.updated_at > Product.last_wordpress_sync)
-    ).limit(batch_size).all()
+        Product.wordpress_sync_pending()
+    ).order_by(Product.id).limit(batch_size).all()
     
-    if not products:
+    if not rows:
         return jsonify({
             'success': True,
             'message': 'All products are up to date!',
@@ -1119,39 +1366,29 @@ def wordpress_sync_batch():
             'total_pending': 0
         })
     
-    # Get total pending count
-    total_pending = Product.query.filter(
-        Product.is_active == True,
-        (Product.last_wordpress_sync == None) | 
-        (Product.updated_at > Product.last_wordpress_sync)
-    ).count()
+    products = [row.Product for row in rows]
+    total_pending = rows[0].total_pending
     
     # Sync this batch
     wp_sync = WordPressSync()
-    synced = 0
-    failed = 0
-    errors = []
-    
-    for product in products:
-        result = wp_sync.sync_single_product(product)
-        if result.get('success'):
-            synced += 1
-            db.session.commit()
-        else:
-            failed += 1
-            errors.append({
-                'product_name': product.product_name,
-                'error': result.get('message', 'Unknown error')
-            })
+    try:
+        result = wp_sync.sync_batch(db.session, products)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Batch sync failed: {str(e)}'}), 500
     
-    remaining = total_pending - synced
+    synced = result['synced']
+    errors = [{
+        'product_name': error.get('product_name'),
+        'error': error.get('error', 'Unknown error')
+    } for error in result['errors']]
     
     return jsonify({
         'success': True,
         'synced': synced,
-        'failed': failed,
+        'failed': result['failed'],
         'batch_size': len(products),
-        'remaining': remaining,
+        'remaining': total_pending - synced,
         'total_pending': total_pending,
         'errors': errors,
         'message': f'Synced {synced} of {len(products)} products in this batch'
@@ -2083,10 +2320,10 @@ def lambda_handler(event, context):
 @login_required
 def reminders_list():
     """List all reminders for current user"""
-    if current_user.role == 'Admin':
-        reminders = Reminder.query.order_by(Reminder.reminder_datetime.desc()).all()
-    else:
-        reminders = Reminder.query.filter_by(user_id=current_user.id).order_by(Reminder.reminder_datetime.desc()).all()
+    query = Reminder.query.options(*Reminder.with_targets())
+    if current_user.role != 'Admin':
+        query = query.filter_by(user_id=current_user.id)
+    reminders = query.order_by(Reminder.reminder_datetime.desc()).all()
     
     return render_template('reminders/list.html', reminders=reminders)
 
@@ -2095,6 +2332,8 @@ def reminders_list():
 @login_required
 def reminder_new():
     """Create a new reminder"""
+    from utils.recurrence import DEFAULT_TIMEZONE, TIMEZONE_CHOICES, WEEKDAYS, RecurrenceRule, first_fire_at, to_utc
+    
     if request.method == 'POST':
         try:
             reminder_type = request.form.get('reminder_type')
@@ -2102,9 +2341,13 @@ def reminder_new():
             task_id = request.form.get('task_id') if reminder_type == 'task' else None
             user_id = request.form.get('user_id', current_user.id)
             
+            # The date and time are wall time in the chosen zone; stored as UTC
+            recurrence_timezone = request.form.get('recurrence_timezone') or DEFAULT_TIMEZONE
             reminder_date = request.form.get('reminder_date')
             reminder_time = request.form.get('reminder_time', '09:00')
-            reminder_datetime = datetime.strptime(f"{reminder_date} {reminder_time}", '%Y-%m-%d %H:%M')
+            reminder_datetime = to_utc(
+                datetime.strptime(f"{reminder_date} {reminder_time}", '%Y-%m-%d %H:%M'), recurrence_timezone
+            )
             
             subject = request.form.get('subject') or None
             message = request.form.get('message') or None
@@ -2115,6 +2358,28 @@ def reminder_new():
             if recurrence_end_date:
                 recurrence_end_date = datetime.strptime(recurrence_end_date, '%Y-%m-%d').date()
             
+            recurrence_rule = None
+            next_fire_at = reminder_datetime
+            if is_recurring:
+                freq = (recurrence_pattern or 'daily').upper()
+                # Monthly reminders can pick the nth (or last) of the checked weekdays
+                week = int(request.form.get('recurrence_week') or 0) if freq == 'MONTHLY' else 0
+                month_days = request.form.get('recurrence_month_days', '') if freq == 'MONTHLY' else ''
+                count = request.form.get('recurrence_count')
+                rule = RecurrenceRule(
+                    freq,
+                    interval=int(request.form.get('recurrence_interval') or 1),
+                    byday=[(week, WEEKDAYS.index(code)) for code in request.form.getlist('recurrence_byday')],
+                    bymonthday=[int(day) for day in month_days.replace(' ', '').split(',') if day],
+                    count=int(count) if count else None,
+                    until=datetime.combine(recurrence_end_date, datetime.max.time()).replace(microsecond=0)
+                    if recurrence_end_date else None
+                )
+                recurrence_rule = str(rule)
+                next_fire_at = first_fire_at(rule, reminder_datetime, recurrence_timezone)
+                if next_fire_at is None:
+                    raise ValueError('the recurrence has no occurrences')
+            
             reminder = Reminder(
                 reminder_type=reminder_type,
                 project_id=project_id,
@@ -2126,6 +2391,9 @@ def reminder_new():
                 is_recurring=is_recurring,
                 recurrence_pattern=recurrence_pattern,
                 recurrence_end_date=recurrence_end_date,
+                recurrence_rule=recurrence_rule,
+                recurrence_timezone=recurrence_timezone,
+                next_fire_at=next_fire_at,
                 status='pending'
             )
             
@@ -2152,7 +2420,8 @@ def reminder_new():
         ).all()
         users = [current_user]
     
-    return render_template('reminders/form.html', projects=projects, tasks=tasks, users=users, reminder=None)
+    return render_template('reminders/form.html', projects=projects, tasks=tasks, users=users, reminder=None,
+                           timezones=TIMEZONE_CHOICES, default_timezone=DEFAULT_TIMEZONE, weekdays=WEEKDAYS)
 
 
 @app.route('/reminders/<int:id>/delete', methods=['POST'])
@@ -2207,67 +2476,10 @@ def reminders_auto_create():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # Get all incomplete projects
-        incomplete_projects = Project.query.filter(
-            Project.status.in_(['New', 'In Progress', 'On Hold'])
-        ).all()
-        
-        # Get all active users
-        active_users = User.query.filter_by(is_active=True).all()
-        
-        # Set reminder time to 30 minutes from now
-        reminder_time = datetime.utcnow() + timedelta(minutes=30)
-        
-        created_count = 0
-        skipped_count = 0
-        
-        for project in incomplete_projects:
-            # Determine recipients
-            recipients = []
-            
-            if project.owner:
-                recipients = [project.owner]
-            else:
-                # Send to all admins and managers
-                recipients = [u for u in active_users if u.role in ['Admin', 'Manager']]
-            
-            for user in recipients:
-                # Check if a reminder already exists for this project/user in the next hour
-                existing = Reminder.query.filter(
-                    Reminder.project_id == project.id,
-                    Reminder.user_id == user.id,
-                    Reminder.status == 'pending',
-                    Reminder.reminder_datetime > datetime.utcnow(),
-                    Reminder.reminder_datetime < datetime.utcnow() + timedelta(hours=1)
-                ).first()
-                
-                if not existing:
-                    # Create reminder
-                    reminder = Reminder(
-                        reminder_type='project',
-                        project_id=project.id,
-                        user_id=user.id,
-                        reminder_datetime=reminder_time,
-                        subject=f"Daily Project Update: {project.name}",
-                        message=f"This is an automated daily reminder for project: {project.name}",
-                        status='pending'
-                    )
-                    db.session.add(reminder)
-                    created_count += 1
-                else:
-                    skipped_count += 1
-        
-        db.session.commit()
+        from utils.auto_reminders import create_auto_reminders
+        result = create_auto_reminders()
         
-        return jsonify({
-            'success': True,
-            'result': {
-                'projects_checked': len(incomplete_projects),
-                'reminders_created': created_count,
-                'reminders_skipped': skipped_count,
-                'scheduled_for': reminder_time.strftime('%Y-%m-%d %H:%M:%S UTC')
-            }
-        }), 200
+        return jsonify({'success': True, 'result': result}), 200
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -2275,7 +2487,12 @@ def reminders_auto_create():
 
 @app.route('/api/reminders/reset-failed', methods=['GET', 'POST'])
 def reminders_reset_failed():
-    """API endpoint to reset failed reminders to pending status"""
+    """API endpoint to send dead-lettered reminders again
+    
+    Only reminders whose retries ran out on transient errors are reset;
+    add include_permanent=1 to also reset permanent failures (rejected
+    address, no email) once their cause has been fixed.
+    """
     # Verify secret key
     cron_secret = request.headers.get('X-Cron-Secret') or request.args.get('secret')
     expected_secret = os.getenv('CRON_SECRET')
@@ -2284,28 +2501,10 @@ def reminders_reset_failed():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # Get all failed reminders
-        failed_reminders = Reminder.query.filter_by(status='failed').all()
-        
-        reset_count = 0
-        for reminder in failed_reminders:
-            # Reset to pending
-            reminder.status = 'pending'
-            reminder.error_message = None
-            
-            # Update reminder time to 5 minutes from now
-            reminder.reminder_datetime = datetime.utcnow() + timedelta(minutes=5)
-            reset_count += 1
+        from utils.reminder_scheduler import requeue_failed_reminders
+        result = requeue_failed_reminders(include_permanent=request.args.get('include_permanent') == '1')
         
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'result': {
-                'reminders_reset': reset_count,
-                'scheduled_for': (datetime.utcnow() + timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S UTC')
-            }
-        }), 200
+        return jsonify({'success': True, 'result': result}), 200
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
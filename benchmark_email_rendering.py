@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for reminder email preparation, per 1,000 emails
+- Rendering: compiling the templates for every email (what rendering
+  without the import-time cache costs) vs the precompiled templates, one
+  email at a time and through render_many (digests that share projects)
+- SES client: a new boto3 client per EmailService vs the shared client
+- Send preparation: botocore's parameter validation and request
+  serialization for SendEmail, without the network (botocore Stubber)
+- Sending through the local SES stand-in with a new client per email vs
+  the shared client's pooled connections
+No database; projects, tasks and users are plain objects.
+
+Usage:
+    python benchmark_email_rendering.py --emails 1000
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'standin')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'standin')
+os.environ.pop('AWS_EXECUTION_ENV', None)
+os.environ.pop('SES_ENDPOINT_URL', None)
+
+import boto3
+from botocore.stub import Stubber
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from ses_standin import SESStandIn
+from utils import email_service
+from utils.email_service import EmailService, get_ses_client
+
+
+def sample_targets(count):
+    users = [SimpleNamespace(username=f'user{i}', email=f'user{i}@example.com') for i in range(max(1, count // 20))]
+    projects = [SimpleNamespace(
+        id=i, name=f'Project {i}', status='In Progress', comments='Glass delivery pending' if i % 3 else None,
+        expected_end_date=date.today() + timedelta(days=i % 40), days_remaining=lambda i=i: i % 40 - 5
+    ) for i in range(max(1, count // 10))]
+    tasks = [SimpleNamespace(
+        id=i, task_name=f'Task {i}', template=None, project=projects[i % len(projects)], priority='High',
+        due_date=date.today(), status='Pending', comments=None
+    ) for i in range(max(1, count // 10))]
+    return users, projects, tasks
+
+
+def timed(label, count, action, per=1000):
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {elapsed * per / count * 1000:10.1f} ms per {per:,}")
+    return elapsed
+
+
+def uncached_render(service, project, user):
+    """Render with freshly compiled templates, as without the import-time cache"""
+    environment = Environment(loader=FileSystemLoader(email_service.TEMPLATE_DIR),
+                              autoescape=select_autoescape(['html']), trim_blocks=True, lstrip_blocks=True,
+                              keep_trailing_newline=True, cache_size=0)
+    cached = email_service.TEMPLATES
+    email_service.TEMPLATES = {name: environment.get_template(name) for name in cached}
+    try:
+        return service.render_project_reminder(project, user)
+    finally:
+        email_service.TEMPLATES = cached
+
+
+def main(args):
+    n = args.emails
+    users, projects, tasks = sample_targets(n)
+    service = EmailService()
+
+    print(f"📊 {n:,} emails, {len(users)} recipients, {len(projects)} projects\n")
+    sample = max(1, n // 10)
+    timed('render, templates compiled per email', sample, lambda: [
+        uncached_render(service, projects[i % len(projects)], users[i % len(users)]) for i in range(sample)
+    ])
+    timed('render, precompiled templates', n, lambda: [
+        service.render_project_reminder(projects[i % len(projects)], users[i % len(users)]) for i in range(n)
+    ])
+    requests = [{'user': users[i % len(users)], 'items': [('project', projects[i % len(projects)], None)]}
+                for i in range(n)]
+    timed('render_many, one email per reminder', n, lambda: service.render_many(requests))
+    digests = [{'user': user, 'items': [('project', projects[(u + k) % len(projects)], None) for k in range(10)] +
+                [('task', tasks[(u + k) % len(tasks)], None) for k in range(10)]}
+               for u, user in enumerate(users)]
+    timed(f'render_many, {len(digests)} digests of 20 (per reminder)', n, lambda: service.render_many(digests))
+
+    print()
+    clients = max(1, n // 50)
+    timed('new boto3 SES client per EmailService', clients, lambda: [
+        boto3.session.Session().client('ses', region_name='ap-south-1') for _ in range(clients)
+    ])
+    timed('shared client (get_ses_client)', n, lambda: [get_ses_client() for _ in range(n)])
+
+    messages = service.render_many(requests)
+    client = get_ses_client()
+    stubber = Stubber(client)
+    for _ in messages:
+        stubber.add_response('send_email', {'MessageId': 'stub'})
+    with stubber:
+        timed('send preparation (validate + serialize)', n, lambda: [
+            service.send_message(message) for message, _ in messages
+        ])
+
+    print()
+    ses = SESStandIn(max_send_rate=1e9, latency=0)
+    os.environ['SES_ENDPOINT_URL'] = ses.start()
+    try:
+        sends = max(1, n // 5)
+        timed('send via stand-in, new client per email', sends, lambda: [
+            boto3.session.Session().client(
+                'ses', region_name='ap-south-1', endpoint_url=os.environ['SES_ENDPOINT_URL']
+            ).send_email(Source='a@example.com', Destination={'ToAddresses': [message['to']]},
+                         Message={'Subject': {'Data': message['subject']}, 'Body': {'Text': {'Data': message['body']}}})
+            for message, _ in messages[:sends]
+        ])
+        connections = ses.stats['connections']
+        shared = EmailService()
+        timed('send via stand-in, shared client', sends, lambda: [
+            shared.send_message(message) for message, _ in messages[:sends]
+        ])
+        print(f"\nStand-in connections: {connections} with a client per email, "
+              f"{ses.stats['connections'] - connections} with the shared client ({sends} emails each)")
+    finally:
+        ses.stop()
+        os.environ.pop('SES_ENDPOINT_URL', None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmark email rendering and SES send preparation')
+    parser.add_argument('--emails', type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark image bytes moved per WordPress sync, with and without image
+manifest negotiation, against the local stand-in. Each mode syncs the same
+catalog twice: the second pass is the common case of re-syncing products
+whose images haven't changed. No database or WordPress needed.
+
+Usage:
+    python benchmark_image_manifest.py --products 200 --image-size 250000
+"""
+import argparse
+
+import requests
+
+from benchmark_wordpress_sync import make_payloads
+from utils.image_manifest import describe_image
+from utils.wordpress_sync_engine import SyncEngine
+from wordpress_standin import WordPressStandIn
+
+
+def add_manifests(payloads, session):
+    """Describe every image the way ensure_image_manifests does (HEAD + ETag)"""
+    for payload in payloads:
+        payload['image_manifest'] = [dict(describe_image(url, session), url=url) for url in payload['images']]
+
+
+def run_mode(label, args, negotiate):
+    standin = WordPressStandIn(per_product_latency=args.per_product_latency,
+                               base_latency=args.base_latency, image_size=args.image_size)
+    api_base = f"{standin.start()}/wp-json/vcore/v1"
+    payloads = make_payloads(args.products, standin.image_url)
+    if negotiate:
+        add_manifests(payloads, requests.Session())
+
+    engine = SyncEngine(api_base, {'Content-Type': 'application/json'}, max_workers=args.workers,
+                        negotiate_images=negotiate)
+    for sync_pass in (1, 2):
+        standin.reset_stats()
+        report = engine.run(payloads)
+        stats = standin.stats
+        print(f"{label:<10} pass {sync_pass} {report['elapsed_seconds']:8.2f}s "
+              f"{stats['image_bytes_downloaded'] / 1024 / 1024:10.1f} MB images "
+              f"{stats['images_downloaded']:6d} downloaded {stats['images_reused']:6d} reused "
+              f"{stats['requests']:5d} requests ({stats['manifest_requests']} manifest)")
+
+    standin.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark image transfer per WordPress sync')
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--image-size', type=int, default=250 * 1000)
+    parser.add_argument('--per-product-latency', type=float, default=0.01)
+    parser.add_argument('--base-latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"📊 Syncing {args.products} products x 4 images of {args.image_size / 1000:.0f} KB, twice\n")
+    run_mode('legacy', args, negotiate=False)
+    run_mode('manifest', args, negotiate=True)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark the reminder dispatcher against the local SES stand-in
+Seeds a scratch SQLite database with due reminders and sends them twice:
+one worker with a commit per reminder (how check_and_send_reminders used to
+run), then the pooled dispatcher with batched status updates, then again
+with per-recipient digests (each seeded user has ~20 reminders). With
+--processes, that many dispatchers then run at once, claiming leased
+batches of the same reminders, and any email delivered twice is reported.
+Never touches DATABASE_URL or real SES.
+
+Usage:
+    python benchmark_reminder_dispatch.py --reminders 1000 --send-rate 50 --latency 0.1
+    python benchmark_reminder_dispatch.py --reminders 2000 --processes 4 --claim-size 100
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_reminder_benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'standin')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'standin')
+os.environ.pop('AWS_EXECUTION_ENV', None)
+
+from sqlalchemy import event
+
+from app import app
+from models import db, User, Project, Reminder
+from ses_standin import SESStandIn
+from utils.reminder_scheduler import DEFAULT_TIME_BUDGET, ReminderScheduler
+
+
+def seed(count, rejected):
+    """Create users, projects and `count` due reminders; `rejected` of them go to refused addresses"""
+    db.drop_all()
+    db.create_all()
+
+    users = []
+    for i in range(max(1, count // 20)):
+        user = User(username=f'user{i}', email=f'user{i}@example.com', role='Manager')
+        user.set_password('benchmark')
+        users.append(user)
+    bounced = User(username='bounced', email='bounced@reject.invalid', role='Manager')
+    bounced.set_password('benchmark')
+    db.session.add_all(users + [bounced])
+    db.session.flush()
+
+    projects = [Project(name=f'Project {i}', owner_id=users[i % len(users)].id, start_date=date.today(),
+                        expected_end_date=date.today() + timedelta(days=30), status='In Progress')
+                for i in range(max(1, count // 10))]
+    db.session.add_all(projects)
+    db.session.flush()
+
+    due = datetime.utcnow() - timedelta(minutes=5)
+    rows = [{
+        'reminder_type': 'project',
+        'project_id': projects[i % len(projects)].id,
+        'user_id': bounced.id if i < rejected else users[i % len(users)].id,
+        'reminder_datetime': due,
+        'next_fire_at': due,
+        'subject': f'Daily Project Update #{i}',
+        'is_recurring': i % 5 == 0,
+        'recurrence_pattern': 'daily' if i % 5 == 0 else None,
+        'status': 'pending',
+        'send_email': True,
+        'created_at': due,
+        'updated_at': due,
+    } for i in range(count)]
+    db.session.execute(Reminder.__table__.insert(), rows)
+    db.session.commit()
+
+
+def run_mode(label, args, **scheduler_kwargs):
+    seed(args.reminders, args.rejected)
+
+    ses = SESStandIn(max_send_rate=args.send_rate, latency=args.latency)
+    os.environ['SES_ENDPOINT_URL'] = ses.start()
+
+    statements = {'count': 0}
+    commits = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    def count_commit(*_):
+        commits['count'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    event.listen(db.engine, 'commit', count_commit)
+    try:
+        scheduler = ReminderScheduler(send_rate=args.send_rate, time_budget=args.time_budget, **scheduler_kwargs)
+        started = time.monotonic()
+        result = scheduler.check_and_send_reminders()
+        elapsed = time.monotonic() - started
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+        event.remove(db.engine, 'commit', count_commit)
+        ses.stop()
+
+    print(f"{label:<10} {elapsed:8.2f}s {result['sent'] / elapsed:8.1f} reminders/s "
+          f"{result['sent']:6d} sent {result['emails']:6d} emails {result['failed']:4d} failed {result['deferred']:5d} deferred "
+          f"{statements['count']:6d} SQL {commits['count']:5d} commits "
+          f"{ses.stats['throttled']:4d} throttled (peak {ses.stats['peak_concurrency']} in flight)")
+    return result
+
+
+def _worker(index, args, results):
+    """One competing dispatcher in its own process; runs after fork, so gets fresh DB connections"""
+    with app.app_context():
+        db.engine.dispose(close=False)
+        scheduler = ReminderScheduler(send_rate=args.send_rate / args.processes, time_budget=args.time_budget,
+                                      max_workers=args.workers, claim_size=args.claim_size,
+                                      worker_id=f'benchmark-{index}', digest_window=0)
+        result = scheduler.check_and_send_reminders()
+        db.session.remove()
+    results.put(result)
+
+
+def run_parallel(args):
+    seed(args.reminders, args.rejected)
+    db.session.remove()
+
+    ses = SESStandIn(max_send_rate=args.send_rate, latency=args.latency)
+    os.environ['SES_ENDPOINT_URL'] = ses.start()
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    started = time.monotonic()
+    workers = [context.Process(target=_worker, args=(i, args, results)) for i in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+    ses.stop()
+
+    sent = sum(outcome['sent'] for outcome in outcomes)
+    duplicates = ses.duplicate_deliveries()
+    print(f"{f'{args.processes} procs':<10} {elapsed:8.2f}s {sent / elapsed:8.1f} emails/s "
+          f"{sent:6d} sent {sum(o['failed'] for o in outcomes):4d} failed "
+          f"{sum(o['batches'] for o in outcomes):4d} leases "
+          f"{ses.stats['sent']:6d} delivered {len(duplicates):4d} duplicated "
+          f"({', '.join(str(o['sent']) for o in outcomes)} per process)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark reminder dispatch against a local SES stand-in')
+    parser.add_argument('--reminders', type=int, default=1000)
+    parser.add_argument('--rejected', type=int, default=10, help='Reminders addressed to a refused recipient')
+    parser.add_argument('--send-rate', type=float, default=50.0, help='SES account send rate (emails/second)')
+    parser.add_argument('--latency', type=float, default=0.1, help='Seconds per SES SendEmail call')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--time-budget', type=float, default=600.0)
+    parser.add_argument('--processes', type=int, default=0, help='Also run this many competing dispatchers')
+    parser.add_argument('--claim-size', type=int, default=500, help='Reminders per lease')
+    parser.add_argument('--digest-window', type=float, default=60, help='Minutes; 0 disables digests')
+    args = parser.parse_args()
+
+    print(f"📊 Dispatching {args.reminders} reminders, SES at {args.send_rate:.0f}/s with {args.latency * 1000:.0f} ms per call\n")
+    with app.app_context():
+        run_mode('sequential', args, max_workers=1, flush_size=1, digest_window=0)
+        run_mode('pooled', args, max_workers=args.workers, claim_size=args.claim_size, digest_window=0)
+        run_mode('digests', args, max_workers=args.workers, claim_size=args.claim_size,
+                 digest_window=args.digest_window)
+        if args.processes:
+            run_parallel(args)
+        db.session.remove()
+
+    os.remove(SCRATCH_DB)
+    print(f"\nThe default {DEFAULT_TIME_BUDGET}s budget at {args.send_rate:.0f}/s fits "
+          f"~{int(args.send_rate * DEFAULT_TIME_BUDGET)} reminders per cron run")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text search over daily updates and task comments
+Seeds a scratch SQLite database with a year of daily updates and commented
+tasks (Zipf-distributed words, the commonest of them stopwords as in
+English, so a few words are everywhere and most are rare), rebuilds the
+index, then runs a mix of queries - rare and common words, several words,
+phrases, user/project/date filters - through the index and through a LIKE
+scan of the text. Checks the index returns exactly the
+documents a brute-force match finds, and that writes through the ORM
+(new, edited, deleted updates and comments) update the index on their
+own. Never touches DATABASE_URL.
+
+Usage:
+    python benchmark_search.py --users 40 --days 365
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_search_benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from app import app
+from models import db, User, Project, TaskTemplate, PromotorTask, DailyUpdate
+from utils.search_index import (ENTITY_TASK, ENTITY_UPDATE, STOPWORDS, parse_query, rebuild_search_index,
+                                 search, tokenize)
+
+VOCABULARY = 5000
+RUNS = 5
+
+
+def seed(user_count, days, rng):
+    """Create users, projects and an update per user per weekday for `days` days, plus commented tasks"""
+    db.drop_all()
+    db.create_all()
+
+    # As in English, the most frequent words are stopwords
+    words = sorted(STOPWORDS) + [f'w{i}' for i in range(VOCABULARY - len(STOPWORDS))]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+
+    def text(length):
+        return ' '.join(rng.choices(words, weights, k=length)).capitalize() + '.'
+
+    admin = User(username='admin', email='admin@example.com', role='Admin')
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', role='Promotor') for i in range(user_count)]
+    for user in [admin] + users:
+        user.set_password('benchmark')
+    db.session.add_all([admin] + users)
+    db.session.flush()
+    projects = [Project(name=f'Project {i}', owner_id=admin.id, start_date=date.today() - timedelta(days=days),
+                        expected_end_date=date.today(), status='In Progress') for i in range(30)]
+    template = TaskTemplate(name='Template', created_by=admin.id)
+    db.session.add_all(projects + [template])
+    db.session.flush()
+
+    updates, tasks = [], []
+    for day in range(days):
+        update_date = date.today() - timedelta(days=day)
+        if update_date.weekday() >= 5:
+            continue
+        for i, user in enumerate(users):
+            updates.append({
+                'user_id': user.id, 'project_id': projects[(i + day) % len(projects)].id,
+                'update_date': update_date, 'update_text': text(rng.randint(20, 120)), 'is_general': False,
+                'created_at': datetime.combine(update_date, datetime.min.time()), 'updated_at': datetime.utcnow(),
+            })
+        if day % 7 == 0:
+            year, week, _ = update_date.isocalendar()
+            for user in users:
+                tasks.append({
+                    'template_id': template.id, 'promotor_id': user.id, 'project_id': rng.choice(projects).id,
+                    'assigned_week': week, 'assigned_year': year, 'original_week': week, 'original_year': year,
+                    'due_date': update_date, 'status': 'Completed', 'comments': text(rng.randint(5, 40)),
+                    'created_by': admin.id, 'created_at': datetime.utcnow(),
+                    'updated_at': datetime.combine(update_date, datetime.min.time()),
+                })
+    # Core inserts skip the indexing events; the rebuild indexes them
+    db.session.execute(DailyUpdate.__table__.insert(), updates)
+    db.session.execute(PromotorTask.__table__.insert(), tasks)
+    db.session.commit()
+    return admin.id, users[0].id, projects[0].id, len(updates), len(tasks)
+
+
+def brute_force(query, entity=None, user_id=None, project_id=None, start=None, end=None):
+    """{(entity, id)} matching query, found by tokenizing every document in Python"""
+    terms, phrases = parse_query(query)
+    sources = []
+    if entity in (None, ENTITY_UPDATE):
+        q = db.session.query(DailyUpdate.id, DailyUpdate.update_text, DailyUpdate.user_id,
+                             DailyUpdate.project_id, DailyUpdate.update_date)
+        sources.append((ENTITY_UPDATE, q))
+    if entity in (None, ENTITY_TASK):
+        q = db.session.query(PromotorTask.id, PromotorTask.comments, PromotorTask.promotor_id,
+                             PromotorTask.project_id, PromotorTask.updated_at)
+        sources.append((ENTITY_TASK, q))
+
+    matches = set()
+    for entity_type, q in sources:
+        for entity_id, text, author, project, when in q:
+            when = when.date() if isinstance(when, datetime) else when
+            if (user_id and author != user_id) or (project_id and project != project_id) \
+                    or (start and when < start) or (end and when > end):
+                continue
+            tokens = tokenize(text)
+            present = {token for _, token in tokens}
+            if not all(term in present for term in terms):
+                continue
+            positions = {(position, token) for position, token in tokens}
+            if all(any(all((start_position + offset, token) in positions for offset, token in phrase)
+                       for start_position, first in tokens if first == phrase[0][1])
+                   for phrase in phrases):
+                matches.add((entity_type, entity_id))
+    return matches
+
+
+def like_scan(query):
+    """Seconds for the LIKE scan the index replaces (every word, both tables)"""
+    words = re.findall(r'\w+', query)
+    started = time.perf_counter()
+    db.session.query(DailyUpdate.id).filter(*[DailyUpdate.update_text.like(f'%{w}%') for w in words]).all()
+    db.session.query(PromotorTask.id).filter(*[PromotorTask.comments.like(f'%{w}%') for w in words]).all()
+    return time.perf_counter() - started
+
+
+def timed_search(query, **filters):
+    """Best of RUNS seconds for a results page of query"""
+    best = None
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        search(query, **filters)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_writes(user_id, project_id):
+    """Problems with the index following ORM writes"""
+    problems = []
+    update = DailyUpdate(user_id=user_id, project_id=project_id, update_date=date.today() + timedelta(days=1),
+                         update_text='Installed the zyxglass panels at Café Marine')
+    db.session.add(update)
+    db.session.commit()
+    if [r['id'] for r in search('zyxglass cafe')['results']] != [update.id]:
+        problems.append('new update not found')
+
+    update.update_text = 'Measured the qwvframe openings'
+    db.session.commit()
+    if search('zyxglass')['total'] or search('"qwvframe openings"')['total'] != 1:
+        problems.append('edited update not reindexed')
+
+    task = PromotorTask.query.first()
+    task.comments = 'Customer asked about plkmirror pricing'
+    db.session.commit()
+    if [r['id'] for r in search('plkmirror', entity=ENTITY_TASK)['results']] != [task.id]:
+        problems.append('edited task comment not found')
+
+    db.session.delete(update)
+    db.session.delete(task)
+    db.session.commit()
+    if search('qwvframe')['total'] or search('plkmirror')['total']:
+        problems.append('deleted documents still found')
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark full-text search')
+    parser.add_argument('--users', type=int, default=40, help='Users posting an update every weekday')
+    parser.add_argument('--days', type=int, default=365, help='Days of history')
+    args = parser.parse_args()
+    rng = random.Random(48)
+
+    problems = []
+    with app.app_context():
+        admin_id, user_id, project_id, update_count, task_count = seed(args.users, args.days, rng)
+        started = time.perf_counter()
+        counts = rebuild_search_index()
+        print(f"Indexed {update_count:,} updates and {task_count:,} task comments "
+              f"({counts['postings']:,} postings) in {time.perf_counter() - started:.1f}s")
+        print()
+
+        start = date.today() - timedelta(days=30)
+        cases = [
+            ('rare word', 'w4000', {}),
+            ('common word', 'w1', {}),
+            ('two words', 'w12 w345', {}),
+            ('three words', 'w3 w40 w500', {}),
+            ('phrase', '"w1 w2"', {}),
+            ('phrase + word', '"w1 w2" w30', {}),
+            ('user filter', 'w5 w60', {'user_id': user_id}),
+            ('project + dates', 'w7', {'project_id': project_id, 'start': start}),
+            ('task comments', 'w9 w90', {'entity': ENTITY_TASK}),
+        ]
+        print(f"{'query':<16} {'matches':>8} {'index ms':>9} {'LIKE ms':>9}")
+        for label, query, filters in cases:
+            elapsed = timed_search(query, **filters)
+            found = search(query, limit=10 ** 6, **filters)
+            expected = brute_force(query, **filters)
+            actual = {(r['entity'], r['id']) for r in found['results']}
+            scores = [r['score'] for r in found['results']]
+            print(f"{label:<16} {found['total']:8,d} {elapsed * 1000:9.1f} {like_scan(query) * 1000:9.1f}")
+            if actual != expected or found['total'] != len(expected):
+                problems.append(f'{label}: {len(actual)} results, brute force finds {len(expected)}')
+            if scores != sorted(scores, reverse=True):
+                problems.append(f'{label}: results not ranked by score')
+        db.session.remove()
+
+        problems += check_writes(user_id, project_id)
+        db.session.remove()
+        db.drop_all()
+
+    print()
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print("✅ Index results match a brute-force scan, and writes keep the index current")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark the weekly task rollover
+Seeds a scratch SQLite database with incomplete tasks assigned to earlier
+weeks (spread over the last two years, some already completed) and rolls
+them over twice: with the old per-task ORM loop (every task loaded,
+update_lag() per row, one commit at the end), then with the chunked,
+set-based rollover_incomplete_tasks(). Reports time, SQL statements and the
+longest transaction, checks both leave the same weeks, lags, statuses and
+due dates, and that a second run is a no-op. Never touches DATABASE_URL.
+
+Usage:
+    python benchmark_task_rollover.py --tasks 50000
+    python benchmark_task_rollover.py --tasks 500000 --skip-legacy
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_rollover_benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from sqlalchemy import event
+
+from app import app
+from models import db, User, TaskTemplate, PromotorTask
+from utils.task_rollover import INCOMPLETE_STATUSES, rollover_incomplete_tasks
+
+
+def seed(count, seed_value):
+    """Create promotors, templates and `count` tasks from the last two years"""
+    db.drop_all()
+    db.create_all()
+
+    rng = random.Random(seed_value)
+    admin = User(username='admin', email='admin@example.com', role='Admin')
+    admin.set_password('benchmark')
+    promotors = [User(username=f'promotor{i}', email=f'promotor{i}@example.com', role='Promotor')
+                 for i in range(50)]
+    for user in promotors:
+        user.set_password('benchmark')
+    db.session.add_all([admin] + promotors)
+    db.session.flush()
+    templates = [TaskTemplate(name=f'Template {i}', created_by=admin.id) for i in range(20)]
+    db.session.add_all(templates)
+    db.session.flush()
+
+    today = date.today()
+    rows = []
+    for i in range(count):
+        original = today - timedelta(weeks=rng.randint(0, 104))
+        assigned = original + timedelta(weeks=rng.randint(0, (today - original).days // 7))
+        original_year, original_week, _ = original.isocalendar()
+        assigned_year, assigned_week, _ = assigned.isocalendar()
+        rows.append({
+            'template_id': templates[i % len(templates)].id,
+            'promotor_id': promotors[i % len(promotors)].id,
+            'assigned_week': assigned_week,
+            'assigned_year': assigned_year,
+            'original_week': original_week,
+            'original_year': original_year,
+            'due_date': assigned,
+            'status': rng.choice(INCOMPLETE_STATUSES + ('Completed',)),
+            'lag_weeks': 0,
+            'priority': 'Medium',
+            'created_by': admin.id,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow(),
+        })
+        if len(rows) == 10000:
+            db.session.execute(PromotorTask.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(PromotorTask.__table__.insert(), rows)
+    db.session.commit()
+
+
+def legacy_rollover():
+    """The per-task ORM rollover this replaced"""
+    current_date = datetime.now()
+    current_week = current_date.isocalendar()[1]
+    current_year = current_date.isocalendar()[0]
+    incomplete_tasks = PromotorTask.query.filter(
+        PromotorTask.status.in_(INCOMPLETE_STATUSES),
+        db.or_(
+            PromotorTask.assigned_year < current_year,
+            db.and_(PromotorTask.assigned_year == current_year, PromotorTask.assigned_week < current_week)
+        )
+    ).all()
+    summary = []
+    for task in incomplete_tasks:
+        task.assigned_week = current_week
+        task.assigned_year = current_year
+        task.update_lag()
+        if task.lag_weeks > 0:
+            task.status = 'Overdue'
+        task.due_date = (current_date + timedelta(days=6 - current_date.weekday())).date()
+        task.updated_at = datetime.utcnow()
+        summary.append({
+            'task_id': task.id,
+            'template_name': task.template.name if task.template else 'N/A',
+            'promotor': task.promotor.username if task.promotor else 'N/A',
+            'lag_weeks': task.lag_weeks,
+        })
+    db.session.commit()
+    return {'count': len(summary), 'tasks': summary}
+
+
+def snapshot():
+    return db.session.query(
+        PromotorTask.id, PromotorTask.assigned_year, PromotorTask.assigned_week,
+        PromotorTask.lag_weeks, PromotorTask.status, PromotorTask.due_date
+    ).order_by(PromotorTask.id).all()
+
+
+def run(label, action):
+    """Run action, printing time, statements and the longest transaction"""
+    stats = {'statements': 0, 'commits': 0, 'longest': 0.0, 'began': None}
+
+    def count_statement(*_):
+        stats['statements'] += 1
+        if stats['began'] is None:
+            stats['began'] = time.perf_counter()
+
+    def count_commit(*_):
+        stats['commits'] += 1
+        if stats['began'] is not None:
+            stats['longest'] = max(stats['longest'], time.perf_counter() - stats['began'])
+            stats['began'] = None
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    event.listen(db.engine, 'commit', count_commit)
+    try:
+        started = time.perf_counter()
+        result = action()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+        event.remove(db.engine, 'commit', count_commit)
+    db.session.remove()
+
+    print(f"{label:<12} {elapsed:8.2f}s {result['count']:8,d} tasks {stats['statements']:8,d} SQL "
+          f"{stats['commits']:5d} commits  longest transaction {stats['longest']:6.2f}s")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the weekly task rollover')
+    parser.add_argument('--tasks', type=int, default=50000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--skip-legacy', action='store_true', help="Don't run the per-task ORM loop")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"📊 {args.tasks:,} tasks over the last two years\n")
+        legacy_state = None
+        if not args.skip_legacy:
+            seed(args.tasks, args.seed)
+            run('ORM loop', legacy_rollover)
+            legacy_state = snapshot()
+
+        seed(args.tasks, args.seed)
+        first = run('set-based', lambda: rollover_incomplete_tasks(chunk_size=args.chunk_size))
+        state = snapshot()
+        second = run('second run', lambda: rollover_incomplete_tasks(chunk_size=args.chunk_size))
+        db.session.remove()
+        db.drop_all()
+
+    problems = []
+    if legacy_state is not None and legacy_state != state:
+        # The old lag assumed 52-week years; only tasks from before a 53-week year may differ
+        differing = [(old, new) for old, new in zip(legacy_state, state) if old != new]
+        if any(old[:3] != new[:3] or old[4:] != new[4:] for old, new in differing):
+            problems.append(f'{len(differing)} tasks differ from the ORM loop')
+        else:
+            print(f"\nℹ️ {len(differing):,} lags differ from the ORM loop, which counted every year as 52 weeks")
+    if second['count']:
+        problems.append(f"second run moved {second['count']} tasks")
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"\n✅ {first['count']:,} tasks rolled over; a second run is a no-op")
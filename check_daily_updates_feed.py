@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Check that the daily updates feed costs one query per page
+Seeds a scratch SQLite database with a quarter of daily updates (every
+user, most days, a project or general update each), then scrolls the
+whole quarter through /daily-updates page by page, counting SQL
+statements per page and checking every update appears exactly once, in
+(update_date, created_at, id) order. Never touches DATABASE_URL.
+
+Usage:
+    python check_daily_updates_feed.py --users 40 --days 91
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_daily_updates_feed.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from flask_login import login_user
+from sqlalchemy import event
+
+from app import app
+from models import db, User, Project, DailyUpdate
+
+
+def seed(user_count, days):
+    """Create an admin (who sees every delete link), users, projects and an update per user per weekday"""
+    db.drop_all()
+    db.create_all()
+
+    admin = User(username='admin', email='admin@example.com', role='Admin')
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', role='Promotor') for i in range(user_count)]
+    for user in [admin] + users:
+        user.set_password('check')
+    db.session.add_all([admin] + users)
+    db.session.flush()
+    projects = [Project(name=f'Project {i}', owner_id=admin.id, start_date=date.today() - timedelta(days=days),
+                        expected_end_date=date.today() + timedelta(days=30), status='In Progress')
+                for i in range(30)]
+    db.session.add_all(projects)
+    db.session.flush()
+
+    rows = []
+    for day in range(days):
+        update_date = date.today() - timedelta(days=day)
+        if update_date.weekday() >= 5:
+            continue
+        for i, user in enumerate(users):
+            general = (i + day) % 5 == 0
+            rows.append({
+                'user_id': user.id,
+                'project_id': None if general else projects[(i + day) % len(projects)].id,
+                'update_date': update_date,
+                'update_text': f'Update from {user.username} on {update_date}',
+                'is_general': general,
+                # Several updates share a created_at, so the id tiebreak matters
+                'created_at': datetime.combine(update_date, datetime.min.time()) + timedelta(hours=9, minutes=i // 4),
+                'updated_at': datetime.utcnow(),
+            })
+    db.session.execute(DailyUpdate.__table__.insert(), rows)
+    db.session.commit()
+    return admin.id, len(rows)
+
+
+def scroll(user_id, start, end):
+    """Walk every page of start..end; returns (statements per page, update ids in page order, seconds)"""
+    statements = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    per_page, ids, cursor = [], [], None
+    started = time.perf_counter()
+    while True:
+        query = f'start={start}&end={end}' + (f'&cursor={cursor}' if cursor else '')
+        with app.test_request_context(f'/daily-updates?{query}'):
+            login_user(db.session.get(User, user_id))
+            statements['count'] = 0
+            event.listen(db.engine, 'before_cursor_execute', count_statement)
+            try:
+                html = app.view_functions['daily_updates_list']()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count_statement)
+        db.session.remove()
+        per_page.append(statements['count'])
+        ids += [int(i) for i in re.findall(r'/daily-updates/(\d+)/delete', html)]
+        match = re.search(r'cursor=([^"&]+)', html)
+        if not match:
+            break
+        cursor = match.group(1)
+    return per_page, ids, time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the daily updates feed costs one query per page')
+    parser.add_argument('--users', type=int, default=40, help='Users posting updates')
+    parser.add_argument('--days', type=int, default=91, help='Days of updates')
+    args = parser.parse_args()
+
+    problems = []
+    with app.app_context():
+        admin_id, count = seed(args.users, args.days)
+        start, end = date.today() - timedelta(days=args.days - 1), date.today()
+        expected = [row.id for row in db.session.query(DailyUpdate.id).order_by(
+            DailyUpdate.update_date.desc(), DailyUpdate.created_at.desc(), DailyUpdate.id.desc()
+        )]
+        db.session.remove()
+
+        scroll(admin_id, end, end)  # warm the cached dropdowns
+        per_page, ids, elapsed = scroll(admin_id, start, end)
+        print(f"{count:,} updates in {len(per_page)} pages, {elapsed * 1000 / len(per_page):.1f} ms per page; "
+              f"SQL per page: min {min(per_page)} max {max(per_page)}")
+        if ids != expected:
+            problems.append(f'scrolling returned {len(ids)} updates ({len(set(ids))} distinct), expected {len(expected)} in order')
+        if max(per_page) != 1:
+            problems.append(f'pages took up to {max(per_page)} queries')
+        db.session.remove()
+        db.drop_all()
+
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"✅ A quarter of updates scrolls with one query per page")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Checks for the ISO week calendar in utils/iso_weeks.py
+Compares every day from FIRST_YEAR to LAST_YEAR with date.isocalendar(),
+checks week ranges, 53-week years and lag (in Python and through the SQL
+expression, on an in-memory SQLite database) against plain date arithmetic.
+No application database needed.
+
+Usage:
+    python check_iso_weeks.py --pairs 5000 --seed 7
+"""
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import column, create_engine, select, table, text
+
+from utils.iso_weeks import (FIRST_YEAR, LAST_YEAR, WEEKS, WEEKS_IN_YEAR, get_week, lag_expr, lag_weeks,
+                             shift, week_of)
+
+
+def check(args):
+    failures = []
+
+    day = date(FIRST_YEAR, 1, 4)
+    while day.year <= LAST_YEAR:
+        iso_year, iso_week, _ = day.isocalendar()
+        found = week_of(day)
+        if (found.year, found.week) != (iso_year, iso_week) or not found.start <= day <= found.end:
+            failures.append(f'{day}: week_of gave {found}, isocalendar {iso_year}-W{iso_week}')
+        day += timedelta(days=1)
+
+    for year, weeks in WEEKS_IN_YEAR.items():
+        if date(year, 12, 28).isocalendar()[1] != weeks:
+            failures.append(f'{year}: {weeks} weeks')
+    for previous, week in zip(WEEKS, WEEKS[1:]):
+        if week.start != previous.end + timedelta(days=1) or week.start.weekday() != 0:
+            failures.append(f'{week} does not follow {previous}')
+
+    rng = random.Random(args.seed)
+    pairs = []
+    for _ in range(args.pairs):
+        original = rng.choice(WEEKS[:-60])
+        current = shift(original, rng.randint(-10, 60))
+        pairs.append((original, current))
+        expected = max(0, (current.start - original.start).days // 7)
+        if lag_weeks(original.year, original.week, current) != expected:
+            failures.append(f'lag {original} -> {current}: {lag_weeks(original.year, original.week, current)}')
+
+    # The SQL expression over real columns, one current week per query
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE weeks (year INTEGER, week INTEGER)'))
+        conn.execute(text('INSERT INTO weeks VALUES (:year, :week)'),
+                     [{'year': original.year, 'week': original.week} for original, _ in pairs[:200]])
+        weeks = table('weeks', column('year'), column('week'))
+        for original, current in pairs[:200]:
+            lag = conn.execute(select(lag_expr(weeks.c.year, weeks.c.week, current)).where(
+                weeks.c.year == original.year, weeks.c.week == original.week
+            ).limit(1)).scalar()
+            if lag != lag_weeks(original.year, original.week, current):
+                failures.append(f'SQL lag {original} -> {current}: {lag}')
+
+    try:
+        get_week(2021, 53)
+        failures.append('2021 has no week 53')
+    except ValueError:
+        pass
+
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the ISO week calendar')
+    parser.add_argument('--pairs', type=int, default=5000, help='Random (original, current) weeks to compare lag for')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    failures = check(args)
+    if failures:
+        print(f"❌ {len(failures)} failures")
+        for failure in failures[:20]:
+            print(f"   {failure}")
+        sys.exit(1)
+    print(f"✅ {len(WEEKS):,} weeks from {FIRST_YEAR} to {LAST_YEAR} match isocalendar(); "
+          f"lag matches date arithmetic for {args.pairs:,} pairs")
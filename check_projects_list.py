@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Check that the projects list costs two queries per page
+Seeds a scratch SQLite database with projects (a spread of owners,
+statuses and end dates, many sharing a created_at) and open tasks, then
+scrolls /projects page by page, unfiltered and filtered by status and
+owner, counting SQL statements per page and checking every project
+appears exactly once, newest first. Also checks the SQL-computed overdue
+state, days remaining and task summaries against the model methods and a
+Python count. Never touches DATABASE_URL.
+
+Usage:
+    python check_projects_list.py --projects 10000
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_projects_list.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from flask_login import login_user
+from sqlalchemy import event
+
+from app import app
+from models import db, User, Project, TaskTemplate, PromotorTask
+from utils.iso_weeks import lag_weeks
+from utils.projects_list import get_projects_page
+from utils.task_rollover import INCOMPLETE_STATUSES
+
+STATUSES = ('Not Started', 'In Progress', 'Completed', 'On Hold')
+TASK_STATUSES = ('Pending', 'In Progress', 'Completed', 'Overdue')
+
+
+def seed(project_count):
+    """Create an admin (who sees every edit link), owners, projects and tasks on every third project"""
+    db.drop_all()
+    db.create_all()
+
+    admin = User(username='admin', email='admin@example.com', role='Admin')
+    owners = [User(username=f'manager{i}', email=f'manager{i}@example.com', role='Manager') for i in range(10)]
+    for user in [admin] + owners:
+        user.set_password('check')
+    db.session.add_all([admin] + owners)
+    db.session.flush()
+    template = TaskTemplate(name='Template', created_by=admin.id)
+    db.session.add(template)
+    db.session.flush()
+
+    today = date.today()
+    projects = [{
+        'name': f'Project {i}',
+        'owner_id': owners[i % len(owners)].id,
+        'start_date': today - timedelta(days=200),
+        'expected_end_date': today + timedelta(days=i % 61 - 30),
+        'status': STATUSES[i % len(STATUSES)],
+        'comments': f'Notes on project {i}' if i % 2 else None,
+        # Several projects share a created_at, so the id tiebreak matters
+        'created_at': datetime(2025, 1, 1) + timedelta(hours=i // 3),
+        'updated_at': datetime.utcnow(),
+    } for i in range(project_count)]
+    db.session.execute(Project.__table__.insert(), projects)
+
+    project_ids = db.session.scalars(db.select(Project.id)).all()
+    tasks = []
+    for i, project_id in enumerate(project_ids[::3]):
+        for j in range(i % 6):
+            week = today - timedelta(weeks=j * 2)
+            year, week_number, _ = week.isocalendar()
+            tasks.append({
+                'template_id': template.id, 'promotor_id': owners[j].id, 'project_id': project_id,
+                'assigned_week': week_number, 'assigned_year': year,
+                'original_week': week_number, 'original_year': year,
+                'due_date': today + timedelta(days=j - 2), 'status': TASK_STATUSES[(i + j) % len(TASK_STATUSES)],
+                'lag_weeks': 0, 'priority': 'Medium', 'created_by': admin.id,
+                'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow(),
+            })
+    db.session.execute(PromotorTask.__table__.insert(), tasks)
+    db.session.commit()
+    return admin.id, owners[3].id, len(tasks)
+
+
+def scroll(user_id, filters=''):
+    """Walk every page of /projects; returns (statements per page, project ids in page order, seconds)"""
+    statements = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    per_page, ids, cursor = [], [], None
+    started = time.perf_counter()
+    while True:
+        query = filters + (f'&cursor={cursor}' if cursor else '')
+        with app.test_request_context(f'/projects?{query}'):
+            login_user(db.session.get(User, user_id))
+            statements['count'] = 0
+            event.listen(db.engine, 'before_cursor_execute', count_statement)
+            try:
+                html = app.view_functions['projects_list']()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count_statement)
+        db.session.remove()
+        per_page.append(statements['count'])
+        ids += [int(i) for i in re.findall(r'/projects/(\d+)/edit', html)]
+        match = re.search(r'cursor=([^"&]+)', html)
+        if not match:
+            break
+        cursor = match.group(1)
+    return per_page, ids, time.perf_counter() - started
+
+
+def check_rows():
+    """Problems with the computed columns of the first pages, against the models"""
+    problems = []
+    page = get_projects_page(page_size=500)
+    models = {project.id: project for project in Project.query.filter(
+        Project.id.in_([row['id'] for row in page['projects']])
+    )}
+    for row in page['projects']:
+        project = models[row['id']]
+        open_tasks = [task for task in project.tasks if task.status in INCOMPLETE_STATUSES]
+        expected = {
+            'owner_name': project.owner.username,
+            'is_overdue': project.is_overdue(),
+            'days_remaining': project.days_remaining(),
+            'open_tasks': len(open_tasks),
+            'overdue_tasks': sum(1 for task in open_tasks
+                                 if task.status == 'Overdue' or task.due_date < date.today()),
+            'max_lag': max([lag_weeks(task.original_year, task.original_week) for task in open_tasks], default=0),
+        }
+        actual = {key: row[key] for key in expected}
+        if actual != expected:
+            problems.append(f"project {row['id']}: {actual} != {expected}")
+    return problems[:5]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the projects list costs two queries per page')
+    parser.add_argument('--projects', type=int, default=10000, help='Projects to create')
+    args = parser.parse_args()
+
+    problems = []
+    with app.app_context():
+        admin_id, owner_id, task_count = seed(args.projects)
+        print(f"{args.projects:,} projects, {task_count:,} tasks")
+        problems += check_rows()
+        db.session.remove()
+
+        scroll(admin_id, 'status=Completed&owner=0')  # warm the cached dropdowns
+        for label, filters, query in (
+            ('all', '', Project.query),
+            ('In Progress', 'status=In+Progress', Project.query.filter_by(status='In Progress')),
+            ('one owner', f'owner={owner_id}', Project.query.filter_by(owner_id=owner_id)),
+        ):
+            expected = [project_id for project_id, in query.with_entities(Project.id).order_by(
+                Project.created_at.desc(), Project.id.desc()
+            )]
+            db.session.remove()
+            per_page, ids, elapsed = scroll(admin_id, filters)
+            print(f"{label:<12} {len(ids):,} projects in {len(per_page)} pages, "
+                  f"{elapsed * 1000 / len(per_page):.1f} ms per page; SQL per page: min {min(per_page)} max {max(per_page)}")
+            if ids != expected:
+                problems.append(f'{label}: scrolling returned {len(ids)} projects ({len(set(ids))} distinct), '
+                                f'expected {len(expected)} in order')
+            if max(per_page) > 2:
+                problems.append(f'{label}: pages took up to {max(per_page)} queries')
+        db.session.remove()
+        db.drop_all()
+
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"✅ Projects scroll with two queries per page, and the computed columns match the models")
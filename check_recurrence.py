@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Property checks for utils/recurrence.py
+Generates random rules and compares the lazy, period-jumping expansion with
+a brute-force reference that tests every calendar day against the rule's
+definition. Also checks cursor resumption, COUNT/UNTIL, RRULE round trips
+and time zone conversion, and cross-checks against python-dateutil when it
+is installed. No database needed.
+
+Usage:
+    python check_recurrence.py --rules 2000 --seed 7
+"""
+import argparse
+import calendar
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import islice, takewhile
+
+from utils.recurrence import RecurrenceRule, advance, to_local, to_utc
+
+HORIZON_DAYS = 3 * 366
+ZONES = ('UTC', 'Asia/Kolkata', 'America/New_York', 'Europe/London', 'Australia/Sydney')
+
+
+def reference_occurrences(rule, start, limit):
+    """Every day from start, kept if the rule's definition selects it"""
+    week0 = start.date() - timedelta(days=start.weekday())
+    month0 = start.year * 12 + start.month - 1
+    found = []
+    day = start.date()
+    for _ in range(HORIZON_DAYS):
+        days_in_month = calendar.monthrange(day.year, day.month)[1]
+        if rule.freq == 'DAILY':
+            in_period = (day - start.date()).days % rule.interval == 0
+        elif rule.freq == 'WEEKLY':
+            week = day - timedelta(days=day.weekday())
+            in_period = ((week - week0).days // 7) % rule.interval == 0
+        else:
+            in_period = (day.year * 12 + day.month - 1 - month0) % rule.interval == 0
+
+        month_day_ok = not rule.bymonthday or any(
+            day.day == (d if d > 0 else days_in_month + d + 1) for d in rule.bymonthday
+        )
+
+        if rule.freq == 'WEEKLY':
+            weekday_ok = day.weekday() in ({wd for _, wd in rule.byday} or {start.weekday()})
+        elif not rule.byday:
+            weekday_ok = True
+        else:
+            weekday_ok = False
+            for n, wd in rule.byday:
+                if day.weekday() != wd:
+                    continue
+                nth_from_start = (day.day - 1) // 7 + 1
+                nth_from_end = -((days_in_month - day.day) // 7 + 1)
+                if n == 0 or n == nth_from_start or n == nth_from_end:
+                    weekday_ok = True
+
+        default_ok = True
+        if rule.freq == 'MONTHLY' and not rule.byday and not rule.bymonthday:
+            default_ok = day.day == start.day
+
+        if in_period and month_day_ok and weekday_ok and default_ok:
+            occurrence = datetime.combine(day, start.time())
+            if occurrence >= start:
+                if rule.until is not None and occurrence > rule.until:
+                    break
+                found.append(occurrence)
+                if len(found) >= limit or (rule.count is not None and len(found) >= rule.count):
+                    break
+        day += timedelta(days=1)
+    return found
+
+
+def random_rule(rng, start):
+    freq = rng.choice(('DAILY', 'WEEKLY', 'MONTHLY'))
+    interval = rng.choice((1, 1, 1, 2, 3, 4, 6))
+    byday, bymonthday = [], []
+
+    if freq == 'WEEKLY' and rng.random() < 0.7:
+        byday = [(0, wd) for wd in rng.sample(range(7), rng.randint(1, 4))]
+    elif freq == 'DAILY' and rng.random() < 0.4:
+        byday = [(0, wd) for wd in rng.sample(range(7), rng.randint(2, 6))]
+    elif freq == 'MONTHLY':
+        choice = rng.random()
+        if choice < 0.35:
+            bymonthday = rng.sample([1, 2, 10, 15, 28, 29, 30, 31, -1, -2], rng.randint(1, 3))
+        elif choice < 0.7:
+            byday = [(rng.choice((0, 1, 2, 3, 4, 5, -1, -2)), rng.randrange(7)) for _ in range(rng.randint(1, 2))]
+        elif choice < 0.8:
+            bymonthday = [rng.randint(1, 20)]
+            byday = [(0, wd) for wd in rng.sample(range(7), 3)]
+
+    count = until = None
+    ending = rng.random()
+    if ending < 0.3:
+        count = rng.randint(1, 40)
+    elif ending < 0.6:
+        until = start + timedelta(days=rng.randint(0, 400), hours=rng.randint(0, 23))
+
+    return RecurrenceRule(freq, interval=interval, byday=byday, bymonthday=bymonthday, count=count, until=until)
+
+
+def check(args):
+    rng = random.Random(args.seed)
+    failures = []
+
+    def fail(rule, start, message):
+        failures.append(f"{rule} start={start:%Y-%m-%d %H:%M}: {message}")
+
+    try:
+        from dateutil.rrule import rrulestr
+    except ImportError:
+        rrulestr = None
+        print("⚠️ python-dateutil not installed; skipping the dateutil cross-check")
+
+    for _ in range(args.rules):
+        start = datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 900), minutes=rng.randrange(0, 24 * 60, 15))
+        rule = random_rule(rng, start)
+
+        # Round trip through the RRULE string
+        if RecurrenceRule.parse(str(rule)) != rule:
+            fail(rule, start, 'parse(str(rule)) differs')
+
+        # Both expansions bounded the same way: the first N occurrences within the horizon
+        expected = reference_occurrences(rule, start, args.occurrences)
+        horizon = start + timedelta(days=HORIZON_DAYS)
+        actual = list(islice(takewhile(lambda o: o < horizon, rule.occurrences(start)), args.occurrences))
+        if actual != expected:
+            fail(rule, start, f'expansion differs from reference: {actual[:5]} vs {expected[:5]}')
+            continue
+
+        # Resuming from any occurrence gives the next one
+        for i, occurrence in enumerate(expected):
+            resumed = rule.next_after(start, occurrence, index=i + 1)
+            wanted = expected[i + 1] if i + 1 < len(expected) else None
+            if wanted is not None and resumed != wanted:
+                fail(rule, start, f'next_after({occurrence}) = {resumed}, expected {wanted}')
+                break
+            if wanted is None and rule.count is not None and len(expected) == rule.count and resumed is not None:
+                fail(rule, start, f'COUNT={rule.count} exceeded: {resumed}')
+                break
+
+        # Resuming from an arbitrary instant (ignoring COUNT)
+        if expected:
+            probe = start + timedelta(minutes=rng.randint(0, int((expected[-1] - start).total_seconds() // 60)))
+            wanted = next((o for o in expected if o > probe), None)
+            uncounted = RecurrenceRule(rule.freq, rule.interval, rule.byday, rule.bymonthday, until=rule.until)
+            resumed = uncounted.next_after(start, probe)
+            if wanted is not None and resumed != wanted:
+                fail(rule, start, f'next_after(probe {probe}) = {resumed}, expected {wanted}')
+
+        if rule.until is not None and any(o > rule.until for o in actual):
+            fail(rule, start, 'occurrence after UNTIL')
+        if any(b <= a for a, b in zip(actual, actual[1:])):
+            fail(rule, start, 'occurrences not strictly increasing')
+
+        # dateutil drops the plain weekdays when BYDAY mixes them with ordinals
+        # (MO,3FR); the brute-force reference above covers that case
+        mixed_byday = len({bool(n) for n, _ in rule.byday}) > 1
+        if rrulestr is not None and not mixed_byday:
+            reference = rrulestr(str(rule), dtstart=start)
+            dateutil_occurrences = list(islice(takewhile(lambda o: o < horizon, reference), args.occurrences))
+            if dateutil_occurrences != expected:
+                fail(rule, start, f'dateutil disagrees: {dateutil_occurrences[:5]} vs {expected[:5]}')
+
+        # Walking a UTC cursor with advance() in a random zone visits every occurrence
+        zone = rng.choice(ZONES)
+        start_utc = to_utc(start, zone)
+        walked, fired_count = [], 0
+        fire = to_utc(expected[0], zone) if expected else None
+        while fire is not None and len(walked) < len(expected):
+            walked.append(fire)
+            fired_count += 1
+            fire, fired_count = advance(rule, start_utc, zone, fire, fired_count)
+        if walked != [to_utc(o, zone) for o in expected]:
+            fail(rule, start, f'advance() walk in {zone} differs')
+
+    # Descriptions shown on reminders, including days counted from the end of the month
+    for rrule, wanted in (
+        ('FREQ=MONTHLY;BYDAY=-2MO', 'Every month on 2nd-to-last Mon'),
+        ('FREQ=MONTHLY;BYDAY=-1FR,3TH', 'Every month on last Fri, 3rd Thu'),
+        ('FREQ=MONTHLY;BYDAY=-5SU', 'Every month on 5th-to-last Sun'),
+        ('FREQ=MONTHLY;BYMONTHDAY=-2', 'Every month on the 2nd-to-last day'),
+        ('FREQ=MONTHLY;BYMONTHDAY=1,15,-1,-3', 'Every month on day 1, 15 and the last, 3rd-to-last day'),
+    ):
+        described = RecurrenceRule.parse(rrule).describe()
+        if described != wanted:
+            failures.append(f'{rrule}: described as {described!r}, expected {wanted!r}')
+
+    # Wall time -> UTC -> wall time round trips outside DST gaps
+    for zone in ZONES:
+        for _ in range(200):
+            local = datetime(2025, 1, 1) + timedelta(minutes=rng.randrange(0, 365 * 24 * 60, 15))
+            if to_local(to_utc(local, zone), zone) != local:
+                offset_jump = to_utc(local + timedelta(hours=1), zone) - to_utc(local, zone)
+                if offset_jump == timedelta(hours=1):
+                    failures.append(f'{zone}: {local} did not round trip')
+
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Property checks for reminder recurrence rules')
+    parser.add_argument('--rules', type=int, default=2000)
+    parser.add_argument('--occurrences', type=int, default=60, help='Occurrences compared per rule')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    failures = check(args)
+    if failures:
+        print(f"❌ {len(failures)} failures")
+        for failure in failures[:20]:
+            print(f"   {failure}")
+        sys.exit(1)
+    print(f"✅ {args.rules} random rules match the reference expansion")
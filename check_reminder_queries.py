@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Check that loading reminders costs a fixed number of queries
+Seeds a scratch SQLite database with N due reminders (half for projects,
+half for tasks, each with its own recipient, project, task and template)
+and counts the SQL statements for two paths at several sizes:
+- dispatch: claiming the reminders and rendering their emails (no sending)
+- list: the /reminders page as an admin
+The count must not grow with N. With --lazy the same paths run without
+Reminder.with_targets(), showing the per-reminder lazy loads it replaces.
+Never touches DATABASE_URL.
+
+Usage:
+    python check_reminder_queries.py --sizes 10 50 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import nullcontext
+from datetime import datetime, date, timedelta
+from unittest import mock
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_reminder_queries.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from flask_login import login_user
+from sqlalchemy import event
+
+from app import app
+from models import db, User, Project, TaskTemplate, PromotorTask, Reminder
+from utils.reminder_scheduler import ReminderScheduler
+
+
+def seed(count):
+    """Create an admin and `count` due reminders with distinct targets"""
+    db.drop_all()
+    db.create_all()
+
+    admin = User(username='admin', email='admin@example.com', role='Admin')
+    admin.set_password('check')
+    db.session.add(admin)
+    db.session.flush()
+
+    due = datetime.utcnow() - timedelta(minutes=5)
+    today = date.today()
+    week = today.isocalendar()[1]
+    for i in range(count):
+        user = User(username=f'user{i}', email=f'user{i}@example.com', role='Manager')
+        user.set_password('check')
+        project = Project(name=f'Project {i}', owner=admin, start_date=today,
+                          expected_end_date=today + timedelta(days=30), status='In Progress')
+        db.session.add_all([user, project])
+        task = None
+        if i % 2:
+            template = TaskTemplate(name=f'Template {i}', created_by=admin.id)
+            db.session.add(template)
+            db.session.flush()
+            task = PromotorTask(template_id=template.id, promotor=user, project=project, created_by=admin.id,
+                                assigned_week=week, assigned_year=today.year, original_week=week,
+                                original_year=today.year, due_date=today)
+            db.session.add(task)
+        db.session.add(Reminder(reminder_type='task' if task else 'project', user=user,
+                                project=None if task else project, task=task,
+                                reminder_datetime=due, next_fire_at=due))
+    admin_id = admin.id
+    db.session.commit()
+    db.session.expunge_all()
+    return admin_id
+
+
+def count_statements(action):
+    statements = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    try:
+        action()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+    return statements['count']
+
+
+def dispatch_path():
+    scheduler = ReminderScheduler(digest_window=0)
+    reminders = scheduler.claim_reminders('check')
+    requests = []
+    for reminder in reminders:
+        request, _, errors = scheduler.build_request([reminder])
+        if errors:
+            raise AssertionError(f'Reminder #{reminder.id} not renderable: {errors}')
+        requests.append(request)
+    rendered = scheduler.email_service.render_many(requests)
+    assert len(rendered) == len(reminders) and all(message for message, _ in rendered)
+
+
+def list_path(admin_id):
+    with app.test_request_context('/reminders'):
+        login_user(db.session.get(User, admin_id))
+        app.view_functions['reminders_list']()
+
+
+def measure(sizes, lazy):
+    counts = {}
+    patch = mock.patch.object(Reminder, 'with_targets', classmethod(lambda cls: ())) if lazy else nullcontext()
+    with patch:
+        for size in sizes:
+            admin_id = seed(size)
+            dispatch = count_statements(dispatch_path)
+            db.session.remove()
+            listing = count_statements(lambda: list_path(admin_id))
+            db.session.remove()
+            counts[size] = (dispatch, listing)
+            print(f"{'lazy' if lazy else 'eager':<6} {size:6d} reminders {dispatch:6d} SQL to dispatch {listing:6d} SQL to list")
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check reminder loading uses a constant number of queries')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--lazy', action='store_true', help='Also run without the eager loader, for comparison')
+    args = parser.parse_args()
+
+    with app.app_context():
+        counts = measure(args.sizes, lazy=False)
+        if args.lazy:
+            measure(args.sizes, lazy=True)
+        db.session.remove()
+        db.drop_all()
+
+    if len(set(counts.values())) > 1:
+        print(f"❌ Query count grows with the number of reminders: {counts}")
+        sys.exit(1)
+    print(f"✅ Constant query count for {', '.join(map(str, args.sizes))} reminders")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Check the promotor analytics aggregates against the task history
+Seeds a scratch SQLite database with tasks spread over promotors, weeks,
+statuses and lags, runs a full refresh, then changes some tasks and runs an
+incremental one; after each, every promotor_week_stats row must match the
+same figures counted directly from promotor_tasks, and a second
+incremental refresh must recompute nothing. Also times the refreshes and
+counts the statements a chart read costs. Never touches DATABASE_URL.
+
+Usage:
+    python check_task_analytics.py --tasks 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_task_analytics.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from sqlalchemy import event
+
+from app import app
+from models import db, User, TaskTemplate, PromotorTask, PromotorWeekStats
+from utils.iso_weeks import current_week, shift, week_id
+from utils import task_analytics
+from utils.task_analytics import LAG_BUCKETS, lag_distribution, promotor_summary, refresh_analytics, weekly_trend
+
+STATUSES = ['Pending', 'In Progress', 'Overdue', 'Completed', 'Completed']
+WEEKS = 26
+
+
+def seed(count, rng):
+    """Create a manager, 20 promotors and `count` tasks over the last WEEKS weeks"""
+    db.drop_all()
+    db.create_all()
+
+    manager = User(username='manager', email='manager@example.com', role='Manager')
+    promotors = [User(username=f'promotor{i}', email=f'promotor{i}@example.com', role='Promotor') for i in range(20)]
+    for user in [manager] + promotors:
+        user.set_password('check')
+    db.session.add_all([manager] + promotors)
+    db.session.flush()
+    template = TaskTemplate(name='Template', created_by=manager.id)
+    db.session.add(template)
+    db.session.flush()
+
+    this_week = current_week()
+    rows = []
+    for _ in range(count):
+        original = shift(this_week, -rng.randrange(WEEKS))
+        lag = rng.choice([0, 0, 0, 1, 1, 2, 3, 5, 9, 30])
+        assigned = shift(original, rng.choice([0, 0, 1]))
+        status = rng.choice(STATUSES)
+        updated_at = datetime.utcnow() - timedelta(days=1, minutes=rng.randrange(60 * 24 * 7 * WEEKS))
+        rows.append({
+            'template_id': template.id,
+            'promotor_id': rng.choice(promotors).id,
+            'assigned_week': assigned.week, 'assigned_year': assigned.year,
+            'original_week': original.week, 'original_year': original.year,
+            'due_date': original.end,
+            'status': status,
+            'completed_date': datetime.combine(original.end - timedelta(days=rng.choice([0, 3, -2])), datetime.min.time())
+            if status == 'Completed' else None,
+            'lag_weeks': lag,
+            'created_by': manager.id,
+            'created_at': updated_at, 'updated_at': updated_at,
+        })
+    db.session.execute(PromotorTask.__table__.insert(), rows)
+    db.session.commit()
+
+
+def expected_stats():
+    """(promotor_id, week_id) -> figures, counted in Python from every task"""
+    expected = {}
+    for task in db.session.query(PromotorTask).yield_per(2000):
+        key = (task.promotor_id, week_id(task.original_year, task.original_week))
+        stats = expected.setdefault(key, {'assigned': 0, 'completed': 0, 'rolled_over': 0, 'on_time': 0,
+                                          'lag_sum': 0, 'lag_max': 0, 'histogram': [0] * len(LAG_BUCKETS)})
+        lag = task.lag_weeks or 0
+        stats['assigned'] += 1
+        stats['completed'] += task.status == 'Completed'
+        stats['rolled_over'] += (task.assigned_year, task.assigned_week) != (task.original_year, task.original_week)
+        stats['on_time'] += (task.status == 'Completed' and lag == 0
+                             and task.completed_date.date() <= task.due_date)
+        stats['lag_sum'] += lag
+        stats['lag_max'] = max(stats['lag_max'], lag)
+        stats['histogram'][max(i for i, lower in enumerate(LAG_BUCKETS) if lag >= lower)] += 1
+    db.session.remove()
+    return expected
+
+
+def compare():
+    expected = expected_stats()
+    actual = {(row.promotor_id, row.week_id): {
+        'assigned': row.assigned, 'completed': row.completed, 'rolled_over': row.rolled_over,
+        'on_time': row.on_time, 'lag_sum': row.lag_sum, 'lag_max': row.lag_max,
+        'histogram': row.get_lag_histogram()
+    } for row in PromotorWeekStats.query.all()}
+    db.session.remove()
+    mismatched = [key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)]
+    return [f'{len(mismatched)} of {len(expected)} promotor weeks differ from the tasks'] if mismatched else []
+
+
+def change_tasks(rng, changes):
+    """Complete, roll over or re-lag `changes` random tasks, as the app would (bumping updated_at)"""
+    this_week = current_week()
+    ids = [row[0] for row in db.session.query(PromotorTask.id).all()]
+    for task_id in rng.sample(ids, changes):
+        task = db.session.get(PromotorTask, task_id)
+        if task.status != 'Completed' and rng.random() < 0.5:
+            task.status = 'Completed'
+            task.completed_date = datetime.utcnow()
+        else:
+            task.assigned_week, task.assigned_year = this_week.week, this_week.year
+            task.lag_weeks = (task.lag_weeks or 0) + 1
+        task.updated_at = datetime.utcnow()
+    db.session.commit()
+    db.session.remove()
+
+
+def timed_refresh(**kwargs):
+    started = time.perf_counter()
+    result = refresh_analytics(**kwargs)
+    db.session.remove()
+    return result, time.perf_counter() - started
+
+
+def read_statements():
+    """Statements run by the three chart reads"""
+    statements = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    try:
+        trend = weekly_trend(WEEKS)
+        promotor_summary(WEEKS)
+        distribution = lag_distribution(WEEKS)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+    db.session.remove()
+    return statements['count'], trend, distribution
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the analytics aggregates match the task history')
+    parser.add_argument('--tasks', type=int, default=20000, help='Tasks to seed')
+    parser.add_argument('--changes', type=int, default=300, help='Tasks changed before the incremental refresh')
+    args = parser.parse_args()
+    rng = random.Random(46)
+    # Nothing commits late here, so an idle refresh should recompute nothing
+    task_analytics.WATERMARK_OVERLAP = timedelta(0)
+
+    problems = []
+    with app.app_context():
+        seed(args.tasks, rng)
+
+        result, elapsed = timed_refresh(full=True)
+        print(f"full refresh        {result['groups_refreshed']:6,d} promotor weeks {elapsed * 1000:8.1f} ms")
+        problems += compare()
+
+        change_tasks(rng, args.changes)
+        result, elapsed = timed_refresh()
+        print(f"incremental refresh {result['groups_refreshed']:6,d} promotor weeks {elapsed * 1000:8.1f} ms")
+        problems += compare()
+        if result['full'] or result['groups_refreshed'] > args.changes:
+            problems.append(f"incremental refresh recomputed {result['groups_refreshed']} promotor weeks")
+
+        result, _ = timed_refresh()
+        if result['groups_refreshed']:
+            problems.append(f"idle refresh recomputed {result['groups_refreshed']} promotor weeks")
+
+        statements, trend, distribution = read_statements()
+        print(f"chart reads         {statements:6d} SQL; p50 lag {distribution['p50_lag']}, p90 {distribution['p90_lag']}")
+        if statements != 3:
+            problems.append(f'chart reads took {statements} queries')
+        if sum(week['assigned'] for week in trend) != args.tasks:
+            problems.append('weekly trend does not account for every task')
+        db.session.remove()
+        db.drop_all()
+
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"✅ Aggregates over {args.tasks:,} tasks match a full scan after full and incremental refreshes")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Check that the weekly task board renders with one query
+Seeds a scratch SQLite database with a week of tasks (each with its own
+template and project, spread over promotors, statuses and priorities, plus
+tasks in other weeks) and renders /tasks/weekly as a manager and as a
+promotor, counting SQL statements. Also checks every task lands in its
+status column, most urgent priority first. Never touches DATABASE_URL.
+
+Usage:
+    python check_task_board_queries.py --tasks 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCRATCH_DB = os.path.join(tempfile.gettempdir(), 'vcore_task_board.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+os.environ.setdefault('ENVIRONMENT', 'production')  # no SQL echo
+
+from flask_login import login_user
+from sqlalchemy import event
+
+from app import app
+from models import db, User, Project, TaskTemplate, PromotorTask
+from utils.iso_weeks import current_week, shift
+from utils.task_board import BOARD_COLUMNS, PRIORITY_ORDER, get_weekly_board
+
+STATUSES = [status for status, _ in BOARD_COLUMNS]
+PRIORITIES = list(PRIORITY_ORDER)
+
+
+def seed(count):
+    """Create a manager, 20 promotors and `count` tasks this week (and as many last week)"""
+    db.drop_all()
+    db.create_all()
+
+    manager = User(username='manager', email='manager@example.com', role='Manager')
+    promotors = [User(username=f'promotor{i}', email=f'promotor{i}@example.com', role='Promotor') for i in range(20)]
+    for user in [manager] + promotors:
+        user.set_password('check')
+    db.session.add_all([manager] + promotors)
+    db.session.flush()
+
+    this_week = current_week()
+    rows = []
+    for i in range(count * 2):
+        week = this_week if i < count else shift(this_week, -1)
+        template = TaskTemplate(name=f'Template {i}', created_by=manager.id)
+        project = Project(name=f'Project {i}', owner_id=manager.id, start_date=week.start,
+                          expected_end_date=week.end + timedelta(days=30), status='In Progress')
+        db.session.add_all([template, project])
+        db.session.flush()
+        rows.append({
+            'template_id': template.id,
+            'project_id': project.id if i % 3 else None,
+            'promotor_id': promotors[i % len(promotors)].id,
+            'assigned_week': week.week, 'assigned_year': week.year,
+            'original_week': week.week, 'original_year': week.year,
+            'due_date': week.end - timedelta(days=i % 7),
+            'status': STATUSES[i % len(STATUSES)],
+            'priority': PRIORITIES[i % len(PRIORITIES)],
+            'lag_weeks': i % 3,
+            'created_by': manager.id,
+            'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow(),
+        })
+    db.session.execute(PromotorTask.__table__.insert(), rows)
+    db.session.commit()
+    return manager.id, promotors[0].id
+
+
+def render_board(user_id):
+    """Statements and seconds to render the board as user_id (after loading the user)"""
+    statements = {'count': 0}
+
+    def count_statement(*_):
+        statements['count'] += 1
+
+    with app.test_request_context('/tasks/weekly'):
+        login_user(db.session.get(User, user_id))
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            started = time.perf_counter()
+            html = app.view_functions['tasks_weekly']()
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+    db.session.remove()
+    return statements['count'], elapsed, html
+
+
+def check_grouping(count):
+    board = get_weekly_board(current_week())
+    problems = []
+    if sum(len(tasks) for tasks in board.values()) != count:
+        problems.append(f'board holds {sum(len(tasks) for tasks in board.values())} tasks, expected {count}')
+    for status, tasks in board.items():
+        if any(task['status'] != status for task in tasks):
+            problems.append(f'{status} column holds other statuses')
+        keys = [(PRIORITY_ORDER[task['priority']], task['due_date'], task['id']) for task in tasks]
+        if keys != sorted(keys):
+            problems.append(f'{status} column not sorted by priority, due date')
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the weekly task board renders with one query')
+    parser.add_argument('--tasks', type=int, default=2000, help='Tasks in the current week')
+    args = parser.parse_args()
+
+    with app.app_context():
+        manager_id, promotor_id = seed(args.tasks)
+        problems = check_grouping(args.tasks)
+        for label, user_id in (('manager', manager_id), ('promotor', promotor_id)):
+            statements, elapsed, html = render_board(user_id)
+            print(f"{label:<10} {statements:4d} SQL {elapsed * 1000:8.1f} ms {len(html):10,d} bytes of HTML")
+            if statements != 1:
+                problems.append(f'{label} board took {statements} queries')
+        db.session.remove()
+        db.drop_all()
+
+    if problems:
+        print(f"❌ {'; '.join(problems)}")
+        sys.exit(1)
+    print(f"✅ A {args.tasks:,}-task week renders with one query")
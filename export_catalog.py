@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Export the product catalog to CSV, XLSX or NDJSON
+Streams rows from the database so memory stays flat on large catalogs
+
+Usage:
+    python export_catalog.py --format csv --output catalog.csv
+    python export_catalog.py --format ndjson --category "Shower Enclosure"
+"""
+import argparse
+
+from app import app
+from utils.catalog_export import CatalogExporter, EXPORT_FORMATS
+
+
+def export_catalog(export_format, output=None, category=None, include_inactive=False):
+    """Export catalog products to a local file"""
+    with app.app_context():
+        exporter = CatalogExporter(category=category, include_inactive=include_inactive)
+        output = output or CatalogExporter.filename(export_format)
+
+        print(f"📦 Exporting catalog as {export_format.upper()} to {output}...")
+        count = exporter.export_to_file(export_format, output)
+        print(f"✅ Exported {count} products")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the product catalog')
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--output', help='Output file path (default: timestamped filename)')
+    parser.add_argument('--category', help='Only export products in this category')
+    parser.add_argument('--include-inactive', action='store_true', help='Include inactive products')
+    args = parser.parse_args()
+
+    export_catalog(args.format, args.output, args.category, args.include_inactive)
@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed
-from wtforms import StringField, PasswordField, SelectField, DateField, TextAreaField, BooleanField
-from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional, ValidationError
+from wtforms import StringField, PasswordField, SelectField, SelectMultipleField, DateField, TextAreaField, BooleanField, IntegerField
+from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional, ValidationError, NumberRange
 from models import User
 from datetime import datetime
 
@@ -87,6 +87,23 @@ class TaskAssignmentForm(FlaskForm):
     comments = TextAreaField('Comments', validators=[Optional()])
 
 
+class BulkTaskAssignmentForm(FlaskForm):
+    """Bulk task assignment form: every template x user x week"""
+    template_ids = SelectMultipleField('Task Templates', coerce=int, validators=[DataRequired()])
+    task_name = StringField('Task Name', validators=[Optional(), Length(max=200)])
+    promotor_ids = SelectMultipleField('Assign to Users', coerce=int, validators=[DataRequired()])
+    project_id = SelectField('Link to Project (Optional)', coerce=int, validators=[Optional()])
+    first_week = DateField('Starting Week', validators=[DataRequired()], format='%Y-%m-%d')  # Any day in the week
+    week_count = IntegerField('Number of Weeks', default=1, validators=[DataRequired(), NumberRange(min=1, max=26)])
+    due_weekday = SelectField('Due On', coerce=int, default=6,
+                              choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+                                       (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])
+    priority = SelectField('Priority', 
+                          choices=[('High', 'High'), ('Medium', 'Medium'), ('Low', 'Low')],
+                          default='Medium', validators=[DataRequired()])
+    comments = TextAreaField('Comments', validators=[Optional()])
+
+
 class TaskUpdateForm(FlaskForm):
     """Task update form"""
     status = SelectField('Status', 
@@ -70,6 +70,7 @@ def main():
             connection.commit()
             
             print(f"\n✅ Successfully updated {updated_count} product descriptions!")
+            print("ℹ️  Run `python migrate_add_wordpress_payload_hash.py` so WordPress sync picks up the changes")
             
     except Exception as e:
         connection.rollback()
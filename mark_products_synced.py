@@ -61,6 +61,8 @@ def mark_all_synced():
         
         for product in products_to_update:
             product.last_wordpress_sync = now
+            product.refresh_wordpress_payload_hash()
+            product.wordpress_synced_hash = product.wordpress_payload_hash
         
         db.session.commit()
         
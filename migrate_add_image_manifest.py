@@ -0,0 +1,34 @@
+"""Add the image manifest cache to products table
+
+Stores the content hash and size of each product image, keyed by URL, so
+WordPress syncs can skip images the site already holds. Entries are filled
+in automatically the first time a product is synced.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Add image_manifest column to products table"""
+    
+    with db.engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE products 
+                ADD COLUMN image_manifest TEXT DEFAULT NULL
+            """))
+            conn.commit()
+            print("✓ Added image_manifest column to products table")
+        except Exception as e:
+            print(f"⚠ image_manifest column may already exist: {e}")
+    
+    print("\n✅ Migration completed successfully!")
+    print("Image hashes will be recorded on the next WordPress sync.")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
@@ -0,0 +1,32 @@
+"""Add the indexes behind the paginated projects list
+
+The list pages through projects newest first on (created_at, id), and
+summarises each page's open tasks by project and status.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Create idx_project_created and idx_task_project_status"""
+    
+    with db.engine.connect() as conn:
+        for name, table, columns in (('idx_project_created', 'projects', 'created_at, id'),
+                                     ('idx_task_project_status', 'promotor_tasks', 'project_id, status')):
+            try:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+                conn.commit()
+                print(f"✓ Added {name} index")
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠ {name} may already exist: {e}")
+    
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
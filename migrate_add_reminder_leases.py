@@ -0,0 +1,54 @@
+"""Add dispatch lease columns to reminders
+
+A dispatcher claims due reminders by moving them to 'sending' with its own
+lease_owner and a lease_until deadline, so overlapping cron runs never
+send the same reminder twice. idx_reminder_status_lease finds expired
+leases to reclaim.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Add lease_owner, lease_until and idx_reminder_status_lease to reminders"""
+    
+    with db.engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE reminders 
+                ADD COLUMN lease_owner VARCHAR(100) NULL
+            """))
+            conn.commit()
+            print("✓ Added lease_owner column")
+        except Exception as e:
+            print(f"⚠ lease_owner column may already exist: {e}")
+        
+        try:
+            conn.execute(text("""
+                ALTER TABLE reminders 
+                ADD COLUMN lease_until DATETIME NULL
+            """))
+            conn.commit()
+            print("✓ Added lease_until column")
+        except Exception as e:
+            print(f"⚠ lease_until column may already exist: {e}")
+        
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_reminder_status_lease 
+                ON reminders (status, lease_until)
+            """))
+            conn.commit()
+            print("✓ Added idx_reminder_status_lease index")
+        except Exception as e:
+            print(f"⚠ idx_reminder_status_lease may already exist: {e}")
+    
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
@@ -0,0 +1,61 @@
+"""Add recurrence rule and occurrence cursor columns to reminders
+
+A recurring reminder is now one row: recurrence_rule (RRULE) and
+recurrence_timezone say when it repeats, next_fire_at is the next
+occurrence due and occurrence_count how many have been handled. The
+dispatcher's due-query reads next_fire_at through idx_reminder_status_fire.
+Existing pending reminders are backfilled to fire at their reminder_datetime.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Add the recurrence columns and idx_reminder_status_fire, then backfill next_fire_at"""
+
+    columns = (
+        ('recurrence_rule', 'VARCHAR(255) NULL'),
+        ('recurrence_timezone', 'VARCHAR(50) NULL'),
+        ('next_fire_at', 'DATETIME NULL'),
+        ('occurrence_count', 'INTEGER NOT NULL DEFAULT 0'),
+    )
+
+    with db.engine.connect() as conn:
+        for name, definition in columns:
+            try:
+                conn.execute(text(f"""
+                    ALTER TABLE reminders
+                    ADD COLUMN {name} {definition}
+                """))
+                conn.commit()
+                print(f"✓ Added {name} column")
+            except Exception as e:
+                print(f"⚠ {name} column may already exist: {e}")
+
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_reminder_status_fire
+                ON reminders (status, next_fire_at)
+            """))
+            conn.commit()
+            print("✓ Added idx_reminder_status_fire index")
+        except Exception as e:
+            print(f"⚠ idx_reminder_status_fire may already exist: {e}")
+
+        result = conn.execute(text("""
+            UPDATE reminders
+            SET next_fire_at = reminder_datetime
+            WHERE status IN ('pending', 'sending') AND next_fire_at IS NULL
+        """))
+        conn.commit()
+        print(f"✓ Backfilled next_fire_at for {result.rowcount} pending reminders")
+
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+
+    with app.app_context():
+        migrate()
@@ -0,0 +1,54 @@
+"""Add retry tracking columns to reminders
+
+Transient send failures (throttling, SES outages, network errors) now
+retry with exponential backoff: attempt_count counts failed attempts at
+the current occurrence and next_attempt_at is when the next one is due.
+The dispatcher finds due retries through idx_reminder_status_attempt.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Add attempt_count, next_attempt_at and idx_reminder_status_attempt to reminders"""
+
+    with db.engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE reminders
+                ADD COLUMN attempt_count INTEGER NOT NULL DEFAULT 0
+            """))
+            conn.commit()
+            print("✓ Added attempt_count column")
+        except Exception as e:
+            print(f"⚠ attempt_count column may already exist: {e}")
+
+        try:
+            conn.execute(text("""
+                ALTER TABLE reminders
+                ADD COLUMN next_attempt_at DATETIME NULL
+            """))
+            conn.commit()
+            print("✓ Added next_attempt_at column")
+        except Exception as e:
+            print(f"⚠ next_attempt_at column may already exist: {e}")
+
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_reminder_status_attempt
+                ON reminders (status, next_attempt_at)
+            """))
+            conn.commit()
+            print("✓ Added idx_reminder_status_attempt index")
+        except Exception as e:
+            print(f"⚠ idx_reminder_status_attempt may already exist: {e}")
+
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+
+    with app.app_context():
+        migrate()
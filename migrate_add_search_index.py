@@ -0,0 +1,61 @@
+"""
+Migration script to add the full-text search index tables
+Inverted index over daily updates and task comments, kept up to date on
+write by utils.search_index
+"""
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    """Add search_documents and search_postings tables"""
+    with app.app_context():
+        print("Creating search_documents table...")
+        
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS search_documents (
+                entity_type VARCHAR(10) NOT NULL,
+                entity_id INT NOT NULL,
+                user_id INT NULL,
+                project_id INT NULL,
+                doc_date DATE NOT NULL,
+                length INT NOT NULL,
+                indexed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                
+                PRIMARY KEY (entity_type, entity_id),
+                INDEX ix_search_documents_user_id (user_id),
+                INDEX ix_search_documents_project_id (project_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        
+        print("Creating search_postings table...")
+        
+        # Tokens are folded already; a binary collation keeps distinct tokens distinct
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS search_postings (
+                token VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+                entity_type VARCHAR(10) NOT NULL,
+                entity_id INT NOT NULL,
+                doc_date DATE NOT NULL,
+                term_frequency INT NOT NULL,
+                positions TEXT NOT NULL,
+                
+                PRIMARY KEY (token, entity_type, entity_id),
+                INDEX idx_posting_entity (entity_type, entity_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        
+        db.session.commit()
+        print("✅ Search index tables created successfully!")
+        
+        # Verify tables were created
+        for table in ('search_documents', 'search_postings'):
+            result = db.session.execute(text(f"SHOW TABLES LIKE '{table}'"))
+            if result.fetchone():
+                print(f"✅ {table} found")
+            else:
+                print(f"❌ Migration failed - {table} not found")
+        
+        print("Now run: python3 rebuild_search_index.py")
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,72 @@
+"""
+Migration script to add the promotor analytics tables
+Per promotor and ISO week task aggregates, refreshed incrementally from
+promotor_tasks by utils.task_analytics, and the lease row that lets only
+one refresh run at a time
+"""
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    """Add promotor_week_stats, analytics_refresh_state and the promotor_tasks indexes the refresh reads"""
+    with app.app_context():
+        print("Creating promotor_week_stats table...")
+
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS promotor_week_stats (
+                promotor_id INT NOT NULL,
+                week_id INT NOT NULL,
+                iso_year INT NOT NULL,
+                iso_week INT NOT NULL,
+                assigned INT NOT NULL DEFAULT 0,
+                completed INT NOT NULL DEFAULT 0,
+                rolled_over INT NOT NULL DEFAULT 0,
+                on_time INT NOT NULL DEFAULT 0,
+                lag_sum INT NOT NULL DEFAULT 0,
+                lag_max INT NOT NULL DEFAULT 0,
+                lag_histogram TEXT NULL,
+                source_updated_at DATETIME NULL,
+                refreshed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+                PRIMARY KEY (promotor_id, week_id),
+                INDEX idx_week_stats_week (week_id),
+                INDEX idx_week_stats_source_updated (source_updated_at),
+
+                FOREIGN KEY (promotor_id) REFERENCES users(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        db.session.commit()
+        print("✅ promotor_week_stats table created successfully!")
+
+        print("Creating analytics_refresh_state table...")
+
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS analytics_refresh_state (
+                id INT NOT NULL,
+                lease_owner VARCHAR(100) NULL,
+                lease_until DATETIME NULL,
+                refreshed_at DATETIME NULL,
+
+                PRIMARY KEY (id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        db.session.commit()
+        print("✅ analytics_refresh_state table created successfully!")
+
+        for name, columns in (('idx_task_updated_at', 'updated_at'),
+                              ('idx_task_promotor_original_week', 'promotor_id, original_year, original_week')):
+            try:
+                db.session.execute(text(f"CREATE INDEX {name} ON promotor_tasks ({columns})"))
+                db.session.commit()
+                print(f"✓ Added {name} index")
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠ {name} may already exist: {e}")
+
+        # First fill: every (promotor, week) group from the existing tasks
+        from utils.task_analytics import refresh_analytics
+        result = refresh_analytics(full=True)
+        print(f"✅ Aggregated {result['groups_refreshed']} promotor weeks in {result['elapsed_seconds']}s")
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,33 @@
+"""Add a composite week/promotor/status index for the weekly task board
+
+The board reads one week's tasks (one promotor's, for non-managers) with
+their status; idx_task_week_promotor_status answers that from the index
+prefix instead of intersecting the single-column week and year indexes.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Create idx_task_week_promotor_status"""
+    
+    with db.engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_task_week_promotor_status
+                ON promotor_tasks (assigned_year, assigned_week, promotor_id, status)
+            """))
+            conn.commit()
+            print("✓ Added idx_task_week_promotor_status index")
+        except Exception as e:
+            print(f"⚠ idx_task_week_promotor_status may already exist: {e}")
+    
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
@@ -0,0 +1,96 @@
+"""Add content-hash change detection for WordPress sync
+
+Adds wordpress_payload_hash (hash of what the storefront would show) and
+wordpress_synced_hash (hash of what was last pushed) to products, plus a
+covering index for the pending-sync query. Backfills both hashes: products
+that were up to date under the old updated_at rule are marked as synced.
+
+Safe to re-run, e.g. after editing products with raw SQL scripts that
+bypass the ORM (import_product_descriptions.py, watermark_*.py).
+"""
+
+from models import db, Product
+from sqlalchemy import text, update, bindparam
+from utils.wordpress_sync import prepare_product_payload, payload_hash
+
+
+def migrate():
+    """Add hash columns and index, then backfill hashes"""
+    
+    with db.engine.connect() as conn:
+        for column in ('wordpress_payload_hash', 'wordpress_synced_hash'):
+            try:
+                conn.execute(text(f"""
+                    ALTER TABLE products 
+                    ADD COLUMN {column} VARCHAR(64) DEFAULT NULL
+                """))
+                conn.commit()
+                print(f"✓ Added {column} column to products table")
+            except Exception as e:
+                print(f"⚠ {column} column may already exist: {e}")
+        
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_wordpress_sync_hash 
+                ON products (is_active, wordpress_payload_hash, wordpress_synced_hash)
+            """))
+            conn.commit()
+            print("✓ Added idx_wordpress_sync_hash index")
+        except Exception as e:
+            print(f"⚠ idx_wordpress_sync_hash may already exist: {e}")
+    
+    backfill_hashes()
+    
+    print("\n✅ Migration completed successfully!")
+    print("Pending WordPress sync is now decided by payload hash.")
+
+
+def backfill_hashes(batch_size=500):
+    """Recompute payload hashes for every product in batches
+    
+    Uses a Core UPDATE so updated_at and the ORM write hooks are untouched.
+    """
+    products_table = Product.__table__
+    statement = (
+        update(products_table)
+        .where(products_table.c.id == bindparam('product_id'))
+        .values(
+            wordpress_payload_hash=bindparam('payload_hash'),
+            wordpress_synced_hash=bindparam('synced_hash'),
+            updated_at=products_table.c.updated_at
+        )
+    )
+    
+    updated = 0
+    marked_synced = 0
+    last_id = 0
+    while True:
+        products = Product.query.filter(Product.id > last_id).order_by(Product.id).limit(batch_size).all()
+        if not products:
+            break
+        
+        params = []
+        for product in products:
+            current_hash = payload_hash(prepare_product_payload(product))
+            synced_hash = product.wordpress_synced_hash
+            
+            # Legacy rule: synced and not edited since -> storefront already matches
+            if synced_hash is None and product.last_wordpress_sync and product.updated_at <= product.last_wordpress_sync:
+                synced_hash = current_hash
+                marked_synced += 1
+            
+            params.append({'product_id': product.id, 'payload_hash': current_hash, 'synced_hash': synced_hash})
+        
+        db.session.execute(statement, params)
+        db.session.commit()
+        updated += len(products)
+        last_id = products[-1].id
+    
+    print(f"✓ Backfilled payload hashes for {updated} products ({marked_synced} marked as already synced)")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
@@ -0,0 +1,66 @@
+"""
+Migration script to add the WordPress sync job tables
+Syncs run as queued background jobs with per-product outcomes
+"""
+from app import app, db
+from sqlalchemy import text
+
+def migrate():
+    """Add wordpress_sync_jobs and wordpress_sync_job_items tables"""
+    with app.app_context():
+        print("Creating wordpress_sync_jobs table...")
+        
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS wordpress_sync_jobs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                incremental BOOLEAN NOT NULL DEFAULT TRUE,
+                total INT NULL,
+                synced INT NOT NULL DEFAULT 0,
+                failed INT NOT NULL DEFAULT 0,
+                worker_id VARCHAR(100) NULL,
+                heartbeat_at DATETIME NULL,
+                error_message TEXT NULL,
+                created_by INT NULL,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                started_at DATETIME NULL,
+                finished_at DATETIME NULL,
+                
+                INDEX idx_sync_job_status (status, id),
+                
+                FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        
+        print("Creating wordpress_sync_job_items table...")
+        
+        db.session.execute(text("""
+            CREATE TABLE IF NOT EXISTS wordpress_sync_job_items (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                job_id INT NOT NULL,
+                product_id INT NOT NULL,
+                status VARCHAR(20) NOT NULL,
+                wordpress_id INT NULL,
+                error TEXT NULL,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                
+                INDEX idx_sync_job_item_status (job_id, status),
+                INDEX idx_sync_job_item_product (job_id, product_id),
+                
+                FOREIGN KEY (job_id) REFERENCES wordpress_sync_jobs(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """))
+        
+        db.session.commit()
+        print("✅ WordPress sync job tables created successfully!")
+        
+        # Verify tables were created
+        for table in ('wordpress_sync_jobs', 'wordpress_sync_job_items'):
+            result = db.session.execute(text(f"SHOW TABLES LIKE '{table}'"))
+            if result.fetchone():
+                print(f"✅ {table} found")
+            else:
+                print(f"❌ Migration failed - {table} not found")
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,42 @@
+"""Replace the WordPress pending-sync index with a covering sync status index
+
+idx_wordpress_sync_status extends idx_wordpress_sync_hash with wordpress_id
+and last_wordpress_sync, so the sync status aggregate on the admin page is
+answered from the index without touching product rows.
+"""
+
+from models import db
+from sqlalchemy import text
+
+
+def migrate():
+    """Create idx_wordpress_sync_status and drop idx_wordpress_sync_hash"""
+    
+    with db.engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                CREATE INDEX idx_wordpress_sync_status 
+                ON products (is_active, wordpress_payload_hash, wordpress_synced_hash, 
+                             wordpress_id, last_wordpress_sync)
+            """))
+            conn.commit()
+            print("✓ Added idx_wordpress_sync_status index")
+        except Exception as e:
+            print(f"⚠ idx_wordpress_sync_status may already exist: {e}")
+        
+        # The new index has the old one as a prefix
+        try:
+            conn.execute(text("DROP INDEX idx_wordpress_sync_hash ON products"))
+            conn.commit()
+            print("✓ Dropped idx_wordpress_sync_hash index")
+        except Exception as e:
+            print(f"⚠ idx_wordpress_sync_hash may already be gone: {e}")
+    
+    print("\n✅ Migration completed successfully!")
+
+
+if __name__ == '__main__':
+    from app import app
+    
+    with app.app_context():
+        migrate()
@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import configure_mappers, joinedload
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
@@ -63,6 +65,12 @@ class Project(db.Model):
     # Relationships
     tasks = db.relationship('PromotorTask', backref='project', lazy=True)
     
+    # Indexes
+    __table_args__ = (
+        # The projects list: newest first, a keyset page at a time
+        db.Index('idx_project_created', 'created_at', 'id'),
+    )
+    
     def is_overdue(self):
         """Check if project is overdue"""
         if self.status != 'Completed' and self.expected_end_date:
@@ -135,23 +143,21 @@ class PromotorTask(db.Model):
     # Relationships
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_tasks')
     
+    # Indexes
+    __table_args__ = (
+        # The weekly board: a week's tasks, optionally one promotor's, by status
+        db.Index('idx_task_week_promotor_status', 'assigned_year', 'assigned_week', 'promotor_id', 'status'),
+        # Analytics: tasks changed since the refresh watermark, then their (promotor, original week) groups
+        db.Index('idx_task_updated_at', 'updated_at'),
+        db.Index('idx_task_promotor_original_week', 'promotor_id', 'original_year', 'original_week'),
+        # The projects list: a page of projects' open tasks
+        db.Index('idx_task_project_status', 'project_id', 'status'),
+    )
+    
     def calculate_lag(self):
         """Calculate lag in weeks from original assignment"""
-        from datetime import datetime
-        current_date = datetime.now()
-        current_week = current_date.isocalendar()[1]
-        current_year = current_date.isocalendar()[0]
-        
-        # Calculate total weeks difference
-        if current_year == self.original_year:
-            lag = current_week - self.original_week
-        else:
-            # Handle year transitions
-            weeks_in_original_year = 52  # Simplified, can be 52 or 53
-            lag = (weeks_in_original_year - self.original_week) + current_week
-            lag += (current_year - self.original_year - 1) * 52
-        
-        return max(0, lag)
+        from utils.iso_weeks import lag_weeks
+        return lag_weeks(self.original_year, self.original_week)
     
     def update_lag(self):
         """Update the lag_weeks field"""
@@ -160,9 +166,14 @@ class PromotorTask(db.Model):
     
     def get_lag_badge_class(self):
         """Get Bootstrap badge class based on lag"""
-        if self.lag_weeks == 0:
+        return self.lag_badge_class(self.lag_weeks)
+    
+    @staticmethod
+    def lag_badge_class(lag_weeks):
+        """Bootstrap badge class for a lag in weeks"""
+        if lag_weeks == 0:
             return 'success'  # Green
-        elif self.lag_weeks == 1:
+        elif lag_weeks == 1:
             return 'warning'  # Yellow
         else:
             return 'danger'  # Red
@@ -171,6 +182,118 @@ class PromotorTask(db.Model):
         return f'<PromotorTask {self.template.name if self.template else "N/A"} - Week {self.assigned_week}/{self.assigned_year}>'
 
 
+@db.event.listens_for(Project, 'after_insert')
+@db.event.listens_for(Project, 'after_update')
+@db.event.listens_for(Project, 'after_delete')
+def _project_invalidate_dashboard_stats(mapper, connection, target):
+    """Cached dashboard project counts are stale once a project changes"""
+    from utils.dashboard_stats import invalidate_dashboard_stats
+    invalidate_dashboard_stats(projects=True)
+
+
+@db.event.listens_for(User, 'after_insert')
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def _user_invalidate_lookups(mapper, connection, target):
+    """Cached user dropdowns are stale once a user changes"""
+    from utils.lookups import invalidate_lookups
+    invalidate_lookups(users=True)
+
+
+@db.event.listens_for(Project, 'after_insert')
+@db.event.listens_for(Project, 'after_update')
+@db.event.listens_for(Project, 'after_delete')
+def _project_invalidate_lookups(mapper, connection, target):
+    """Cached project dropdowns are stale once a project changes"""
+    from utils.lookups import invalidate_lookups
+    invalidate_lookups(projects=True)
+
+
+@db.event.listens_for(PromotorTask, 'after_insert')
+@db.event.listens_for(PromotorTask, 'after_update')
+@db.event.listens_for(PromotorTask, 'after_delete')
+def _task_invalidate_dashboard_stats(mapper, connection, target):
+    """Cached dashboard task counts are stale once a task changes"""
+    from utils.dashboard_stats import invalidate_dashboard_stats
+    invalidate_dashboard_stats(tasks=True)
+
+
+@db.event.listens_for(PromotorTask, 'after_insert')
+@db.event.listens_for(PromotorTask, 'after_delete')
+def _task_invalidate_lookups(mapper, connection, target):
+    """A promotor's cached daily update projects are stale once they gain or lose a project task"""
+    if target.project_id:
+        from utils.lookups import invalidate_lookups
+        invalidate_lookups(promotor_ids=[target.promotor_id])
+
+
+@db.event.listens_for(PromotorTask, 'after_update')
+def _task_reassign_invalidate_lookups(mapper, connection, target):
+    """Moving a task to another promotor or project changes the cached projects of both promotors"""
+    state = db.inspect(target)
+    promotor = state.attrs.promotor_id.history
+    if promotor.has_changes() or state.attrs.project_id.history.has_changes():
+        from utils.lookups import invalidate_lookups
+        invalidate_lookups(promotor_ids=set(promotor.deleted) | {target.promotor_id})
+
+
+class PromotorWeekStats(db.Model):
+    """Task aggregates per promotor and ISO week, for analytics
+    
+    One row per (promotor, week the tasks were first assigned), kept up to
+    date by utils.task_analytics.refresh_analytics(); charts read these
+    rows instead of scanning promotor_tasks.
+    """
+    __tablename__ = 'promotor_week_stats'
+    
+    promotor_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    week_id = db.Column(db.Integer, primary_key=True)  # utils.iso_weeks ordinal of the original week
+    iso_year = db.Column(db.Integer, nullable=False)
+    iso_week = db.Column(db.Integer, nullable=False)
+    
+    assigned = db.Column(db.Integer, default=0, nullable=False)  # Tasks first assigned this week
+    completed = db.Column(db.Integer, default=0, nullable=False)  # ...of which completed
+    rolled_over = db.Column(db.Integer, default=0, nullable=False)  # ...moved to a later week
+    on_time = db.Column(db.Integer, default=0, nullable=False)  # ...completed in their week, by the due date
+    lag_sum = db.Column(db.Integer, default=0, nullable=False)  # Sum of lag_weeks (mean = lag_sum / assigned)
+    lag_max = db.Column(db.Integer, default=0, nullable=False)
+    lag_histogram = db.Column(db.Text, nullable=True)  # JSON task counts per utils.task_analytics.LAG_BUCKETS bucket
+    
+    source_updated_at = db.Column(db.DateTime, nullable=True)  # Latest updated_at among the tasks counted
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_week_stats_week', 'week_id'),
+        db.Index('idx_week_stats_source_updated', 'source_updated_at'),
+    )
+    
+    def get_lag_histogram(self):
+        """Task counts per lag bucket"""
+        return json.loads(self.lag_histogram) if self.lag_histogram else []
+    
+    def __repr__(self):
+        return f'<PromotorWeekStats user {self.promotor_id} week {self.iso_week}/{self.iso_year}>'
+
+
+class AnalyticsRefreshState(db.Model):
+    """Single row leasing the promotor_week_stats refresh to one process at a time
+    
+    utils.task_analytics.refresh_analytics() claims it with a conditional
+    UPDATE, so overlapping chart reads and cron runs never rebuild the same
+    groups at once.
+    """
+    __tablename__ = 'analytics_refresh_state'
+    
+    id = db.Column(db.Integer, primary_key=True)  # Always 1
+    lease_owner = db.Column(db.String(100), nullable=True)  # host:pid:nonce of the refresh in progress
+    lease_until = db.Column(db.DateTime, nullable=True)  # Renewed after each chunk; free once passed
+    refreshed_at = db.Column(db.DateTime, nullable=True)  # When the last refresh finished
+    
+    def __repr__(self):
+        return f'<AnalyticsRefreshState {self.lease_owner or "idle"}>'
+
+
 class DailyUpdate(db.Model):
     """Daily update model for tracking daily progress on projects"""
     __tablename__ = 'daily_updates'
@@ -196,23 +319,113 @@ class DailyUpdate(db.Model):
     
     def can_edit(self, user):
         """Check if user can edit this update"""
+        return DailyUpdate.editable_by(user, self.user_id, self.update_date)
+    
+    def can_delete(self, user):
+        """Check if user can delete this update"""
+        return DailyUpdate.deletable_by(user, self.user_id)
+    
+    @staticmethod
+    def editable_by(user, owner_id, update_date):
+        """Whether user can edit an update by owner_id dated update_date (usable on query rows)"""
         from datetime import date
         # Can edit if: (1) it's your update AND (2) it's from today OR (3) you're an admin
-        is_today = self.update_date == date.today()
-        is_owner = self.user_id == user.id
+        is_today = update_date == date.today()
+        is_owner = owner_id == user.id
         is_admin = user.is_admin()
         return (is_owner and is_today) or is_admin
     
-    def can_delete(self, user):
-        """Check if user can delete this update"""
+    @staticmethod
+    def deletable_by(user, owner_id):
+        """Whether user can delete an update by owner_id (usable on query rows)"""
         # Can delete if: (1) it's your update OR (2) you're an admin
-        return self.user_id == user.id or user.is_admin()
+        return owner_id == user.id or user.is_admin()
     
     def __repr__(self):
         project_name = self.project.name if self.project else "General"
         return f'<DailyUpdate {self.user.username} - {project_name} - {self.update_date}>'
 
 
+class SearchDocument(db.Model):
+    """A daily update or task comment in the full-text search index"""
+    __tablename__ = 'search_documents'
+    
+    entity_type = db.Column(db.String(10), primary_key=True)  # update, task
+    entity_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)  # Author (update) or promotor (task)
+    project_id = db.Column(db.Integer, nullable=True, index=True)
+    doc_date = db.Column(db.Date, nullable=False)
+    length = db.Column(db.Integer, nullable=False)  # Indexed tokens, for BM25 length normalisation
+    indexed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<SearchDocument {self.entity_type} {self.entity_id}>'
+
+
+class SearchPosting(db.Model):
+    """One token's occurrences in one search document (the inverted index)"""
+    __tablename__ = 'search_postings'
+    
+    # Primary key order makes a token's posting list one index range
+    # Tokens are folded already; MySQL's default collation would fold them
+    # further ('straße' = 'strasse') into duplicate keys, so compare bytes
+    # (SQLite's default BINARY collation already does)
+    token = db.Column(db.String(64).with_variant(
+        mysql.VARCHAR(64, charset='utf8mb4', collation='utf8mb4_bin'), 'mysql', 'mariadb'
+    ), primary_key=True)
+    entity_type = db.Column(db.String(10), primary_key=True)
+    entity_id = db.Column(db.Integer, primary_key=True)
+    doc_date = db.Column(db.Date, nullable=False)
+    term_frequency = db.Column(db.Integer, nullable=False)
+    positions = db.Column(db.Text, nullable=False)  # Comma-separated token positions, for phrase search
+    
+    # Indexes
+    __table_args__ = (
+        # Removing a document's postings when it is edited or deleted
+        db.Index('idx_posting_entity', 'entity_type', 'entity_id'),
+    )
+    
+    def __repr__(self):
+        return f'<SearchPosting {self.token!r} {self.entity_type} {self.entity_id}>'
+
+
+@db.event.listens_for(DailyUpdate, 'after_insert')
+@db.event.listens_for(DailyUpdate, 'after_update')
+def _update_index_for_search(mapper, connection, target):
+    """Keep the search index in step with the update's text, author, project and date"""
+    from utils.search_index import index_daily_update
+    index_daily_update(connection, target)
+
+
+@db.event.listens_for(DailyUpdate, 'after_delete')
+def _update_remove_from_search(mapper, connection, target):
+    from utils.search_index import ENTITY_UPDATE, remove_document
+    remove_document(connection, ENTITY_UPDATE, target.id)
+
+
+@db.event.listens_for(PromotorTask, 'after_insert')
+def _task_index_for_search(mapper, connection, target):
+    """Index a new task's comments"""
+    if target.comments:
+        from utils.search_index import index_task
+        index_task(connection, target)
+
+
+@db.event.listens_for(PromotorTask, 'after_update')
+def _task_reindex_for_search(mapper, connection, target):
+    """Reindex a task's comments when they, its promotor or its project change"""
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ('comments', 'promotor_id', 'project_id')):
+        from utils.search_index import index_task
+        index_task(connection, target)
+
+
+@db.event.listens_for(PromotorTask, 'after_delete')
+def _task_remove_from_search(mapper, connection, target):
+    from utils.search_index import ENTITY_TASK, remove_document
+    remove_document(connection, ENTITY_TASK, target.id)
+
+
 class Product(db.Model):
     """Product model for catalog management"""
     __tablename__ = 'products'
@@ -256,11 +469,17 @@ class Product(db.Model):
     # WordPress sync tracking
     wordpress_id = db.Column(db.Integer, nullable=True, index=True)
     last_wordpress_sync = db.Column(db.DateTime, nullable=True)
+    wordpress_payload_hash = db.Column(db.String(64), nullable=True)  # Hash of the current storefront payload
+    wordpress_synced_hash = db.Column(db.String(64), nullable=True)  # Hash of the payload last pushed to WordPress
+    image_manifest = db.Column(db.Text, nullable=True)  # JSON: image URL -> {'hash', 'size'}, filled in at sync time
     
     # Indexes for better query performance
     __table_args__ = (
         db.Index('idx_category_active', 'category', 'is_active'),
         db.Index('idx_brand_active', 'brand', 'is_active'),
+        # Covers the pending-sync filter and every column the sync status aggregate reads
+        db.Index('idx_wordpress_sync_status', 'is_active', 'wordpress_payload_hash', 'wordpress_synced_hash',
+                 'wordpress_id', 'last_wordpress_sync'),
     )
     
     def get_specifications(self):
@@ -279,6 +498,15 @@ class Product(db.Model):
         else:
             self.specifications = None
     
+    def get_image_manifest(self):
+        """Get the cached image manifest as a dictionary keyed by image URL"""
+        if self.image_manifest:
+            try:
+                return json.loads(self.image_manifest)
+            except (json.JSONDecodeError, TypeError):
+                return {}
+        return {}
+        
     def get_all_images(self):
         """Get list of all non-empty image URLs"""
         images = []
@@ -314,6 +542,19 @@ class Product(db.Model):
         
         return cls.query.filter(*filters).order_by(cls.product_name)
     
+    def refresh_wordpress_payload_hash(self):
+        """Recompute the hash of what this product looks like on the storefront"""
+        from utils.wordpress_sync import prepare_product_payload, payload_hash
+        self.wordpress_payload_hash = payload_hash(prepare_product_payload(self))
+    
+    @classmethod
+    def wordpress_sync_pending(cls):
+        """Filter clause for products whose storefront payload differs from the last sync"""
+        return db.or_(
+            cls.wordpress_synced_hash == None,
+            cls.wordpress_synced_hash != cls.wordpress_payload_hash
+        )
+    
     @classmethod
     def get_categories(cls):
         """Get list of unique categories"""
@@ -328,6 +569,22 @@ class Product(db.Model):
         return f'<Product {self.product_name} ({self.category})>'
 
 
+@db.event.listens_for(Product, 'before_insert')
+@db.event.listens_for(Product, 'before_update')
+def _product_refresh_wordpress_hash(mapper, connection, target):
+    """Keep wordpress_payload_hash in step with every ORM write"""
+    target.refresh_wordpress_payload_hash()
+
+
+@db.event.listens_for(Product, 'after_insert')
+@db.event.listens_for(Product, 'after_update')
+@db.event.listens_for(Product, 'after_delete')
+def _product_invalidate_sync_status(mapper, connection, target):
+    """Cached WordPress sync counts are stale once a product changes"""
+    from utils.wordpress_sync import invalidate_sync_status
+    invalidate_sync_status()
+
+
 class Quote(db.Model):
     """Quote model for customer quotations"""
     __tablename__ = 'quotes'
@@ -781,6 +1038,14 @@ class SupplierPricing(db.Model):
         return f'<SupplierPricing {self.supplier.name if self.supplier else "N/A"} - {self.glass_type.name if self.glass_type else "N/A"}>'
 
 
+def _default_next_fire_at(context):
+    """A new pending reminder first fires at its reminder_datetime"""
+    params = context.get_current_parameters()
+    if params.get('status') in (None, 'pending'):
+        return params.get('reminder_datetime')
+    return None
+
+
 class Reminder(db.Model):
     """Email reminder model for projects and tasks"""
     __tablename__ = 'reminders'
@@ -800,14 +1065,30 @@ class Reminder(db.Model):
     
     # Recurrence settings
     is_recurring = db.Column(db.Boolean, default=False)
-    recurrence_pattern = db.Column(db.String(50), nullable=True)  # 'daily', 'weekly', 'monthly'
-    recurrence_end_date = db.Column(db.Date, nullable=True)
+    recurrence_pattern = db.Column(db.String(50), nullable=True)  # Legacy: 'daily', 'weekly', 'monthly'
+    recurrence_end_date = db.Column(db.Date, nullable=True)  # Legacy: UNTIL for recurrence_pattern
+    recurrence_rule = db.Column(db.String(255), nullable=True)  # RRULE, e.g. 'FREQ=MONTHLY;BYDAY=-1FR'
+    recurrence_timezone = db.Column(db.String(50), nullable=True)  # IANA zone the rule runs in (REMINDER_TIMEZONE if unset)
+    
+    # Occurrence cursor: reminder_datetime is the first occurrence, next_fire_at
+    # the next one due (UTC, NULL once nothing is left to send)
+    next_fire_at = db.Column(db.DateTime, nullable=True, default=_default_next_fire_at)
+    occurrence_count = db.Column(db.Integer, default=0)  # Occurrences handled so far (for COUNT)
     
     # Status tracking
-    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'sent', 'failed', 'cancelled'
+    status = db.Column(db.String(20), default='pending', index=True)  # 'pending', 'sending', 'retrying', 'sent', 'failed', 'dead', 'cancelled'
     sent_at = db.Column(db.DateTime, nullable=True)
     error_message = db.Column(db.Text, nullable=True)
     
+    # Retries: transient send failures go to 'retrying' until next_attempt_at;
+    # after too many attempts the reminder is dead-lettered ('dead')
+    attempt_count = db.Column(db.Integer, default=0)  # Failed attempts at the current occurrence
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    
+    # Dispatch lease: a 'sending' reminder belongs to lease_owner until lease_until
+    lease_owner = db.Column(db.String(100), nullable=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
+    
     # Email preferences
     send_email = db.Column(db.Boolean, default=True)  # Future: can add SMS, push, etc.
     
@@ -824,8 +1105,117 @@ class Reminder(db.Model):
     __table_args__ = (
         db.Index('idx_reminder_status_datetime', 'status', 'reminder_datetime'),
         db.Index('idx_reminder_user_type', 'user_id', 'reminder_type'),
+        db.Index('idx_reminder_status_lease', 'status', 'lease_until'),
+        db.Index('idx_reminder_status_fire', 'status', 'next_fire_at'),
+        db.Index('idx_reminder_status_attempt', 'status', 'next_attempt_at'),
     )
     
+    @classmethod
+    def with_targets(cls):
+        """Loader options fetching what sending or listing a reminder reads
+        
+        The recipient, the project, and the task with its template and
+        project all come back joined into the reminder query, so N reminders
+        cost one query instead of up to five lazy loads each.
+        """
+        configure_mappers()  # PromotorTask.template and .project are backrefs
+        return (
+            joinedload(cls.user),
+            joinedload(cls.project),
+            joinedload(cls.task).options(joinedload(PromotorTask.template), joinedload(PromotorTask.project)),
+        )
+    
+    def get_recurrence_rule(self):
+        """The RecurrenceRule this reminder repeats by, or None"""
+        from utils.recurrence import rule_for_reminder
+        return rule_for_reminder(self)
+    
+    def recurrence_summary(self):
+        """Human description of the recurrence, e.g. 'Every month on last Fri'"""
+        try:
+            rule = self.get_recurrence_rule()
+        except ValueError:
+            return self.recurrence_rule
+        return rule.describe() if rule else None
+    
     def __repr__(self):
         return f'<Reminder {self.id} - {self.reminder_type} - {self.status}>'
 
+
+
+class WordPressSyncJob(db.Model):
+    """Queued WordPress sync, drained by a background worker"""
+    __tablename__ = 'wordpress_sync_jobs'
+    
+    ACTIVE_STATUSES = ('queued', 'running')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    incremental = db.Column(db.Boolean, nullable=False, default=True)
+    
+    # Progress counters, updated as each batch lands
+    total = db.Column(db.Integer, nullable=True)  # Set when a worker first picks the job up
+    synced = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Worker bookkeeping
+    worker_id = db.Column(db.String(100), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # A stale heartbeat lets another worker resume the job
+    error_message = db.Column(db.Text, nullable=True)
+    
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    creator = db.relationship('User', foreign_keys=[created_by])
+    
+    __table_args__ = (
+        db.Index('idx_sync_job_status', 'status', 'id'),
+    )
+    
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+    
+    def to_dict(self):
+        processed = self.synced + self.failed
+        return {
+            'id': self.id,
+            'status': self.status,
+            'incremental': self.incremental,
+            'total': self.total,
+            'synced': self.synced,
+            'failed': self.failed,
+            'percent': round(100.0 * processed / self.total, 1) if self.total else (100.0 if self.total == 0 else 0.0),
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<WordPressSyncJob {self.id} - {self.status}>'
+
+
+class WordPressSyncJobItem(db.Model):
+    """Per-product outcome of a WordPress sync job"""
+    __tablename__ = 'wordpress_sync_job_items'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('wordpress_sync_jobs.id', ondelete='CASCADE'), nullable=False)
+    product_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # 'synced' or 'failed'
+    wordpress_id = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('idx_sync_job_item_status', 'job_id', 'status'),
+        db.Index('idx_sync_job_item_product', 'job_id', 'product_id'),
+    )
+    
+    def __repr__(self):
+        return f'<WordPressSyncJobItem job={self.job_id} product={self.product_id} {self.status}>'
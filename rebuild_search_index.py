@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the full-text search index from scratch
+
+Writes keep the index up to date on their own; rebuild after restoring a
+backup, importing updates or tasks with raw SQL, or changing how text is
+tokenized.
+"""
+import time
+
+from app import app
+from utils.search_index import rebuild_search_index
+
+def rebuild():
+    """Re-index every daily update and task comment"""
+    with app.app_context():
+        print("🔎 Rebuilding search index...")
+        started = time.monotonic()
+        result = rebuild_search_index()
+        print(f"✅ Indexed {result['updates']} daily updates and {result['tasks']} task comments "
+              f"({result['postings']} postings) in {time.monotonic() - started:.1f}s")
+
+if __name__ == '__main__':
+    rebuild()
@@ -1,38 +1,42 @@
 #!/usr/bin/env python3
 """
-Script to retry failed reminders by resetting them to pending status
+Script to retry dead-lettered reminders by resetting them to pending status
+
+Only reminders whose retries ran out on transient errors are reset unless
+--include-permanent is given (for permanent failures whose cause, such as a
+missing email address, has since been fixed).
 """
+import argparse
+
 from app import app, db
 from models import Reminder
-from datetime import datetime, timedelta
+from utils.reminder_scheduler import requeue_failed_reminders
 
-def retry_failed_reminders():
-    """Reset failed reminders to pending status"""
+def retry_failed_reminders(include_permanent=False):
+    """Reset dead-lettered (and optionally permanently failed) reminders to pending status"""
     with app.app_context():
-        # Get all failed reminders
-        failed_reminders = Reminder.query.filter_by(status='failed').all()
+        statuses = ['dead', 'failed'] if include_permanent else ['dead']
+        reminders = Reminder.query.filter(Reminder.status.in_(statuses)).all()
         
-        print(f"📊 Found {len(failed_reminders)} failed reminders")
+        print(f"📊 Found {len(reminders)} reminders to retry")
         print()
         
-        if not failed_reminders:
-            print("✅ No failed reminders to retry!")
-            return
+        for reminder in reminders:
+            print(f"✅ Reset reminder #{reminder.id} ({reminder.status}): {reminder.subject}")
         
-        for reminder in failed_reminders:
-            # Reset to pending
-            reminder.status = 'pending'
-            reminder.error_message = None
-            
-            # Update reminder time to 5 minutes from now
-            reminder.reminder_datetime = datetime.utcnow() + timedelta(minutes=5)
-            
-            print(f"✅ Reset reminder #{reminder.id}: {reminder.subject}")
-        
-        db.session.commit()
+        result = requeue_failed_reminders(include_permanent=include_permanent)
         print()
-        print(f"🎉 Successfully reset {len(failed_reminders)} reminders to pending")
-        print(f"⏰ Reminders will be sent at: {(datetime.utcnow() + timedelta(minutes=5)).strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        if result['permanent_failures_skipped']:
+            print(f"⏭️  Skipped {result['permanent_failures_skipped']} permanent failures (use --include-permanent once fixed)")
+        if not result['reminders_reset']:
+            print("✅ No failed reminders to retry!")
+            return
+        print(f"🎉 Successfully reset {result['reminders_reset']} reminders to pending")
+        print(f"⏰ Reminders will be sent at: {result['scheduled_for']}")
 
 if __name__ == '__main__':
-    retry_failed_reminders()
+    parser = argparse.ArgumentParser(description='Retry dead-lettered reminders')
+    parser.add_argument('--include-permanent', action='store_true',
+                        help='Also retry permanent failures (rejected address, no email)')
+    args = parser.parse_args()
+    retry_failed_reminders(include_permanent=args.include_permanent)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Amazon SES
+Speaks the SES Query API (SendEmail, GetSendQuota) that boto3 uses, so the
+reminder dispatcher can be run and benchmarked offline. Enforces a
+per-second send rate like a real account: sends over the rate get the same
+Throttling error SES returns. Addresses at reject_domain are refused with
+MessageRejected (a permanent failure); at unavailable_domain the service
+answers 503 ServiceUnavailable (a transient one).
+
+Usage:
+    python ses_standin.py --port 8091 --max-send-rate 14
+    SES_ENDPOINT_URL=http://127.0.0.1:8091 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x python app.py
+"""
+import argparse
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+
+SES_NAMESPACE = 'http://ses.amazonaws.com/doc/2010-12-01/'
+
+
+class SESStandIn:
+    """In-process HTTP server emulating the SES v1 Query API"""
+
+    def __init__(self, host='127.0.0.1', port=0, max_send_rate=14.0, latency=0.08,
+                 max_24_hour_send=50000, reject_domain='reject.invalid', unavailable_domain='unavailable.invalid'):
+        self.max_send_rate = max_send_rate
+        self.latency = latency
+        self.max_24_hour_send = max_24_hour_send
+        self.reject_domain = reject_domain
+        self.unavailable_domain = unavailable_domain
+
+        self._lock = threading.Lock()
+        self._recent_sends = deque()  # monotonic times of sends in the last second
+        self.deliveries = Counter()  # (to, subject) -> times delivered
+        self.stats = {
+            'connections': 0,
+            'requests': 0,
+            'sent': 0,
+            'throttled': 0,
+            'rejected': 0,
+            'unavailable': 0,
+            'peak_concurrency': 0,
+        }
+        self._in_flight = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve in a background thread and return the endpoint URL"""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+            self.deliveries.clear()
+
+    def duplicate_deliveries(self):
+        """(to, subject) pairs delivered more than once"""
+        with self._lock:
+            return {key: count for key, count in self.deliveries.items() if count > 1}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _admit(self):
+        """Sliding one-second window over accepted sends; False means throttle"""
+        if not self.max_send_rate:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._recent_sends and now - self._recent_sends[0] >= 1.0:
+                self._recent_sends.popleft()
+            if len(self._recent_sends) >= self.max_send_rate:
+                self.stats['throttled'] += 1
+                return False
+            self._recent_sends.append(now)
+            return True
+
+    def send_email(self, params):
+        """Handle Action=SendEmail; returns (status, xml)"""
+        to = params.get('Destination.ToAddresses.member.1', '')
+        subject = params.get('Message.Subject.Data', '')
+
+        if not self._admit():
+            return _error(400, 'Throttling', 'Maximum sending rate exceeded.')
+
+        with self._lock:
+            self._in_flight += 1
+            self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], self._in_flight)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        if self.unavailable_domain and to.endswith('@' + self.unavailable_domain):
+            self._count('unavailable')
+            return _error(503, 'ServiceUnavailable', 'Service is unavailable. Try again later.')
+        if '@' not in to or (self.reject_domain and to.endswith('@' + self.reject_domain)):
+            self._count('rejected')
+            return _error(400, 'MessageRejected', f'Email address is not verified. The following identities failed the check: {to}')
+
+        with self._lock:
+            self.stats['sent'] += 1
+            self.deliveries[(to, subject)] += 1
+
+        message_id = f'{uuid.uuid4().hex}-000000'
+        return 200, _response('SendEmail', f'<MessageId>{message_id}</MessageId>')
+
+    def get_send_quota(self):
+        with self._lock:
+            sent = self.stats['sent']
+        return 200, _response('GetSendQuota', (
+            f'<Max24HourSend>{float(self.max_24_hour_send)}</Max24HourSend>'
+            f'<MaxSendRate>{float(self.max_send_rate or 0)}</MaxSendRate>'
+            f'<SentLast24Hours>{float(sent)}</SentLast24Hours>'
+        ))
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as two writes; with Nagle on, the body
+            # waits for the client's delayed ACK (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                standin._count('connections')
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                standin._count('requests')
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length).decode('utf-8') if length else ''
+                params = {key: values[0] for key, values in parse_qs(raw).items()}
+
+                action = params.get('Action')
+                if action == 'SendEmail':
+                    status, body = standin.send_email(params)
+                elif action == 'GetSendQuota':
+                    status, body = standin.get_send_quota()
+                else:
+                    status, body = _error(400, 'InvalidAction', f'Unsupported action: {action}')
+
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/xml')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _response(action, result_xml):
+    return (
+        f'<{action}Response xmlns="{SES_NAMESPACE}">'
+        f'<{action}Result>{result_xml}</{action}Result>'
+        f'<ResponseMetadata><RequestId>{uuid.uuid4()}</RequestId></ResponseMetadata>'
+        f'</{action}Response>'
+    )
+
+
+def _error(status, code, message):
+    return status, (
+        f'<ErrorResponse xmlns="{SES_NAMESPACE}">'
+        f'<Error><Type>Sender</Type><Code>{code}</Code><Message>{escape(message)}</Message></Error>'
+        f'<RequestId>{uuid.uuid4()}</RequestId>'
+        f'</ErrorResponse>'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local SES stand-in')
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--max-send-rate', type=float, default=14.0, help='Emails per second before Throttling (0 = unlimited)')
+    parser.add_argument('--latency', type=float, default=0.08, help='Seconds per SendEmail call')
+    args = parser.parse_args()
+
+    standin = SESStandIn(port=args.port, max_send_rate=args.max_send_rate, latency=args.latency)
+    print(f"🧪 SES stand-in listening on {standin.url}")
+    print(f"   Addresses @{standin.reject_domain} are rejected with MessageRejected")
+    print(f"   Addresses @{standin.unavailable_domain} get 503 ServiceUnavailable")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {standin.stats}")
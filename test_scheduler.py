@@ -16,5 +16,7 @@ with app.app_context():
     print("Scheduler Results:")
     print(f"  Total reminders checked: {result['total']}")
     print(f"  Successfully sent: {result['sent']}")
+    print(f"  Emails sent (digests combine reminders): {result['emails']}")
     print(f"  Failed: {result['failed']}")
+    print(f"  Deferred to next run: {result['deferred']}")
     print("=" * 60)
@@ -0,0 +1,105 @@
+"""
+Auto Reminders
+Daily "project update" reminders for every incomplete project, generated
+set-based: one anti-join finds the (project, recipient) pairs without a
+pending reminder in the window and one INSERT ... SELECT creates them
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, exists, func, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+
+INCOMPLETE_STATUSES = ('New', 'In Progress', 'On Hold')
+# Projects whose owner is missing go to every active user with one of these roles
+FALLBACK_ROLES = ('Admin', 'Manager')
+# New reminders are scheduled this far ahead...
+LEAD_TIME = timedelta(minutes=30)
+# ...unless the recipient already has one pending for the project within this window
+DUPLICATE_WINDOW = timedelta(hours=1)
+
+
+def recipient_pairs():
+    """Subquery of (project_id, project_name, user_id) for every incomplete project's recipients
+
+    The project owner, or all active admins and managers when the owner row
+    is gone.
+    """
+    from models import Project, User
+
+    owner = aliased(User)
+    fallback = aliased(User)
+    incomplete = Project.status.in_(INCOMPLETE_STATUSES)
+
+    owned = select(
+        Project.id.label('project_id'), Project.name.label('project_name'), owner.id.label('user_id')
+    ).join(owner, owner.id == Project.owner_id).where(incomplete)
+
+    orphaned = select(
+        Project.id, Project.name, fallback.id
+    ).outerjoin(owner, owner.id == Project.owner_id).join(
+        fallback, and_(fallback.is_active == True, fallback.role.in_(FALLBACK_ROLES))
+    ).where(incomplete, owner.id.is_(None))
+
+    return union_all(owned, orphaned).subquery('recipients')
+
+
+def create_auto_reminders(now: Optional[datetime] = None) -> Dict:
+    """Create the missing daily project reminders and return counts
+
+    Two statements whatever the number of projects: the counts and the
+    INSERT ... SELECT. No custom message, so the email (or the recipient's
+    digest section) shows the project's details.
+    """
+    from models import db, Project, Reminder
+
+    now = now or datetime.utcnow()
+    reminder_time = now + LEAD_TIME
+    pairs = recipient_pairs()
+
+    projects_checked, recipients = db.session.execute(select(
+        select(func.count()).select_from(Project).where(
+            Project.status.in_(INCOMPLETE_STATUSES)
+        ).scalar_subquery(),
+        select(func.count()).select_from(pairs).scalar_subquery()
+    )).one()
+
+    already_pending = exists().where(
+        Reminder.project_id == pairs.c.project_id,
+        Reminder.user_id == pairs.c.user_id,
+        Reminder.status == 'pending',
+        Reminder.next_fire_at > now,
+        Reminder.next_fire_at < now + DUPLICATE_WINDOW
+    )
+
+    reminders_table = Reminder.__table__
+    created = db.session.execute(
+        insert(reminders_table).from_select(
+            ['reminder_type', 'project_id', 'user_id', 'reminder_datetime', 'next_fire_at', 'subject',
+             'is_recurring', 'occurrence_count', 'status', 'send_email', 'created_at', 'updated_at'],
+            select(
+                literal('project'),
+                pairs.c.project_id,
+                pairs.c.user_id,
+                literal(reminder_time),
+                literal(reminder_time),
+                literal('Daily Project Update: ') + pairs.c.project_name,
+                literal(False),
+                literal(0),
+                literal('pending'),
+                literal(True),
+                literal(now),
+                literal(now)
+            ).where(~already_pending)
+        )
+    ).rowcount
+    db.session.commit()
+
+    return {
+        'projects_checked': projects_checked,
+        'reminders_created': created,
+        'reminders_skipped': recipients - created,
+        'scheduled_for': reminder_time.strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
@@ -0,0 +1,61 @@
+"""
+In-process TTL Cache
+Short-lived caching for expensive aggregate queries. Each process (or
+Lambda container) keeps its own copy: writes in this process invalidate
+it immediately, and the TTL bounds how stale another process can be.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe key -> value cache with per-entry expiry"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Get a cached value, calling loader() to compute it on a miss
+
+        The loader runs outside the lock; two threads missing at once both
+        compute, which is cheaper than serialising every miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = loader()
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[key] = (expires, value)
+        return value
+
+    def invalidate(self, key: Hashable = None, prefix: Optional[tuple] = None):
+        """Drop one key, every tuple key starting with prefix, or everything"""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+            elif prefix is not None:
+                for cached_key in [k for k in self._entries
+                                   if isinstance(k, tuple) and k[:len(prefix)] == prefix]:
+                    del self._entries[cached_key]
+            else:
+                self._entries.clear()
+
+    def _evict(self, now: float):
+        """Drop expired entries, or everything if none have expired"""
+        expired = [k for k, (expires, _) in self._entries.items() if expires <= now]
+        if not expired:
+            self._entries.clear()
+        for k in expired:
+            del self._entries[k]
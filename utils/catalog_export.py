@@ -0,0 +1,208 @@
+"""
+Catalog Export Utility
+Streams Product rows to CSV, XLSX or NDJSON with constant memory
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from models import db, Product
+
+
+# Fixed columns, in output order. Specification keys are appended after these
+# as "spec: <key>" columns.
+EXPORT_COLUMNS = [
+    'id',
+    'category',
+    'product_name',
+    'product_url',
+    'price',
+    'image_1_url',
+    'image_2_url',
+    'image_3_url',
+    'image_4_url',
+    'availability',
+    'description',
+    'material',
+    'brand',
+    'usage_application',
+    'thickness',
+    'shape',
+    'pattern',
+    'is_active',
+    'created_at',
+    'updated_at',
+    'wordpress_id',
+    'last_wordpress_sync',
+]
+
+EXPORT_FORMATS = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'xlsx': {
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'extension': 'xlsx',
+    },
+    'ndjson': {'mimetype': 'application/x-ndjson', 'extension': 'ndjson'},
+}
+
+SPEC_COLUMN_PREFIX = 'spec: '
+
+
+class CatalogExporter:
+    """Stream catalog products to CSV, XLSX or NDJSON"""
+
+    def __init__(self, category=None, include_inactive=False, batch_size=500):
+        self.category = category
+        self.include_inactive = include_inactive
+        self.batch_size = batch_size
+        self._spec_keys = None
+
+    def _filters(self):
+        """Build the product filters shared by every pass"""
+        filters = []
+        if not self.include_inactive:
+            filters.append(Product.is_active == True)
+        if self.category:
+            filters.append(Product.category == self.category)
+        return filters
+
+    def _stream(self, *columns):
+        """Stream the given columns with a server-side cursor, ordered by id"""
+        return db.session.query(*columns).filter(
+            *self._filters()
+        ).order_by(Product.id).yield_per(self.batch_size)
+
+    def spec_keys(self):
+        """Get the sorted union of specification keys across exported products
+
+        Only the specifications column is read, so this pass is cheap even on
+        large catalogs. Needed up front because CSV/XLSX headers come first.
+        """
+        if self._spec_keys is None:
+            keys = set()
+            for (specifications,) in self._stream(Product.specifications):
+                keys.update(_parse_specifications(specifications).keys())
+            self._spec_keys = sorted(keys)
+        return self._spec_keys
+
+    def header(self):
+        """Get the flattened column header"""
+        return EXPORT_COLUMNS + [f'{SPEC_COLUMN_PREFIX}{key}' for key in self.spec_keys()]
+
+    def iter_records(self):
+        """Yield one dict per product with specifications as a nested dict"""
+        columns = [getattr(Product, name) for name in EXPORT_COLUMNS]
+        for row in self._stream(Product.specifications, *columns):
+            record = dict(zip(EXPORT_COLUMNS, row[1:]))
+            record['specifications'] = _parse_specifications(row[0])
+            yield record
+
+    def iter_rows(self):
+        """Yield one flat list per product, aligned with header()"""
+        spec_keys = self.spec_keys()
+        for record in self.iter_records():
+            specs = record['specifications']
+            yield [_cell(record[name]) for name in EXPORT_COLUMNS] + \
+                  [_cell(specs.get(key)) for key in spec_keys]
+
+    def iter_csv(self):
+        """Yield CSV text chunks, one line per chunk"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush():
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return value
+
+        writer.writerow(self.header())
+        yield flush()
+
+        for row in self.iter_rows():
+            writer.writerow(row)
+            yield flush()
+
+    def iter_ndjson(self):
+        """Yield newline-delimited JSON, one product per line
+
+        NDJSON needs no header, so the first line is sent as soon as the first
+        row is fetched.
+        """
+        for record in self.iter_records():
+            yield json.dumps(record, default=_json_default, ensure_ascii=False) + '\n'
+
+    def write_xlsx(self, fileobj):
+        """Write an XLSX workbook to fileobj using openpyxl's write-only mode
+
+        Write-only worksheets spool rows to a temporary file, so memory stays
+        flat; the zip container can only be finalised once all rows are in.
+        Returns the number of products written.
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Products')
+        sheet.append(self.header())
+        count = 0
+        for row in self.iter_rows():
+            sheet.append(row)
+            count += 1
+        workbook.save(fileobj)
+        return count
+
+    def export_to_file(self, export_format, path):
+        """Export the catalog to a local file; returns the number of products"""
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f'Unsupported export format: {export_format}')
+
+        if export_format == 'xlsx':
+            return self.write_xlsx(path)
+
+        chunks = self.iter_csv() if export_format == 'csv' else self.iter_ndjson()
+        newline = '' if export_format == 'csv' else None
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline=newline) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                count += 1
+
+        # CSV yields the header as its first chunk
+        return count - 1 if export_format == 'csv' else count
+
+    @staticmethod
+    def filename(export_format):
+        """Get a timestamped download filename for the given format"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"catalog_export_{timestamp}.{EXPORT_FORMATS[export_format]['extension']}"
+
+
+def _parse_specifications(specifications):
+    """Parse a specifications JSON string, tolerating bad data"""
+    if not specifications:
+        return {}
+    try:
+        specs = json.loads(specifications)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return specs if isinstance(specs, dict) else {}
+
+
+def _cell(value):
+    """Convert a value to something CSV/XLSX writers accept"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _json_default(value):
+    """JSON encoder fallback for datetimes"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -0,0 +1,100 @@
+"""
+Daily Updates Feed
+Updates over a date range, newest first, a page at a time. Pages are
+keyset-paginated on (update_date, created_at, id): each page starts below
+the last row of the previous one instead of at an OFFSET, so page 50 of a
+quarter costs the same as page 1. User and project names are joined into a
+flat projection, so a page is one query.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import and_, or_
+
+from models import db, DailyUpdate, Project, User
+
+FEED_PAGE_SIZE = 50
+
+
+def get_updates_feed(start: date, end: date, viewer, user_id: Optional[int] = None,
+                     project: Optional[str] = None, cursor: Optional[str] = None,
+                     page_size: int = FEED_PAGE_SIZE) -> Dict:
+    """One page of updates dated start..end (inclusive), newest first
+
+    project is a project id or 'general'. cursor is the next_cursor of the
+    previous page. Returns {'updates': [update dict, ...], 'next_cursor':
+    str or None}; each update carries can_edit/can_delete for viewer.
+    """
+    query = db.session.query(
+        DailyUpdate.id,
+        DailyUpdate.user_id,
+        DailyUpdate.project_id,
+        DailyUpdate.update_date,
+        DailyUpdate.update_text,
+        DailyUpdate.is_general,
+        DailyUpdate.created_at,
+        DailyUpdate.updated_at,
+        User.username,
+        Project.name.label('project_name')
+    ).join(User, User.id == DailyUpdate.user_id).outerjoin(
+        Project, Project.id == DailyUpdate.project_id
+    ).filter(
+        # Range on the leading column of idx_update_date_user
+        DailyUpdate.update_date.between(start, end)
+    )
+
+    if user_id:
+        query = query.filter(DailyUpdate.user_id == user_id)
+    if project == 'general':
+        query = query.filter(DailyUpdate.is_general == True)
+    elif project:
+        query = query.filter(DailyUpdate.project_id == int(project))
+
+    position = decode_cursor(cursor)
+    if position:
+        after_date, after_created, after_id = position
+        query = query.filter(or_(
+            DailyUpdate.update_date < after_date,
+            and_(DailyUpdate.update_date == after_date, or_(
+                DailyUpdate.created_at < after_created,
+                and_(DailyUpdate.created_at == after_created, DailyUpdate.id < after_id)
+            ))
+        ))
+
+    # One row past the page says whether there is another
+    rows = query.order_by(
+        DailyUpdate.update_date.desc(),
+        DailyUpdate.created_at.desc(),
+        DailyUpdate.id.desc()
+    ).limit(page_size + 1).all()
+
+    updates = []
+    for row in rows[:page_size]:
+        update = row._asdict()
+        update['can_edit'] = DailyUpdate.editable_by(viewer, row.user_id, row.update_date)
+        update['can_delete'] = DailyUpdate.deletable_by(viewer, row.user_id)
+        updates.append(update)
+
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor(last.update_date, last.created_at, last.id)
+
+    return {'updates': updates, 'next_cursor': next_cursor}
+
+
+def encode_cursor(update_date, created_at, update_id):
+    """Opaque (URL-safe) position after which the next page starts"""
+    return f"{update_date.isoformat()}_{created_at.isoformat()}_{update_id}"
+
+
+def decode_cursor(cursor):
+    """(update_date, created_at, id) from encode_cursor(), or None if missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        update_date, created_at, update_id = cursor.split('_')
+        return date.fromisoformat(update_date), datetime.fromisoformat(created_at), int(update_id)
+    except ValueError:
+        return None
@@ -0,0 +1,81 @@
+"""
+Dashboard Statistics
+The dashboard's counts come from two conditional-aggregate queries - one
+over projects, one over the week's tasks - instead of a COUNT per number,
+and are cached for DASHBOARD_STATS_TTL seconds per scope: project figures
+are the same for everyone, task figures are kept per week for everyone
+(admins and managers) and per promotor. Project and task writes through
+the ORM drop the cached figures (see the model events); bulk UPDATEs call
+invalidate_dashboard_stats() themselves.
+"""
+
+import os
+
+from models import db, Project, PromotorTask, User
+from utils.cache import TTLCache
+
+RECENT_PROJECTS = 5
+
+_stats_cache = TTLCache(ttl=float(os.getenv('DASHBOARD_STATS_TTL', '10')))
+
+
+def get_project_stats():
+    """Project counts and the most recently updated projects (with owner names)"""
+    return _stats_cache.get(('projects',), _load_project_stats)
+
+
+def get_task_stats(iso_week, promotor_id=None):
+    """Task counts for iso_week: everyone's, or one promotor's"""
+    scope = 'all' if promotor_id is None else promotor_id
+    return _stats_cache.get(('tasks', scope, iso_week.year, iso_week.week),
+                            lambda: _load_task_stats(iso_week, promotor_id))
+
+
+def invalidate_dashboard_stats(projects=False, tasks=False):
+    """Forget cached project and/or task figures"""
+    if projects:
+        _stats_cache.invalidate(prefix=('projects',))
+    if tasks:
+        _stats_cache.invalidate(prefix=('tasks',))
+
+
+def _load_project_stats():
+    total, active, completed = db.session.query(
+        db.func.count(Project.id),
+        db.func.sum(db.case((Project.status == 'In Progress', 1), else_=0)),
+        db.func.sum(db.case((Project.status == 'Completed', 1), else_=0))
+    ).one()
+
+    recent = db.session.query(
+        Project.id, Project.name, Project.status, Project.expected_end_date,
+        User.username.label('owner_name')
+    ).outerjoin(User, User.id == Project.owner_id).order_by(
+        Project.updated_at.desc()
+    ).limit(RECENT_PROJECTS).all()
+
+    return {
+        'total_projects': total,
+        'active_projects': active or 0,
+        'completed_projects': completed or 0,
+        'recent_projects': [row._asdict() for row in recent]
+    }
+
+
+def _load_task_stats(iso_week, promotor_id):
+    query = db.session.query(
+        db.func.count(PromotorTask.id),
+        db.func.sum(db.case((PromotorTask.status == 'Pending', 1), else_=0)),
+        db.func.sum(db.case((PromotorTask.status == 'Overdue', 1), else_=0))
+    ).filter(
+        PromotorTask.assigned_year == iso_week.year,
+        PromotorTask.assigned_week == iso_week.week
+    )
+    if promotor_id is not None:
+        query = query.filter(PromotorTask.promotor_id == promotor_id)
+    total, pending, overdue = query.one()
+
+    return {
+        'total_tasks': total,
+        'pending_tasks': pending or 0,
+        'overdue_tasks': overdue or 0
+    }
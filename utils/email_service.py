@@ -2,30 +2,106 @@
 Email service module for sending emails via AWS SES
 """
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
 import os
+import threading
 from datetime import datetime
 
+from utils.cache import TTLCache
+
+
+# Compiled once at import; rendering reuses the compiled templates
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'emails')
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True
+)
+TEMPLATES = {
+    name: _environment.get_template(name)
+    for name in (
+        'project_section.html', 'project_section.txt', 'task_section.html', 'task_section.txt',
+        'project_reminder.html', 'project_reminder.txt', 'task_reminder.html', 'task_reminder.txt',
+        'digest.html', 'digest.txt'
+    )
+}
+
+PRIORITY_COLORS = {'High': '#dc3545', 'Medium': '#ffc107', 'Low': '#28a745'}
+
+# SES errors that will fail the same way however often the email is retried;
+# anything else (throttling, 5xx, network) is worth retrying later
+PERMANENT_SES_ERRORS = {
+    'MessageRejected',
+    'MailFromDomainNotVerified',
+    'MailFromDomainNotVerifiedException',
+    'InvalidParameterValue',
+    'ValidationError',
+    'ConfigurationSetDoesNotExist',
+    'ConfigurationSetDoesNotExistException',
+}
+
+# SES clients shared by every EmailService in the process, one per
+# configuration. boto3 clients are thread-safe and keep their HTTP
+# connections open; creating one is not, hence the lock.
+_clients = {}
+_clients_lock = threading.Lock()
+# The account's send rate rarely changes; read it once an hour
+_send_quotas = TTLCache(ttl=3600, max_entries=16)
+
+
+def get_ses_client(max_pool_connections=None):
+    """The process-wide SES client for the current settings, created on first use
+    
+    max_pool_connections sizes the client's HTTP pool; pass the number of
+    threads that send at once.
+    """
+    # In Lambda, boto3 automatically uses the IAM role
+    # Locally, it will use environment variables
+    in_lambda = bool(os.getenv('AWS_EXECUTION_ENV'))
+    key = (
+        os.getenv('AWS_REGION', 'ap-south-1'),
+        # Point at a local SES stand-in (ses_standin.py) for testing
+        os.getenv('SES_ENDPOINT_URL'),
+        None if in_lambda else os.getenv('AWS_ACCESS_KEY_ID'),
+        max_pool_connections
+    )
+    
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            region, endpoint_url, access_key_id, pool_size = key
+            client_kwargs = {'region_name': region}
+            if endpoint_url:
+                client_kwargs['endpoint_url'] = endpoint_url
+            if pool_size:
+                client_kwargs['config'] = Config(max_pool_connections=pool_size)
+            if not in_lambda:
+                # Local development - use environment variables
+                client_kwargs['aws_access_key_id'] = access_key_id
+                client_kwargs['aws_secret_access_key'] = os.getenv('AWS_SECRET_ACCESS_KEY')
+            # A session per client: boto3's default session isn't safe to share across threads
+            client = boto3.session.Session().client('ses', **client_kwargs)
+            _clients[key] = client
+    return client
+
 
 class EmailService:
-    def __init__(self):
-        """Initialize AWS SES client"""
-        # In Lambda, boto3 automatically uses the IAM role
-        # Locally, it will use environment variables
-        region = os.getenv('AWS_REGION', 'ap-south-1')
+    def __init__(self, max_pool_connections=None):
+        """Use the shared AWS SES client
         
-        # Check if we're in Lambda (AWS_EXECUTION_ENV is set in Lambda)
-        if os.getenv('AWS_EXECUTION_ENV'):
-            # In Lambda - use IAM role (don't pass credentials)
-            self.ses_client = boto3.client('ses', region_name=region)
-        else:
-            # Local development - use environment variables
-            self.ses_client = boto3.client(
-                'ses',
-                region_name=region,
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-            )
+        max_pool_connections sizes the client's HTTP pool; set it to the
+        number of threads that send through this service at once.
+        """
+        self.ses_client = get_ses_client(max_pool_connections)
         self.sender_email = os.getenv('SES_SENDER_EMAIL', 'info@glassy.in')
         self.app_url = os.getenv('APP_URL', 'http://localhost:5000')
     
@@ -40,7 +116,9 @@ class EmailService:
             html: HTML body (optional)
         
         Returns:
-            dict: Success status with message_id
+            dict: Success status with message_id; on failure the error, the
+            SES error code if any and whether a retry might succeed
+            ('transient')
         """
         try:
             # Build email body
@@ -63,160 +141,168 @@ class EmailService:
                 'message_id': response['MessageId']
             }
         except ClientError as e:
+            code = e.response['Error'].get('Code')
             return {
                 'success': False,
-                'error': e.response['Error']['Message']
+                'error': e.response['Error']['Message'],
+                'code': code,
+                'transient': code not in PERMANENT_SES_ERRORS
             }
+        except BotoCoreError as e:
+            # Connection errors, timeouts
+            return {'success': False, 'error': str(e), 'transient': True}
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'transient': False}
+    
+    def get_max_send_rate(self):
+        """Get the account's SES send rate (emails/second), or None if it can't be read"""
+        try:
+            return _send_quotas.get(
+                id(self.ses_client), lambda: float(self.ses_client.get_send_quota()['MaxSendRate']) or None
+            )
         except Exception as e:
-            return {'success': False, 'error': str(e)}
+            print(f"Could not read SES send quota: {e}")
+            return None
+    
+    def send_message(self, message):
+        """Send a message built by one of the render_* methods"""
+        return self.send_email(message['to'], message['subject'], message['body'], message.get('html'))
     
     def send_project_reminder(self, project, user, custom_subject=None, custom_message=None):
         """Send project-specific reminder email via SES"""
         if not user.email:
             return {'success': False, 'error': 'User has no email address'}
         
-        # Format subject
-        if custom_subject:
-            subject = custom_subject
-        else:
-            subject = f"🔔 Reminder: {project.name}"
-        
-        # Calculate status text (always initialize this before use)
-        status_text = ""
-        days_remaining = project.days_remaining()
-        if days_remaining is not None:
-            if days_remaining > 0:
-                status_text = f"{days_remaining} days remaining"
-            elif days_remaining == 0:
-                status_text = "Due today!"
-            else:
-                status_text = f"{abs(days_remaining)} days overdue"
-        else:
-            status_text = "Completed"
-        
-        # Format expected end date with null check
-        expected_date_str = project.expected_end_date.strftime('%d %B %Y') if project.expected_end_date else 'Not set'
-        
-        # Format message
-        if custom_message:
-            body = custom_message
-        else:
-            body = f"""Hello {user.username},
-
-This is a reminder about your project:
-
-Project: {project.name}
-Status: {project.status}
-Expected End Date: {expected_date_str}
-{status_text}
-
-{project.comments if project.comments else ''}
-
-Stay on track and keep up the great work!
-
----
-VCore Project Management System
-"""
-        
-        # Create HTML version
-        html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
-                <h2 style="color: #2c3e50;">🔔 Project Reminder</h2>
-                <p>Hello <strong>{user.username}</strong>,</p>
-                <p>This is a reminder about your project:</p>
-                
-                <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
-                    <p><strong>Project:</strong> {project.name}</p>
-                    <p><strong>Status:</strong> <span style="color: #007bff;">{project.status}</span></p>
-                    <p><strong>Expected End Date:</strong> {expected_date_str}</p>
-                    <p><strong>{status_text}</strong></p>
-                </div>
-                
-                {f'<p><em>{project.comments}</em></p>' if project.comments else ''}
-                
-                <p>Stay on track and keep up the great work! 💪</p>
-                
-                <hr style="margin: 20px 0; border: none; border-top: 1px solid #ddd;">
-                <p style="font-size: 12px; color: #666;">
-                    VCore Project Management System<br>
-                    <a href="{self.app_url}/projects">View All Projects</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return self.send_email(user.email, subject, body, html)
+        return self.send_message(self.render_project_reminder(project, user, custom_subject, custom_message))
     
     def send_task_reminder(self, task, user, custom_subject=None, custom_message=None):
         """Send task-specific reminder email via SES"""
         if not user.email:
             return {'success': False, 'error': 'User has no email address'}
         
-        task_name = task.task_name or task.template.name
-        project_name = task.project.name if task.project else "General"
+        return self.send_message(self.render_task_reminder(task, user, custom_subject, custom_message))
+    
+    def render_project_reminder(self, project, user, custom_subject=None, custom_message=None):
+        """Build a project reminder as {'to', 'subject', 'body', 'html'} without sending it"""
+        return self._render_one({'user': user, 'items': [('project', project, custom_message)], 'subject': custom_subject})
+    
+    def render_task_reminder(self, task, user, custom_subject=None, custom_message=None):
+        """Build a task reminder as {'to', 'subject', 'body', 'html'} without sending it"""
+        return self._render_one({'user': user, 'items': [('task', task, custom_message)], 'subject': custom_subject})
+    
+    def render_digest(self, user, items):
+        """Build one email covering several reminders for the same user
         
-        # Format subject
-        if custom_subject:
-            subject = custom_subject
-        else:
-            subject = f"🔔 Task Reminder: {task_name}"
+        items is a list of (reminder_type, project or task, custom_message);
+        each becomes the same section a single reminder would show, with its
+        custom message (if any) underneath. Custom subjects don't apply.
+        """
+        return self._render_one({'user': user, 'items': items})
+    
+    def render_many(self, requests):
+        """Render a batch of emails; returns a (message, error) pair per request
         
-        # Format message
-        if custom_message:
-            body = custom_message
-        else:
-            body = f"""Hello {user.username},
+        Each request is {'user', 'items', 'subject' (optional)} with items as
+        for render_digest. One item renders as that project's or task's
+        reminder (a custom message replaces the plain-text body, a custom
+        subject the subject); several render as a digest. A project or task
+        appearing in several emails has its section rendered once.
+        """
+        sections = {}
+        rendered = []
+        for request in requests:
+            try:
+                rendered.append((self._render(request, sections), None))
+            except Exception as e:
+                rendered.append((None, str(e)))
+        return rendered
+    
+    def _render_one(self, request):
+        message, error = self.render_many([request])[0]
+        if error:
+            raise ValueError(error)
+        return message
+    
+    def _render(self, request, sections):
+        user = request['user']
+        items = request['items']
+        
+        if len(items) == 1:
+            reminder_type, target, custom_message = items[0]
+            text, html = self._section(reminder_type, target, sections)
+            if reminder_type == 'project':
+                subject = request.get('subject') or f"🔔 Reminder: {target.name}"
+            else:
+                subject = request.get('subject') or f"🔔 Task Reminder: {_task_name(target)}"
+            context = {'user': user, 'app_url': self.app_url}
+            return {
+                'to': user.email,
+                'subject': subject,
+                'body': custom_message or TEMPLATES[f'{reminder_type}_reminder.txt'].render(context, section=text),
+                'html': TEMPLATES[f'{reminder_type}_reminder.html'].render(context, section=html)
+            }
+        
+        projects = sum(1 for reminder_type, _, _ in items if reminder_type == 'project')
+        tasks = len(items) - projects
+        counts = ' and '.join(f"{n} {noun}{'s' if n != 1 else ''}"
+                              for n, noun in ((projects, 'project'), (tasks, 'task')) if n)
+        text_sections, html_sections = [], []
+        for reminder_type, target, custom_message in items:
+            text, html = self._section(reminder_type, target, sections)
+            text_sections.append((text, custom_message))
+            html_sections.append((html, custom_message))
+        
+        context = {'user': user, 'app_url': self.app_url, 'counts': counts}
+        return {
+            'to': user.email,
+            'subject': f"🔔 Your reminders: {counts}",
+            'body': TEMPLATES['digest.txt'].render(context, sections=text_sections),
+            'html': TEMPLATES['digest.html'].render(context, sections=html_sections)
+        }
+    
+    def _section(self, reminder_type, target, sections):
+        """A project's or task's details as (text, html), memoised in sections"""
+        key = (reminder_type, target.id)
+        if key not in sections:
+            context = _project_context(target) if reminder_type == 'project' else _task_context(target)
+            sections[key] = (
+                TEMPLATES[f'{reminder_type}_section.txt'].render(context).strip(),
+                Markup(TEMPLATES[f'{reminder_type}_section.html'].render(context))
+            )
+        return sections[key]
 
-This is a reminder about your task:
 
-Task: {task_name}
-Project: {project_name}
-Priority: {task.priority}
-Due Date: {task.due_date.strftime('%d %B %Y')}
-Status: {task.status}
+def _task_name(task):
+    return task.task_name or task.template.name
 
-{task.comments if task.comments else ''}
 
-Time to take action! 🚀
+def _project_context(project):
+    # Calculate status text (always initialize this before use)
+    status_text = ""
+    days_remaining = project.days_remaining()
+    if days_remaining is not None:
+        if days_remaining > 0:
+            status_text = f"{days_remaining} days remaining"
+        elif days_remaining == 0:
+            status_text = "Due today!"
+        else:
+            status_text = f"{abs(days_remaining)} days overdue"
+    else:
+        status_text = "Completed"
+    
+    return {
+        'project': project,
+        'status_text': status_text,
+        # Format expected end date with null check
+        'expected_end_date': project.expected_end_date.strftime('%d %B %Y') if project.expected_end_date else 'Not set'
+    }
 
----
-VCore Project Management System
-"""
-        
-        # Create HTML version
-        priority_color = {'High': '#dc3545', 'Medium': '#ffc107', 'Low': '#28a745'}.get(task.priority, '#6c757d')
-        
-        html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px;">
-                <h2 style="color: #2c3e50;">🔔 Task Reminder</h2>
-                <p>Hello <strong>{user.username}</strong>,</p>
-                <p>This is a reminder about your task:</p>
-                
-                <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid {priority_color}; margin: 20px 0;">
-                    <p><strong>Task:</strong> {task_name}</p>
-                    <p><strong>Project:</strong> {project_name}</p>
-                    <p><strong>Priority:</strong> <span style="color: {priority_color};">{task.priority}</span></p>
-                    <p><strong>Due Date:</strong> {task.due_date.strftime('%d %B %Y')}</p>
-                    <p><strong>Status:</strong> {task.status}</p>
-                </div>
-                
-                {f'<p><em>{task.comments}</em></p>' if task.comments else ''}
-                
-                <p>Time to take action! 🚀</p>
-                
-                <hr style="margin: 20px 0; border: none; border-top: 1px solid #ddd;">
-                <p style="font-size: 12px; color: #666;">
-                    VCore Project Management System<br>
-                    <a href="{self.app_url}/tasks/weekly">View Tasks</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return self.send_email(user.email, subject, body, html)
+
+def _task_context(task):
+    return {
+        'task': task,
+        'task_name': _task_name(task),
+        'project_name': task.project.name if task.project else "General",
+        'due_date': task.due_date.strftime('%d %B %Y'),
+        'priority_color': PRIORITY_COLORS.get(task.priority, '#6c757d')
+    }
@@ -0,0 +1,115 @@
+"""
+Image Manifest
+Content hash (MD5) and size for product images, so the WordPress plugin
+can reuse images it already holds instead of downloading them again
+"""
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from utils.wordpress_sync_engine import get_http_session
+
+
+# S3 returns the content MD5 as the ETag for single-part uploads; multipart
+# ETags look like "<md5>-<parts>" and aren't a content hash
+_MD5_ETAG = re.compile(r'^[0-9a-f]{32}$')
+
+
+def describe_image(url: str, session: Optional[requests.Session] = None, timeout=(5, 30)) -> Optional[Dict]:
+    """Get {'hash', 'size'} for an image URL, or None if it can't be fetched
+
+    Tries a HEAD request first (S3 ETag and Content-Length); only images
+    without a usable ETag are downloaded and hashed.
+    """
+    session = session or get_http_session()
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code == 200:
+            etag = (response.headers.get('ETag') or '').strip('"').lower()
+            size = response.headers.get('Content-Length')
+            if _MD5_ETAG.match(etag) and size is not None:
+                return {'hash': etag, 'size': int(size)}
+
+        digest = hashlib.md5()
+        size = 0
+        with session.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                digest.update(chunk)
+                size += len(chunk)
+        return {'hash': digest.hexdigest(), 'size': size}
+
+    except (requests.RequestException, ValueError) as e:
+        print(f"Could not describe image {url}: {e}")
+        return None
+
+
+def ensure_image_manifests(db_connection, products: List, session: Optional[requests.Session] = None,
+                           max_workers=4) -> int:
+    """Fill in manifest entries for any product images not yet described
+
+    URLs are immutable in practice (uploads get a timestamped key), so an
+    entry is computed once per URL. Entries for images no longer on the
+    product are dropped. Writes go through one executemany UPDATE that
+    leaves updated_at alone and bypasses the ORM, so the product doesn't
+    look edited. Returns the number of images described.
+    """
+    from models import Product
+    from sqlalchemy import update, bindparam
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    manifests = {product.id: product.get_image_manifest() for product in products}
+    missing = sorted({
+        url for product in products for url in product.get_all_images()
+        if url not in manifests[product.id]
+    })
+
+    described = {}
+    if missing:
+        session = session or get_http_session()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, entry in zip(missing, executor.map(lambda u: describe_image(u, session), missing)):
+                if entry:
+                    described[url] = entry
+
+    changes = []
+    for product in products:
+        current = manifests[product.id]
+        manifest = {}
+        for url in product.get_all_images():
+            entry = current.get(url) or described.get(url)
+            if entry:
+                manifest[url] = entry
+        if manifest != current:
+            value = json.dumps(manifest, sort_keys=True) if manifest else None
+            changes.append({'vcore_id': product.id, 'manifest': value})
+            set_committed_value(product, 'image_manifest', value)
+
+    if changes:
+        products_table = Product.__table__
+        db_connection.execute(
+            update(products_table)
+            .where(products_table.c.id == bindparam('vcore_id'))
+            .values(image_manifest=bindparam('manifest'), updated_at=products_table.c.updated_at),
+            changes
+        )
+        db_connection.commit()
+
+    return len(described)
+
+
+def manifest_entries(product) -> List[Dict]:
+    """Manifest entries for the product's images in display order (described images only)"""
+    manifest = product.get_image_manifest() if hasattr(product, 'get_image_manifest') else {}
+    entries = []
+    for url in product.get_all_images():
+        entry = manifest.get(url)
+        if entry:
+            entries.append({'url': url, 'hash': entry['hash'], 'size': entry['size']})
+    return entries
@@ -0,0 +1,102 @@
+"""
+ISO Week Calendar
+Tasks are assigned to ISO weeks (Monday to Sunday; week 1 holds January
+4th, so some years have 53 weeks). Every week from FIRST_YEAR to LAST_YEAR
+is built once at import and numbered with a week_id ordinal, so the number
+of weeks between two weeks - a task's lag - is a subtraction, across year
+boundaries and 53-week years alike, and looking a week up is O(1). Task
+rollover, the weekly board and analytics all use it.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import case
+
+
+FIRST_YEAR = 2000
+LAST_YEAR = 2100
+
+
+class IsoWeek(NamedTuple):
+    """One ISO week: its ordinal, ISO year and week number, Monday and Sunday"""
+    week_id: int
+    year: int
+    week: int
+    start: date
+    end: date
+
+
+def _week1_monday(year):
+    jan_4 = date(year, 1, 4)
+    return jan_4 - timedelta(days=jan_4.weekday())
+
+
+_EPOCH = _week1_monday(FIRST_YEAR)
+# week_id of each year's week 1, and how many weeks the year has
+YEAR_START = {}
+WEEKS_IN_YEAR = {}
+# Indexed by week_id
+WEEKS = []
+
+for _year in range(FIRST_YEAR, LAST_YEAR + 1):
+    YEAR_START[_year] = len(WEEKS)
+    WEEKS_IN_YEAR[_year] = (_week1_monday(_year + 1) - _week1_monday(_year)).days // 7
+    for _week in range(1, WEEKS_IN_YEAR[_year] + 1):
+        _start = _week1_monday(_year) + timedelta(weeks=_week - 1)
+        WEEKS.append(IsoWeek(len(WEEKS), _year, _week, _start, _start + timedelta(days=6)))
+
+
+def week_id(year, week):
+    """Ordinal of ISO week `week` of `year`; ValueError if there is no such week"""
+    if year not in YEAR_START or not 1 <= week <= WEEKS_IN_YEAR[year]:
+        raise ValueError(f"No ISO week {week} in {year}")
+    return YEAR_START[year] + week - 1
+
+
+def get_week(year, week):
+    """The IsoWeek for a year and week number"""
+    return WEEKS[week_id(year, week)]
+
+
+def week_of(day):
+    """The IsoWeek containing a date or datetime"""
+    if isinstance(day, datetime):
+        day = day.date()
+    ordinal = (day - _EPOCH).days // 7
+    if not 0 <= ordinal < len(WEEKS):
+        raise ValueError(f"{day} is outside the {FIRST_YEAR}-{LAST_YEAR} calendar")
+    return WEEKS[ordinal]
+
+
+def current_week():
+    """The IsoWeek containing today (local time, as tasks are assigned)"""
+    return week_of(datetime.now())
+
+
+def shift(iso_week, weeks):
+    """The week `weeks` before (negative) or after iso_week, kept within the calendar"""
+    return WEEKS[min(max(iso_week.week_id + weeks, 0), len(WEEKS) - 1)]
+
+
+def lag_weeks(original_year, original_week, current=None):
+    """Whole weeks from the original week to `current` (default this week), never negative"""
+    current = current or current_week()
+    return max(0, current.week_id - week_id(original_year, original_week))
+
+
+def week_id_expr(year_column, week_column, last_year=LAST_YEAR):
+    """SQL expression for the week_id of (year, week) columns, for week arithmetic in queries
+
+    A CASE over the years up to last_year; NULL for other years.
+    """
+    year_start = {year: start for year, start in YEAR_START.items() if year <= last_year}
+    return case(year_start, value=year_column) + week_column - 1
+
+
+def lag_expr(year_column, week_column, current=None):
+    """SQL expression for lag_weeks() over (year, week) columns"""
+    current = current or current_week()
+    # Later years can't lag, so they needn't be in the CASE
+    lag = current.week_id - week_id_expr(year_column, week_column, last_year=current.year)
+    return case((lag > 0, lag), else_=0)
@@ -0,0 +1,72 @@
+"""
+Cached Dropdown Lookups
+The (id, name) lists behind filter and form dropdowns - active users, open
+projects, the projects a promotor works on - change rarely but were
+queried on every page view. They are cached for LOOKUPS_TTL seconds; user,
+project and task assignment writes through the ORM drop them (see the
+model events).
+"""
+
+import os
+
+from sqlalchemy import exists
+
+from models import db, Project, PromotorTask, User
+from utils.cache import TTLCache
+
+# Projects updates and tasks can still be filed against
+OPEN_PROJECT_STATUSES = ('Not Started', 'In Progress')
+
+_lookups_cache = TTLCache(ttl=float(os.getenv('LOOKUPS_TTL', '300')))
+
+
+def active_users():
+    """[(id, username), ...] of active users, by username"""
+    return _lookups_cache.get(('users',), lambda: [
+        tuple(row) for row in db.session.query(User.id, User.username).filter(
+            User.is_active == True
+        ).order_by(User.username)
+    ])
+
+
+def open_projects():
+    """[(id, name), ...] of projects not yet completed or on hold, by name"""
+    return _lookups_cache.get(('projects', 'open'), lambda: [
+        tuple(row) for row in db.session.query(Project.id, Project.name).filter(
+            Project.status.in_(OPEN_PROJECT_STATUSES)
+        ).order_by(Project.name)
+    ])
+
+
+def all_projects():
+    """[(id, name), ...] of every project, by name"""
+    return _lookups_cache.get(('projects', 'all'), lambda: [
+        tuple(row) for row in db.session.query(Project.id, Project.name).order_by(Project.name)
+    ])
+
+
+def allowed_projects(user):
+    """[(id, name), ...] of the open projects user can file daily updates against, by name
+
+    Managers and admins can update any open project; others only those
+    they have been assigned tasks on.
+    """
+    if user.is_manager_or_admin():
+        return open_projects()
+    user_id = user.id
+    return _lookups_cache.get(('projects', 'promotor', user_id), lambda: [
+        tuple(row) for row in db.session.query(Project.id, Project.name).filter(
+            Project.status.in_(OPEN_PROJECT_STATUSES),
+            exists().where(PromotorTask.project_id == Project.id, PromotorTask.promotor_id == user_id)
+        ).order_by(Project.name)
+    ])
+
+
+def invalidate_lookups(users=False, projects=False, promotor_ids=()):
+    """Forget cached user lists, all project lists, or the allowed projects of some promotors"""
+    if users:
+        _lookups_cache.invalidate(prefix=('users',))
+    if projects:
+        _lookups_cache.invalidate(prefix=('projects',))
+    for promotor_id in promotor_ids:
+        _lookups_cache.invalidate(key=('projects', 'promotor', promotor_id))
@@ -0,0 +1,144 @@
+"""
+Projects List
+Projects, newest first, a page at a time. Pages are keyset-paginated on
+(created_at, id) like the daily updates feed. Each row is a flat
+projection with the owner's name joined in and the schedule health
+(overdue, days remaining) computed by the database, so the template calls
+no model methods and triggers no lazy loads. A second, grouped query adds
+an open task summary for the projects on the page.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from models import db, Project, PromotorTask, User
+from utils.iso_weeks import lag_expr
+from utils.task_rollover import INCOMPLETE_STATUSES
+
+PROJECTS_PAGE_SIZE = 50
+
+
+class days_until(FunctionElement):
+    """SQL whole days from start to end (dates); negative once end has passed"""
+    type = db.Integer()
+    name = 'days_until'
+    inherit_cache = True
+
+
+@compiles(days_until)
+def _days_until_mysql(element, compiler, **kw):
+    end, start = element.clauses
+    return f"DATEDIFF({compiler.process(end, **kw)}, {compiler.process(start, **kw)})"
+
+
+@compiles(days_until, 'sqlite')
+def _days_until_sqlite(element, compiler, **kw):
+    end, start = element.clauses
+    return f"CAST(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)}) AS INTEGER)"
+
+
+@compiles(days_until, 'postgresql')
+def _days_until_postgresql(element, compiler, **kw):
+    end, start = element.clauses
+    return f"({compiler.process(end, **kw)} - {compiler.process(start, **kw)})"
+
+
+def get_projects_page(status: Optional[str] = None, owner_id: Optional[int] = None,
+                      cursor: Optional[str] = None, page_size: int = PROJECTS_PAGE_SIZE) -> Dict:
+    """One page of projects, newest first
+
+    cursor is the next_cursor of the previous page. Returns {'projects':
+    [project dict, ...], 'next_cursor': str or None}. Besides its columns
+    and owner_name, each project carries is_overdue and days_remaining (as
+    Project.is_overdue() / days_remaining()) and open_tasks, overdue_tasks
+    and max_lag over its incomplete tasks.
+    """
+    today = date.today()
+    pending = Project.status != 'Completed'
+    query = db.session.query(
+        Project.id,
+        Project.name,
+        Project.owner_id,
+        Project.start_date,
+        Project.expected_end_date,
+        Project.actual_end_date,
+        Project.status,
+        Project.comments,
+        Project.created_at,
+        User.username.label('owner_name'),
+        db.case((and_(pending, Project.expected_end_date < today), True), else_=False).label('is_overdue'),
+        db.case((pending, days_until(Project.expected_end_date, today)), else_=None).label('days_remaining')
+    ).outerjoin(User, User.id == Project.owner_id)
+
+    if status:
+        query = query.filter(Project.status == status)
+    if owner_id:
+        query = query.filter(Project.owner_id == owner_id)
+
+    position = decode_cursor(cursor)
+    if position:
+        after_created, after_id = position
+        query = query.filter(or_(
+            Project.created_at < after_created,
+            and_(Project.created_at == after_created, Project.id < after_id)
+        ))
+
+    # One row past the page says whether there is another
+    rows = query.order_by(Project.created_at.desc(), Project.id.desc()).limit(page_size + 1).all()
+
+    projects = []
+    for row in rows[:page_size]:
+        project = row._asdict()
+        project['is_overdue'] = bool(project['is_overdue'])
+        projects.append(project)
+
+    summaries = _task_summaries([project['id'] for project in projects], today)
+    for project in projects:
+        project.update(summaries.get(project['id'], {'open_tasks': 0, 'overdue_tasks': 0, 'max_lag': 0}))
+
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return {'projects': projects, 'next_cursor': next_cursor}
+
+
+def _task_summaries(project_ids, today):
+    """{project_id: {'open_tasks', 'overdue_tasks', 'max_lag'}} over the incomplete tasks of project_ids"""
+    if not project_ids:
+        return {}
+    rows = db.session.query(
+        PromotorTask.project_id,
+        db.func.count(PromotorTask.id),
+        db.func.sum(db.case((or_(PromotorTask.status == 'Overdue', PromotorTask.due_date < today), 1), else_=0)),
+        db.func.max(lag_expr(PromotorTask.original_year, PromotorTask.original_week))
+    ).filter(
+        # Leading columns of idx_task_project_status
+        PromotorTask.project_id.in_(project_ids),
+        PromotorTask.status.in_(INCOMPLETE_STATUSES)
+    ).group_by(PromotorTask.project_id).all()
+    return {
+        project_id: {'open_tasks': open_tasks, 'overdue_tasks': overdue or 0, 'max_lag': max_lag or 0}
+        for project_id, open_tasks, overdue, max_lag in rows
+    }
+
+
+def encode_cursor(created_at, project_id):
+    """Opaque (URL-safe) position after which the next page starts"""
+    return f"{created_at.isoformat()}_{project_id}"
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from encode_cursor(), or None if missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        created_at, project_id = cursor.split('_')
+        return datetime.fromisoformat(created_at), int(project_id)
+    except ValueError:
+        return None
@@ -0,0 +1,47 @@
+"""
+Rate Limiter
+Token bucket shared by worker threads that call rate-limited APIs (SES)
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`
+
+    SES enforces a per-second send rate on the account; keeping the bucket at
+    that rate means sends are never throttled, whatever the number of worker
+    threads. The default capacity of one token spaces calls evenly - a burst
+    on top of the steady rate would exceed it within the same second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1, deadline: Optional[float] = None) -> bool:
+        """Block until tokens are available and take them
+
+        deadline is a time.monotonic() value; returns False without taking
+        anything if the tokens wouldn't be available before it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
@@ -0,0 +1,369 @@
+"""
+Recurrence Rules
+RRULE-style recurrence (the RFC 5545 subset reminders need: FREQ, INTERVAL,
+BYDAY, BYMONTHDAY, COUNT, UNTIL), evaluated in the reminder's time zone.
+Occurrences are computed on demand from a cursor - the last occurrence
+handled - so a recurring reminder is one row, not one row per occurrence.
+"""
+
+import calendar
+import os
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+WEEKDAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+# recurrence_pattern values from before rules existed
+LEGACY_PATTERNS = {'daily': 'DAILY', 'weekly': 'WEEKLY', 'monthly': 'MONTHLY'}
+
+# Zone reminder times are entered in (and rules evaluated in) unless the reminder says otherwise
+DEFAULT_TIMEZONE = os.getenv('REMINDER_TIMEZONE', 'UTC')
+# Offered on the reminder form
+TIMEZONE_CHOICES = tuple(dict.fromkeys((
+    DEFAULT_TIMEZONE, 'UTC', 'Asia/Kolkata', 'Asia/Dubai', 'Asia/Singapore',
+    'Europe/London', 'America/New_York', 'Australia/Sydney'
+)))
+
+# Weekday/month-day combinations repeat within 28 years (400 for whole
+# months); a rule with no occurrence in that span has none at all
+_SEARCH_YEARS = {'DAILY': 28, 'WEEKLY': 28, 'MONTHLY': 400}
+
+
+class RecurrenceRule:
+    """An immutable recurrence rule, read from and written as an RRULE string
+
+    byday holds (ordinal, weekday) pairs with Monday = 0; ordinal 0 means
+    every such weekday, +n/-n the nth from the start/end of the month
+    (MONTHLY only). bymonthday values may be negative (-1 = last day).
+    until is a naive local datetime and is inclusive. Occurrences keep the
+    start's time of day; dates that don't exist in a month (the 31st, or
+    the 5th Monday) are skipped, as in RFC 5545.
+    """
+
+    def __init__(self, freq: str, interval: int = 1, byday=(), bymonthday=(),
+                 count: Optional[int] = None, until: Optional[datetime] = None):
+        freq = (freq or '').upper()
+        if freq not in FREQUENCIES:
+            raise ValueError(f'Unsupported FREQ: {freq}')
+        if int(interval) < 1:
+            raise ValueError('INTERVAL must be at least 1')
+        if count is not None and int(count) < 1:
+            raise ValueError('COUNT must be at least 1')
+        if count is not None and until is not None:
+            raise ValueError('COUNT and UNTIL cannot both be set')
+
+        byday = tuple(sorted({(int(n), int(wd)) for n, wd in byday}))
+        bymonthday = tuple(sorted({int(d) for d in bymonthday}))
+        for n, wd in byday:
+            if not 0 <= wd <= 6 or not -5 <= n <= 5:
+                raise ValueError(f'Invalid BYDAY entry: {n}{wd}')
+            if n and freq != 'MONTHLY':
+                raise ValueError('BYDAY ordinals are only allowed with FREQ=MONTHLY')
+        for d in bymonthday:
+            if d == 0 or not -31 <= d <= 31:
+                raise ValueError(f'Invalid BYMONTHDAY: {d}')
+        if bymonthday and freq == 'WEEKLY':
+            raise ValueError('BYMONTHDAY is not allowed with FREQ=WEEKLY')
+
+        self.freq = freq
+        self.interval = int(interval)
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.count = int(count) if count is not None else None
+        self.until = until
+
+    # ------------------------------------------------------------------
+    # Parsing and formatting
+
+    @classmethod
+    def parse(cls, text: str) -> 'RecurrenceRule':
+        """Parse 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;UNTIL=20261231T235959' (RRULE: prefix optional)"""
+        text = (text or '').strip()
+        if text.upper().startswith('RRULE:'):
+            text = text[6:]
+
+        parts = {}
+        for part in filter(None, text.split(';')):
+            name, _, value = part.partition('=')
+            parts[name.strip().upper()] = value.strip()
+
+        unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'BYMONTHDAY', 'COUNT', 'UNTIL', 'WKST'}
+        if unknown:
+            raise ValueError(f"Unsupported rule parts: {', '.join(sorted(unknown))}")
+        if parts.get('WKST', 'MO').upper() != 'MO':
+            raise ValueError('Only WKST=MO is supported')
+
+        byday = []
+        for item in filter(None, parts.get('BYDAY', '').upper().split(',')):
+            code, ordinal = item[-2:], item[:-2]
+            if code not in WEEKDAYS:
+                raise ValueError(f'Invalid BYDAY entry: {item}')
+            byday.append((int(ordinal) if ordinal else 0, WEEKDAYS.index(code)))
+
+        return cls(
+            parts.get('FREQ'),
+            interval=int(parts.get('INTERVAL', 1)),
+            byday=byday,
+            bymonthday=[int(d) for d in filter(None, parts.get('BYMONTHDAY', '').split(','))],
+            count=int(parts['COUNT']) if 'COUNT' in parts else None,
+            until=_parse_until(parts['UNTIL']) if 'UNTIL' in parts else None
+        )
+
+    def __str__(self):
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(f"{n or ''}{WEEKDAYS[wd]}" for n, wd in self.byday))
+        if self.bymonthday:
+            parts.append('BYMONTHDAY=' + ','.join(str(d) for d in self.bymonthday))
+        if self.count is not None:
+            parts.append(f'COUNT={self.count}')
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        return ';'.join(parts)
+
+    def __repr__(self):
+        return f'<RecurrenceRule {self}>'
+
+    def __eq__(self, other):
+        return isinstance(other, RecurrenceRule) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return (self.freq, self.interval, self.byday, self.bymonthday, self.count, self.until)
+
+    def describe(self) -> str:
+        """Short human description, e.g. 'Every 2 weeks on Mon, Thu'"""
+        unit = {'DAILY': 'day', 'WEEKLY': 'week', 'MONTHLY': 'month'}[self.freq]
+        text = f'Every {self.interval} {unit}s' if self.interval > 1 else f'Every {unit}'
+        if self.byday:
+            text += ' on ' + ', '.join(_describe_byday(n, wd) for n, wd in self.byday)
+        if self.bymonthday:
+            # Negative days count back from the end: 'on day 1 and the last, 2nd-to-last day'
+            parts = []
+            days = [str(d) for d in self.bymonthday if d > 0]
+            if days:
+                parts.append('day ' + ', '.join(days))
+            from_end = [_ordinal(d) for d in reversed(self.bymonthday) if d < 0]
+            if from_end:
+                parts.append('the ' + ', '.join(from_end) + ' day')
+            text += ' on ' + ' and '.join(parts)
+        if self.count is not None:
+            text += f', {self.count} times'
+        if self.until is not None:
+            text += f", until {self.until.strftime('%d %b %Y')}"
+        return text
+
+    # ------------------------------------------------------------------
+    # Expansion (naive local datetimes)
+
+    def occurrences(self, start: datetime, after: Optional[datetime] = None, index: int = 0) -> Iterator[datetime]:
+        """Yield occurrences on or after start (and strictly after `after`), lazily
+
+        index is how many occurrences come at or before `after`; it's only
+        needed for COUNT. Periods before `after` are jumped over, not
+        generated, so resuming from a cursor costs the same however old
+        the rule is.
+        """
+        if self.count is not None and index >= self.count:
+            return
+
+        from_day = start.date() if after is None else max(start.date(), after.date())
+        time_of_day = start.time()
+        horizon = _add_years(from_day, _SEARCH_YEARS[self.freq])
+
+        try:
+            for period_start, days in self._periods(start.date(), from_day):
+                if period_start > horizon:
+                    return
+                for day in days:
+                    occurrence = datetime.combine(day, time_of_day)
+                    if occurrence < start or (after is not None and occurrence <= after):
+                        continue
+                    if self.until is not None and occurrence > self.until:
+                        return
+                    yield occurrence
+                    horizon = _add_years(day, _SEARCH_YEARS[self.freq])
+                    index += 1
+                    if self.count is not None and index >= self.count:
+                        return
+        except OverflowError:
+            return
+
+    def next_after(self, start: datetime, after: Optional[datetime] = None, index: int = 0) -> Optional[datetime]:
+        """The first occurrence after `after` (or the first one at all), or None if the rule has ended"""
+        return next(self.occurrences(start, after, index), None)
+
+    def _periods(self, start_day: date, from_day: date):
+        """Yield (period start, sorted candidate days) for each period, from the one containing from_day"""
+        if self.freq == 'DAILY':
+            k = -(-(from_day - start_day).days // self.interval)
+            weekdays = {wd for _, wd in self.byday}
+            while True:
+                day = start_day + timedelta(days=k * self.interval)
+                matches = (not weekdays or day.weekday() in weekdays) and self._month_day_ok(day)
+                yield day, [day] if matches else []
+                k += 1
+
+        elif self.freq == 'WEEKLY':
+            week0 = start_day - timedelta(days=start_day.weekday())
+            k = -(-((from_day - week0).days // 7) // self.interval)
+            weekdays = sorted({wd for _, wd in self.byday}) or [start_day.weekday()]
+            while True:
+                week = week0 + timedelta(weeks=k * self.interval)
+                yield week, [week + timedelta(days=wd) for wd in weekdays]
+                k += 1
+
+        else:
+            month0 = start_day.year * 12 + start_day.month - 1
+            k = -(-((from_day.year * 12 + from_day.month - 1) - month0) // self.interval)
+            while True:
+                year, month = divmod(month0 + k * self.interval, 12)
+                if year > 9999:
+                    return
+                yield date(year, month + 1, 1), self._month_days(year, month + 1, start_day.day)
+                k += 1
+
+    def _month_day_ok(self, day: date) -> bool:
+        if not self.bymonthday:
+            return True
+        days_in_month = calendar.monthrange(day.year, day.month)[1]
+        return any(day.day == (d if d > 0 else days_in_month + d + 1) for d in self.bymonthday)
+
+    def _month_days(self, year: int, month: int, start_dom: int):
+        """Sorted days of a month selected by BYMONTHDAY and/or BYDAY (MONTHLY)"""
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+
+        by_month_day = None
+        if self.bymonthday:
+            by_month_day = {d if d > 0 else days_in_month + d + 1 for d in self.bymonthday}
+            by_month_day = {d for d in by_month_day if 1 <= d <= days_in_month}
+
+        by_weekday = None
+        if self.byday:
+            by_weekday = set()
+            for n, wd in self.byday:
+                matches = list(range(1 + (wd - first_weekday) % 7, days_in_month + 1, 7))
+                if n == 0:
+                    by_weekday.update(matches)
+                elif -len(matches) <= (n - 1 if n > 0 else n) < len(matches):
+                    by_weekday.add(matches[n - 1 if n > 0 else n])
+
+        if by_month_day is None and by_weekday is None:
+            selected = {start_dom} if start_dom <= days_in_month else set()
+        elif by_month_day is None:
+            selected = by_weekday
+        elif by_weekday is None:
+            selected = by_month_day
+        else:
+            selected = by_month_day & by_weekday
+
+        return [date(year, month, d) for d in sorted(selected)]
+
+
+def _add_years(day: date, years: int) -> date:
+    try:
+        return date(day.year + years, day.month, 1)
+    except ValueError:
+        return date.max
+
+
+def _parse_until(value: str) -> datetime:
+    value = value.strip()
+    if value.endswith('Z'):
+        raise ValueError('UNTIL must be a local time (no Z suffix)')
+    if 'T' in value:
+        return datetime.strptime(value, '%Y%m%dT%H%M%S')
+    # A date-only UNTIL includes the whole day
+    return datetime.strptime(value, '%Y%m%d').replace(hour=23, minute=59, second=59)
+
+
+def _describe_byday(n: int, wd: int) -> str:
+    if not n:
+        return WEEKDAY_NAMES[wd]
+    return f'{_ordinal(n)} {WEEKDAY_NAMES[wd]}'
+
+
+def _ordinal(n: int) -> str:
+    """'1st', '22nd', ...; negative n counts from the end: -1 'last', -2 '2nd-to-last'"""
+    if n == -1:
+        return 'last'
+    if n < 0:
+        return f'{_ordinal(-n)}-to-last'
+    suffix = 'th' if 11 <= n % 100 <= 13 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f'{n}{suffix}'
+
+
+# ----------------------------------------------------------------------
+# Time zones: the database stores naive UTC, rules run on local wall time
+
+@lru_cache(maxsize=64)
+def get_zone(name: Optional[str]) -> ZoneInfo:
+    """Get a time zone by IANA name (the default zone for None)"""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown time zone: {name}')
+
+
+def to_local(utc_value: datetime, zone_name: Optional[str]) -> datetime:
+    """Naive UTC -> naive wall time in the zone"""
+    return utc_value.replace(tzinfo=timezone.utc).astimezone(get_zone(zone_name)).replace(tzinfo=None)
+
+
+def to_utc(local_value: datetime, zone_name: Optional[str]) -> datetime:
+    """Naive wall time in the zone -> naive UTC
+
+    Wall times skipped by a DST change resolve with the offset in force
+    before it, so they land just after the change.
+    """
+    return local_value.replace(tzinfo=get_zone(zone_name)).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# ----------------------------------------------------------------------
+# Reminder cursor
+
+def rule_for_reminder(reminder) -> Optional[RecurrenceRule]:
+    """The reminder's rule: recurrence_rule, else one built from the legacy pattern and end date"""
+    if not reminder.is_recurring:
+        return None
+    if reminder.recurrence_rule:
+        return RecurrenceRule.parse(reminder.recurrence_rule)
+    freq = LEGACY_PATTERNS.get(reminder.recurrence_pattern or '')
+    if not freq:
+        return None
+    until = None
+    if reminder.recurrence_end_date:
+        until = datetime.combine(reminder.recurrence_end_date, datetime.max.time()).replace(microsecond=0)
+    return RecurrenceRule(freq, until=until)
+
+
+def first_fire_at(rule: RecurrenceRule, start_utc: datetime, zone_name: Optional[str]) -> Optional[datetime]:
+    """UTC time of a rule's first occurrence, starting from the reminder's start time"""
+    first = rule.next_after(to_local(start_utc, zone_name))
+    return to_utc(first, zone_name) if first else None
+
+
+def advance(rule: RecurrenceRule, start_utc: datetime, zone_name: Optional[str], fired_utc: datetime,
+            fired_count: int, not_before_utc: Optional[datetime] = None) -> Tuple[Optional[datetime], int]:
+    """Move a reminder's cursor past the occurrence at fired_utc
+
+    fired_count is the number of occurrences handled including that one.
+    Occurrences earlier than not_before_utc (missed while nothing ran)
+    are skipped but still count towards COUNT. Returns (next fire time in
+    UTC or None when the rule has ended, new occurrence count).
+    """
+    start = to_local(start_utc, zone_name)
+    for occurrence in rule.occurrences(start, after=to_local(fired_utc, zone_name), index=fired_count):
+        occurrence_utc = to_utc(occurrence, zone_name)
+        if not_before_utc is None or occurrence_utc >= not_before_utc:
+            return occurrence_utc, fired_count
+        fired_count += 1
+    return None, fired_count
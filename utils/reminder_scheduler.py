@@ -3,125 +3,497 @@ Reminder scheduler module for checking and sending pending reminders
 """
 from models import db, Reminder, User
 from utils.email_service import EmailService
+from utils.rate_limiter import TokenBucket
+from utils.recurrence import advance, get_zone, rule_for_reminder
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from sqlalchemy import case, select, update
 import os
+import random
+import socket
+import time
+import uuid
+
+
+# SES accounts out of the sandbox start at 14 emails/second
+DEFAULT_SEND_RATE = 14
+DEFAULT_SEND_CONCURRENCY = 8
+# Stop starting new sends this many seconds into a run; keep it below the
+# Lambda timeout. Reminders not sent in time go back to pending for the next run.
+DEFAULT_TIME_BUDGET = 90
+# Reminders claimed per lease
+CLAIM_SIZE = 500
+# A lease outlives the run's time budget by this much, covering sends still
+# in flight at the deadline; after that a crashed run's reminders are reclaimed
+LEASE_GRACE = timedelta(minutes=5)
+# Statuses are written (and committed) every FLUSH_SIZE finished sends
+FLUSH_SIZE = 200
+# Occurrences further in the past than this are missed rather than sent late
+MISSED_AFTER = timedelta(hours=24)
+# Reminders due within this much of now are sent on this run
+LOOKAHEAD = timedelta(minutes=15)
+# A recipient's reminders due within this many minutes go out as one digest
+# email (0 sends every reminder separately)
+DEFAULT_DIGEST_WINDOW = 60
+# Transient send failures are retried after RETRY_BASE_DELAY, doubling with
+# each attempt up to RETRY_MAX_DELAY; after DEFAULT_MAX_ATTEMPTS failed
+# attempts the reminder is dead-lettered
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=5)
+RETRY_MAX_DELAY = timedelta(hours=6)
 
 
 class ReminderScheduler:
-    def __init__(self):
-        self.email_service = EmailService()
+    def __init__(self, email_service=None, max_workers=None, send_rate=None, time_budget=None,
+                 flush_size=FLUSH_SIZE, claim_size=CLAIM_SIZE, worker_id=None, digest_window=None,
+                 max_attempts=None):
+        self.max_workers = max_workers or int(os.getenv('SES_SEND_CONCURRENCY', DEFAULT_SEND_CONCURRENCY))
+        self.time_budget = time_budget or float(os.getenv('REMINDER_DISPATCH_TIME_BUDGET', DEFAULT_TIME_BUDGET))
+        self.flush_size = flush_size
+        self.claim_size = claim_size
+        self.worker_id = (worker_id or f"{socket.gethostname()}:{os.getpid()}")[:80]
+        if digest_window is None:
+            digest_window = float(os.getenv('REMINDER_DIGEST_WINDOW', DEFAULT_DIGEST_WINDOW))
+        self.digest_window = timedelta(minutes=digest_window)
+        self.max_attempts = max_attempts or int(os.getenv('REMINDER_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+        self.email_service = email_service or EmailService(max_pool_connections=self.max_workers)
+        self._send_rate = send_rate or (float(os.getenv('SES_MAX_SEND_RATE')) if os.getenv('SES_MAX_SEND_RATE') else None)
+    
+    @property
+    def send_rate(self):
+        """Emails/second: SES_MAX_SEND_RATE, else the account's quota, else the SES default"""
+        if self._send_rate is None:
+            self._send_rate = self.email_service.get_max_send_rate() or DEFAULT_SEND_RATE
+        return self._send_rate
     
     def check_and_send_reminders(self):
-        """Check for pending reminders and send them"""
-        # Get current time
+        """Claim due reminders in leased batches and send them until none are left or time is up
+        
+        Runs may overlap (a slow cron run, two Lambda instances, several
+        workers): each reminder is claimed by exactly one of them.
+        """
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        bucket = TokenBucket(self.send_rate)
+        
+        print(f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Dispatching reminders as {self.worker_id}")
+        
+        totals = {'total': 0, 'sent': 0, 'failed': 0, 'retries_scheduled': 0, 'dead_lettered': 0, 'deferred': 0,
+                  'recurrences_scheduled': 0, 'emails': 0, 'batches': 0}
+        while time.monotonic() < deadline:
+            lease_owner = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+            reminders = self.claim_reminders(lease_owner)
+            if not reminders:
+                break
+            
+            print(f"Claimed {len(reminders)} reminders")
+            result = self.dispatch(reminders, lease_owner=lease_owner, deadline=deadline, bucket=bucket)
+            for key in ('total', 'sent', 'failed', 'retries_scheduled', 'dead_lettered', 'deferred',
+                        'recurrences_scheduled', 'emails'):
+                totals[key] += result[key]
+            totals['batches'] += 1
+            if result['deferred'] or len(reminders) < self.claim_size:
+                break
+        
+        totals['elapsed_seconds'] = round(time.monotonic() - started, 3)
+        print(f"[{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}] Completed: {totals['sent']} sent "
+              f"in {totals['emails']} emails, {totals['failed']} failed, {totals['deferred']} deferred "
+              f"in {totals['elapsed_seconds']}s")
+        
+        return totals
+    
+    def claim_reminders(self, lease_owner, limit=None):
+        """Atomically lease a batch of due reminders to lease_owner and return them
+        
+        Due means pending with next_fire_at in the next 15 minutes (and not
+        more than a day ago, unless recurring - a recurring reminder's missed
+        occurrences are skipped, not abandoned), retrying with next_attempt_at
+        passed, or stuck in 'sending' with an expired lease (its run crashed
+        or timed out). The conditional
+        UPDATE re-checks that state, so when two runs pick the same
+        candidates each reminder still goes to only one of them.
+        
+        With a digest window longer than the 15 minute lookahead, the same
+        recipients' reminders due later in the window are claimed too, so
+        they share the digest instead of arriving in separate emails.
+        """
         now = datetime.utcnow()
+        due = db.or_(
+            db.and_(
+                Reminder.status == 'pending',
+                Reminder.next_fire_at <= now + LOOKAHEAD,
+                db.or_(Reminder.next_fire_at >= now - MISSED_AFTER, Reminder.is_recurring == True)
+            ),
+            db.and_(Reminder.status == 'retrying', Reminder.next_attempt_at <= now),
+            db.and_(Reminder.status == 'sending', Reminder.lease_until < now)
+        )
         
-        # Query reminders that are due (past or upcoming in next 15 minutes)
-        # This catches both overdue reminders and upcoming ones
-        past_time = now - timedelta(hours=24)  # Check last 24 hours for any missed
-        upcoming_time = now + timedelta(minutes=15)
-        
-        pending_reminders = Reminder.query.filter(
-            Reminder.status == 'pending',
-            Reminder.reminder_datetime >= past_time,
-            Reminder.reminder_datetime <= upcoming_time
-        ).all()
-        
-        print(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] Found {len(pending_reminders)} pending reminders to send")
-        
-        sent_count = 0
-        failed_count = 0
-        
-        for reminder in pending_reminders:
-            try:
-                # Send reminder based on type
-                if reminder.reminder_type == 'project' and reminder.project:
-                    result = self.email_service.send_project_reminder(
-                        reminder.project,
-                        reminder.user,
-                        custom_subject=reminder.subject,
-                        custom_message=reminder.message
-                    )
-                elif reminder.reminder_type == 'task' and reminder.task:
-                    result = self.email_service.send_task_reminder(
-                        reminder.task,
-                        reminder.user,
-                        custom_subject=reminder.subject,
-                        custom_message=reminder.message
-                    )
-                else:
-                    result = {'success': False, 'error': 'Invalid reminder type or missing reference'}
+        candidates = db.session.query(Reminder.id, Reminder.user_id).filter(due).order_by(
+            Reminder.next_fire_at, Reminder.id
+        ).limit(limit or self.claim_size).all()
+        if not candidates:
+            return []
+        
+        candidate_ids = [row.id for row in candidates]
+        claimable = due
+        if self.digest_window > LOOKAHEAD:
+            early = db.and_(
+                Reminder.status == 'pending',
+                Reminder.user_id.in_({row.user_id for row in candidates}),
+                Reminder.next_fire_at > now + LOOKAHEAD,
+                Reminder.next_fire_at <= now + self.digest_window
+            )
+            candidate_ids += [row.id for row in db.session.query(Reminder.id).filter(early).limit(
+                limit or self.claim_size
+            )]
+            claimable = db.or_(due, early)
+        
+        db.session.execute(
+            update(Reminder)
+            .where(Reminder.id.in_(candidate_ids), claimable)
+            .values(
+                status='sending',
+                lease_owner=lease_owner,
+                lease_until=now + timedelta(seconds=self.time_budget) + LEASE_GRACE
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        
+        return Reminder.query.options(*Reminder.with_targets()).filter(
+            Reminder.lease_owner == lease_owner,
+            Reminder.status == 'sending'
+        ).order_by(Reminder.next_fire_at, Reminder.id).all()
+    
+    def dispatch(self, reminders, lease_owner=None, deadline=None, bucket=None):
+        """Send reminders concurrently and record their outcomes
+        
+        Every email is rendered up front on this thread, while the
+        reminders' users, projects and tasks (joined in by claim_reminders)
+        are still loaded; the first commit expires them. Worker threads
+        only talk to SES, paced by a token bucket at the account's send
+        rate. Outcomes come back to this thread and are written in batched
+        UPDATEs, one commit per flush. Once the deadline passes, no new
+        sends start; those reminders are released back to pending.
+        
+        With lease_owner, outcomes are only written while the reminders are
+        still leased to it. An occurrence of a recurring reminder that is
+        more than MISSED_AFTER late is recorded as failed without sending;
+        either way the reminder then moves on to its next occurrence.
+        
+        With a digest window, each recipient's reminders go out as one
+        digest email; every reminder in it still gets its own status.
+        
+        Failures SES may not repeat (throttling, outages, network errors)
+        are retried with backoff; the rest (rejected address, no email,
+        missing project or task) are final.
+        """
+        started = time.monotonic()
+        deadline = deadline or started + self.time_budget
+        bucket = bucket or TokenBucket(self.send_rate)
+        outcomes = _OutcomeBuffer(reminders, lease_owner, self.max_attempts)
+        
+        missed_before = datetime.utcnow() - MISSED_AFTER
+        recipients = {}
+        for reminder in reminders:
+            if reminder.next_fire_at and reminder.next_fire_at < missed_before:
+                outcomes.failed(reminder.id, f"Missed occurrence at {reminder.next_fire_at.strftime('%Y-%m-%d %H:%M')} UTC")
+                continue
+            key = reminder.user_id if self.digest_window else reminder.id
+            recipients.setdefault(key, []).append(reminder)
+        
+        requests, covered = [], []
+        for group in recipients.values():
+            request, included, errors = self.build_request(group)
+            for reminder_id, error in errors.items():
+                outcomes.failed(reminder_id, error)
+            if request:
+                requests.append(request)
+                covered.append(included)
+        
+        messages = []
+        for included, (message, error) in zip(covered, self.email_service.render_many(requests)):
+            if message:
+                messages.append((included, message))
+            else:
+                for reminder_id in included:
+                    outcomes.failed(reminder_id, error)
+        
+        def send(message):
+            if not bucket.acquire(deadline=deadline):
+                return None
+            return self.email_service.send_message(message)
+        
+        deferred = []
+        emails = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(send, message): reminder_ids for reminder_ids, message in messages}
+            for future in as_completed(futures):
+                reminder_ids = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'success': False, 'error': str(e), 'transient': False}
                 
-                # Update reminder status
-                if result['success']:
-                    reminder.status = 'sent'
-                    reminder.sent_at = datetime.utcnow()
-                    sent_count += 1
-                    print(f"✅ Sent reminder #{reminder.id} to {reminder.user.email}")
-                    
-                    # Handle recurring reminders
-                    if reminder.is_recurring:
-                        self.create_next_recurrence(reminder)
+                if result is None:
+                    deferred.extend(reminder_ids)
+                elif result['success']:
+                    emails += 1
+                    for reminder_id in reminder_ids:
+                        outcomes.sent(reminder_id)
                 else:
-                    reminder.status = 'failed'
-                    reminder.error_message = result.get('error', 'Unknown error')
-                    failed_count += 1
-                    print(f"❌ Failed to send reminder #{reminder.id}: {reminder.error_message}")
-                
-                db.session.commit()
+                    for reminder_id in reminder_ids:
+                        outcomes.failed(reminder_id, result.get('error', 'Unknown error'),
+                                        transient=result.get('transient', False))
+                    print(f"❌ Failed to send reminder {', '.join(f'#{i}' for i in reminder_ids)}: {result.get('error')}")
                 
-            except Exception as e:
-                print(f"❌ Error processing reminder #{reminder.id}: {str(e)}")
-                reminder.status = 'failed'
-                reminder.error_message = str(e)
-                failed_count += 1
-                db.session.commit()
+                if outcomes.pending >= self.flush_size:
+                    outcomes.flush()
         
-        print(f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] Completed: {sent_count} sent, {failed_count} failed")
+        outcomes.release(deferred)
+        outcomes.flush()
         
+        elapsed = time.monotonic() - started
         return {
-            'total': len(pending_reminders),
-            'sent': sent_count,
-            'failed': failed_count
+            'total': len(reminders),
+            'sent': outcomes.sent_count,
+            'failed': outcomes.failed_count,
+            'retries_scheduled': outcomes.retries_scheduled,
+            'dead_lettered': outcomes.dead_lettered,
+            'deferred': len(deferred),
+            'recurrences_scheduled': outcomes.recurrences_scheduled,
+            'emails': emails,
+            'elapsed_seconds': round(elapsed, 3)
         }
     
-    def create_next_recurrence(self, reminder):
-        """Create next occurrence for recurring reminders"""
-        if not reminder.is_recurring or not reminder.recurrence_pattern:
-            return
+    def build_request(self, reminders):
+        """Describe the email for one recipient's reminders, for EmailService.render_many
         
-        # Calculate next reminder datetime
-        current_datetime = reminder.reminder_datetime
-        
-        if reminder.recurrence_pattern == 'daily':
-            next_datetime = current_datetime + timedelta(days=1)
-        elif reminder.recurrence_pattern == 'weekly':
-            next_datetime = current_datetime + timedelta(weeks=1)
-        elif reminder.recurrence_pattern == 'monthly':
-            # Add approximately 30 days (simplified)
-            next_datetime = current_datetime + timedelta(days=30)
-        else:
-            return
+        Returns (request, ids of the reminders it covers, {id: error} for
+        the ones that can't be sent). One reminder makes a regular reminder
+        email with its custom subject; several make a digest.
+        """
+        user = reminders[0].user
+        if not user or not user.email:
+            return None, [], {reminder.id: 'User has no email address' for reminder in reminders}
+        
+        items, sendable, errors = [], [], {}
+        for reminder in reminders:
+            if reminder.reminder_type == 'project' and reminder.project:
+                items.append(('project', reminder.project, reminder.message))
+            elif reminder.reminder_type == 'task' and reminder.task:
+                items.append(('task', reminder.task, reminder.message))
+            else:
+                errors[reminder.id] = 'Invalid reminder type or missing reference'
+                continue
+            sendable.append(reminder)
         
-        # Check if we've reached the end date
-        if reminder.recurrence_end_date and next_datetime.date() > reminder.recurrence_end_date:
-            print(f"Recurrence ended for reminder #{reminder.id}")
+        if not items:
+            return None, [], errors
+        request = {'user': user, 'items': items}
+        if len(sendable) == 1:
+            request['subject'] = sendable[0].subject
+        return request, [reminder.id for reminder in sendable], errors
+
+
+def retry_delay(attempts):
+    """Wait before retrying after `attempts` failed attempts
+    
+    Doubles from RETRY_BASE_DELAY up to RETRY_MAX_DELAY. Half of it is
+    random, so reminders that failed together (an SES outage) don't all
+    come back in the same second.
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay / 2 + delay / 2 * random.random()
+
+
+def requeue_failed_reminders(include_permanent=False, delay=timedelta(minutes=5)):
+    """Send dead-lettered reminders again after `delay`; returns counts
+    
+    Permanent failures (rejected address, no email, missing project or
+    task) are left alone unless include_permanent - retrying them fails
+    the same way until the cause is fixed.
+    """
+    statuses = ['dead', 'failed'] if include_permanent else ['dead']
+    scheduled_for = datetime.utcnow() + delay
+    
+    reset = db.session.execute(
+        update(Reminder)
+        .where(Reminder.status.in_(statuses))
+        .values(status='pending', error_message=None, attempt_count=0, next_attempt_at=None,
+                # reminder_datetime stays the first occurrence, which recurring reminders count from
+                next_fire_at=scheduled_for)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    skipped = 0 if include_permanent else Reminder.query.filter_by(status='failed').count()
+    db.session.commit()
+    
+    return {
+        'reminders_reset': reset,
+        'permanent_failures_skipped': skipped,
+        'scheduled_for': scheduled_for.strftime('%Y-%m-%d %H:%M:%S UTC')
+    }
+
+
+class _OutcomeBuffer:
+    """Collects send outcomes and writes them in a few set-based statements
+    
+    A flush is one UPDATE for every finished reminder (status, error message,
+    retry state and occurrence cursor via CASE on id), one for the released
+    ones, and a single commit. A transient failure moves the reminder to
+    'retrying' with a backoff, keeping its occurrence, until max_attempts;
+    then it is dead-lettered like a permanent failure. A recurring reminder
+    stays one row: once an occurrence is sent or has finally failed, its
+    next_fire_at moves to the next occurrence and it goes back to pending;
+    only when the rule has ended does it keep its final status ('sent',
+    'failed', or 'dead' when retries ran out). With a lease_owner, every
+    UPDATE only matches reminders still leased to it.
+    """
+    
+    def __init__(self, reminders, lease_owner=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.lease_owner = lease_owner
+        self.max_attempts = max_attempts
+        # Read before the first commit expires the loaded reminders
+        self._cursors = {reminder.id: _cursor(reminder) for reminder in reminders}
+        self._attempts = {reminder.id: reminder.attempt_count or 0 for reminder in reminders}
+        self._sent = []
+        self._failed = {}
+        self._released = []
+        self.sent_count = 0
+        self.failed_count = 0
+        self.retries_scheduled = 0
+        self.dead_lettered = 0
+        self.recurrences_scheduled = 0
+    
+    @property
+    def pending(self):
+        return len(self._sent) + len(self._failed) + len(self._released)
+    
+    def sent(self, reminder_id):
+        self._sent.append(reminder_id)
+    
+    def failed(self, reminder_id, error, transient=False):
+        self._failed[reminder_id] = ((error or 'Unknown error')[:1900], transient)
+    
+    def release(self, reminder_ids):
+        """Hand unsent reminders back to the queue"""
+        self._released.extend(reminder_ids)
+    
+    def flush(self):
+        if not self.pending:
             return
         
-        # Create new reminder
-        new_reminder = Reminder(
-            reminder_type=reminder.reminder_type,
-            project_id=reminder.project_id,
-            task_id=reminder.task_id,
-            user_id=reminder.user_id,
-            reminder_datetime=next_datetime,
-            subject=reminder.subject,
-            message=reminder.message,
-            is_recurring=True,
-            recurrence_pattern=reminder.recurrence_pattern,
-            recurrence_end_date=reminder.recurrence_end_date,
-            status='pending'
-        )
+        reminders_table = Reminder.__table__
+        now = datetime.utcnow()
+        released_lease = {'lease_owner': None, 'lease_until': None}
         
-        db.session.add(new_reminder)
-        print(f"✅ Created next recurrence for reminder #{reminder.id} at {next_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+        if self.lease_owner:
+            # Drop outcomes for reminders whose lease expired and was reclaimed;
+            # the new owner records (and advances) those
+            ids = self._sent + list(self._failed) + self._released
+            owned = {row.id for row in db.session.execute(
+                select(reminders_table.c.id).where(
+                    reminders_table.c.id.in_(ids),
+                    reminders_table.c.status == 'sending',
+                    reminders_table.c.lease_owner == self.lease_owner
+                )
+            )}
+            if len(owned) < len(ids):
+                print(f"⚠️ Lease {self.lease_owner} expired before {len(ids) - len(owned)} outcomes were recorded")
+            self._sent = [reminder_id for reminder_id in self._sent if reminder_id in owned]
+            self._failed = {reminder_id: outcome for reminder_id, outcome in self._failed.items() if reminder_id in owned}
+            self._released = [reminder_id for reminder_id in self._released if reminder_id in owned]
+        
+        def owned_by_us(ids):
+            conditions = [reminders_table.c.id.in_(ids)]
+            if self.lease_owner:
+                conditions.append(reminders_table.c.lease_owner == self.lease_owner)
+            return conditions
+        
+        finished = {reminder_id: (None, False) for reminder_id in self._sent}
+        finished.update(self._failed)
+        if finished:
+            statuses, errors, next_fires, counts, attempts, next_attempts = {}, {}, {}, {}, {}, {}
+            for reminder_id, (error, transient) in finished.items():
+                attempt = self._attempts[reminder_id] + 1 if error else 0
+                
+                if transient and attempt < self.max_attempts:
+                    _, _, _, fire_at, count = self._cursors[reminder_id]
+                    statuses[reminder_id] = 'retrying'
+                    errors[reminder_id] = f"{error} (attempt {attempt} of {self.max_attempts})"
+                    next_fires[reminder_id] = fire_at
+                    counts[reminder_id] = count
+                    attempts[reminder_id] = attempt
+                    next_attempts[reminder_id] = now + retry_delay(attempt)
+                    self.retries_scheduled += 1
+                    continue
+                
+                if transient:
+                    error = f"{error} (gave up after {attempt} attempts)"
+                    self.dead_lettered += 1
+                next_fire, count = self._advance(reminder_id, now)
+                next_fires[reminder_id] = next_fire
+                counts[reminder_id] = count
+                errors[reminder_id] = error
+                attempts[reminder_id] = 0 if next_fire else attempt
+                next_attempts[reminder_id] = None
+                if next_fire:
+                    statuses[reminder_id] = 'pending'
+                    self.recurrences_scheduled += 1
+                elif error:
+                    statuses[reminder_id] = 'dead' if transient else 'failed'
+                else:
+                    statuses[reminder_id] = 'sent'
+            
+            by_id = reminders_table.c.id
+            db.session.execute(
+                update(reminders_table)
+                .where(*owned_by_us(list(finished)))
+                .values(
+                    status=case(statuses, value=by_id),
+                    next_fire_at=case(next_fires, value=by_id),
+                    occurrence_count=case(counts, value=by_id),
+                    error_message=case(errors, value=by_id),
+                    attempt_count=case(attempts, value=by_id),
+                    next_attempt_at=case(next_attempts, value=by_id),
+                    sent_at=case({reminder_id: now for reminder_id in self._sent}, value=by_id,
+                                 else_=reminders_table.c.sent_at) if self._sent else reminders_table.c.sent_at,
+                    **released_lease
+                )
+            )
+        
+        if self._released:
+            db.session.execute(
+                update(reminders_table)
+                .where(*owned_by_us(self._released))
+                .values(status='pending', **released_lease)
+            )
+        
+        db.session.commit()
+        
+        self.sent_count += len(self._sent)
+        self.failed_count += len(self._failed)
+        self._sent = []
+        self._failed = {}
+        self._released = []
+    
+    def _advance(self, reminder_id, now):
+        """(next fire time or None, occurrence count) once the current occurrence is handled"""
+        rule, start, zone, fired, count = self._cursors[reminder_id]
+        count += 1
+        if rule is None:
+            return None, count
+        return advance(rule, start, zone, fired or start, count, not_before_utc=now - MISSED_AFTER)
+
+
+def _cursor(reminder):
+    """(rule, first occurrence, time zone, occurrence due, occurrences handled) for a claimed reminder"""
+    try:
+        rule = rule_for_reminder(reminder)
+        if rule:
+            get_zone(reminder.recurrence_timezone)
+    except ValueError as e:
+        print(f"⚠️ Reminder #{reminder.id} has an invalid recurrence ({e}); treating it as one-time")
+        rule = None
+    return (rule, reminder.reminder_datetime, reminder.recurrence_timezone,
+            reminder.next_fire_at, reminder.occurrence_count or 0)
@@ -0,0 +1,338 @@
+"""
+Full-Text Search
+Daily update text and task comments are tokenized into an inverted index:
+search_postings holds, per token, the documents containing it (entity,
+id, date) with the token's frequency and positions, and search_documents
+each document's author, project, date and length. The index is updated in
+the same flush as every update or task write (see the model events) and
+can be rebuilt from scratch with rebuild_search_index.py.
+
+A query reads only the posting lists of its tokens: every token must
+appear, quoted phrases must appear in order (checked on the positions),
+and matches are ranked with BM25. No LIKE scan of the text is involved.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from markupsafe import Markup, escape
+from sqlalchemy import delete, exists, func, insert, null, select
+
+from models import db, DailyUpdate, Project, PromotorTask, SearchDocument, SearchPosting, TaskTemplate, User
+
+ENTITY_UPDATE = 'update'
+ENTITY_TASK = 'task'
+ENTITIES = (ENTITY_UPDATE, ENTITY_TASK)
+
+MAX_TOKEN_LENGTH = 64
+# Too common to narrow a search; skipped when indexing and querying, though
+# they still take up a position so phrases keep their spacing
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with'
+))
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_RESULTS_LIMIT = 50
+SNIPPET_LENGTH = 200
+REBUILD_CHUNK_SIZE = 500
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text):
+    """[(position, token), ...] for the indexable words of text
+
+    Lower-cased with accents stripped, so 'Café' matches 'cafe'. Stopwords
+    are dropped but keep their positions.
+    """
+    if not text:
+        return []
+    folded = unicodedata.normalize('NFKD', text.lower())
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return [(position, word[:MAX_TOKEN_LENGTH]) for position, word in enumerate(_TOKEN_RE.findall(folded))
+            if word not in STOPWORDS]
+
+
+def parse_query(query):
+    """(terms, phrases) of a query: loose tokens, and [(offset, token), ...] per quoted phrase"""
+    phrases = []
+    for phrase in _PHRASE_RE.findall(query or ''):
+        tokens = tokenize(phrase)
+        if len(tokens) > 1:
+            phrases.append([(position - tokens[0][0], token) for position, token in tokens])
+        elif tokens:
+            # A one-word phrase is just a term
+            query += f' {tokens[0][1]}'
+    terms = [token for _, token in tokenize(_PHRASE_RE.sub(' ', query or ''))]
+    return list(dict.fromkeys(terms)), phrases
+
+
+def index_daily_update(connection, update):
+    """(Re)index a daily update; connection is the flush's (see the model events)"""
+    _replace_document(connection, ENTITY_UPDATE, update.id, update.update_text,
+                      update.user_id, update.project_id, update.update_date)
+
+
+def index_task(connection, task):
+    """(Re)index a task's comments, dated when they were last changed"""
+    _replace_document(connection, ENTITY_TASK, task.id, task.comments,
+                      task.promotor_id, task.project_id, (task.updated_at or datetime.utcnow()).date())
+
+
+def remove_document(connection, entity_type, entity_id):
+    """Drop a document and its postings from the index"""
+    connection.execute(delete(SearchPosting).where(
+        SearchPosting.entity_type == entity_type, SearchPosting.entity_id == entity_id
+    ))
+    connection.execute(delete(SearchDocument).where(
+        SearchDocument.entity_type == entity_type, SearchDocument.entity_id == entity_id
+    ))
+
+
+def index_tasks(task_ids):
+    """(Re)index the comments of tasks written without the ORM (e.g. bulk INSERTs)"""
+    task_ids = list(task_ids)
+    for i in range(0, len(task_ids), REBUILD_CHUNK_SIZE):
+        chunk = task_ids[i:i + REBUILD_CHUNK_SIZE]
+        for model in (SearchPosting, SearchDocument):
+            db.session.execute(delete(model).where(model.entity_type == ENTITY_TASK, model.entity_id.in_(chunk)))
+        _insert_entries(ENTITY_TASK, db.session.execute(_source_query(ENTITY_TASK).where(
+            PromotorTask.id.in_(chunk)
+        )).all())
+        db.session.commit()
+
+
+def rebuild_search_index() -> Dict:
+    """Index every daily update and task comment from scratch; returns counts"""
+    db.session.execute(delete(SearchPosting))
+    db.session.execute(delete(SearchDocument))
+    db.session.commit()
+
+    counts = {'updates': 0, 'tasks': 0, 'postings': 0}
+    for entity_type in ENTITIES:
+        query = _source_query(entity_type)
+        id_column = query.selected_columns[0]
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                query.where(id_column > last_id).order_by(id_column).limit(REBUILD_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            documents, postings = _insert_entries(entity_type, rows)
+            db.session.commit()
+            counts['updates' if entity_type == ENTITY_UPDATE else 'tasks'] += documents
+            counts['postings'] += postings
+            last_id = rows[-1][0]
+    return counts
+
+
+def search(query: str, entity: Optional[str] = None, user_id: Optional[int] = None,
+           project_id: Optional[int] = None, start: Optional[date] = None, end: Optional[date] = None,
+           limit: int = SEARCH_RESULTS_LIMIT) -> Dict:
+    """Best-matching updates and task comments for query, best first
+
+    Every word must appear; "quoted phrases" must appear as written (up to
+    stopwords). entity ('update' or 'task'), user_id, project_id and the
+    start..end date range narrow the search. Returns {'results': [result
+    dict, ...], 'total': matches before the limit, 'terms': tokens searched}.
+    """
+    terms, phrases = parse_query(query)
+    tokens = list(dict.fromkeys(terms + [token for phrase in phrases for _, token in phrase]))
+    empty = {'results': [], 'total': 0, 'terms': tokens}
+    if not tokens:
+        return empty
+
+    # Collection statistics for BM25: document count, mean length, and each token's document frequency
+    total_documents, average_length = db.session.execute(
+        select(func.count(), func.avg(SearchDocument.length))
+    ).one()
+    frequencies = dict(db.session.execute(
+        select(SearchPosting.token, func.count()).where(SearchPosting.token.in_(tokens)).group_by(SearchPosting.token)
+    ).all())
+    if len(frequencies) < len(tokens):
+        return empty  # A token no document contains
+
+    # Only documents holding the rarest token can match, so fetch just their
+    # postings (through the tables, skipping ORM row processing)
+    posting, document = SearchPosting.__table__, SearchDocument.__table__
+    rarest = min(tokens, key=lambda token: frequencies[token])
+    query = select(
+        posting.c.entity_type, posting.c.entity_id, posting.c.token, posting.c.term_frequency,
+        # Positions are only read to check phrases
+        posting.c.positions if phrases else null(), posting.c.doc_date, document.c.length
+    ).join(document, (document.c.entity_type == posting.c.entity_type)
+           & (document.c.entity_id == posting.c.entity_id)).where(posting.c.token.in_(tokens))
+    if len(tokens) > 1:
+        anchor = posting.alias('anchor')
+        query = query.where(exists().where(
+            anchor.c.token == rarest, anchor.c.entity_type == posting.c.entity_type,
+            anchor.c.entity_id == posting.c.entity_id
+        ))
+    if entity:
+        query = query.where(posting.c.entity_type == entity)
+    if start:
+        query = query.where(posting.c.doc_date >= start)
+    if end:
+        query = query.where(posting.c.doc_date <= end)
+    if user_id:
+        query = query.where(document.c.user_id == user_id)
+    if project_id:
+        query = query.where(document.c.project_id == project_id)
+
+    matched = {}
+    for entity_type, entity_id, token, frequency, positions, doc_date, length in db.session.execute(query):
+        entry = matched.setdefault((entity_type, entity_id), (doc_date, length, {}))
+        entry[2][token] = (frequency, positions)
+
+    idf = {token: math.log(1 + (total_documents - count + 0.5) / (count + 0.5))
+           for token, count in frequencies.items()}
+    scored = []
+    for key, (doc_date, length, found) in matched.items():
+        if len(found) < len(tokens) or not all(_has_phrase(found, phrase) for phrase in phrases):
+            continue
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (average_length or 1))
+        score = sum(idf[token] * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    for token, (frequency, _) in found.items())
+        scored.append((score, doc_date.toordinal(), key))
+
+    # Best score first, then newest
+    best = heapq.nlargest(limit, scored, key=lambda match: (match[0], match[1]))
+    results = _hydrate([key for _, _, key in best], tokens)
+    scores = {key: score for score, _, key in best}
+    for result in results:
+        result['score'] = round(scores[(result['entity'], result['id'])], 3)
+    return {'results': results, 'total': len(scored), 'terms': tokens}
+
+
+def _entries(entity_type, entity_id, text, user_id, project_id, doc_date):
+    """(search_documents row, [search_postings rows]) for a document, or (None, []) if it has no words"""
+    tokens = tokenize(text)
+    if not tokens:
+        return None, []
+    positions = {}
+    for position, token in tokens:
+        positions.setdefault(token, []).append(position)
+    document = {
+        'entity_type': entity_type, 'entity_id': entity_id, 'user_id': user_id,
+        'project_id': project_id, 'doc_date': doc_date, 'length': len(tokens),
+        'indexed_at': datetime.utcnow()
+    }
+    postings = [{
+        'token': token, 'entity_type': entity_type, 'entity_id': entity_id, 'doc_date': doc_date,
+        'term_frequency': len(token_positions), 'positions': ','.join(map(str, token_positions))
+    } for token, token_positions in positions.items()]
+    return document, postings
+
+
+def _source_query(entity_type):
+    """(id, text, user_id, project_id, date) of the indexable rows of an entity type"""
+    if entity_type == ENTITY_UPDATE:
+        return select(DailyUpdate.id, DailyUpdate.update_text, DailyUpdate.user_id,
+                      DailyUpdate.project_id, DailyUpdate.update_date)
+    return select(PromotorTask.id, PromotorTask.comments, PromotorTask.promotor_id,
+                  PromotorTask.project_id, PromotorTask.updated_at).where(
+        PromotorTask.comments.isnot(None), PromotorTask.comments != ''
+    )
+
+
+def _insert_entries(entity_type, rows):
+    """Bulk-insert the index entries for _source_query() rows; returns (documents, postings) added"""
+    documents, postings = [], []
+    for entity_id, text, user_id, project_id, doc_date in rows:
+        if isinstance(doc_date, datetime):
+            doc_date = doc_date.date()
+        document, document_postings = _entries(entity_type, entity_id, text, user_id, project_id, doc_date)
+        if document:
+            documents.append(document)
+            postings += document_postings
+    if documents:
+        db.session.execute(insert(SearchDocument), documents)
+        db.session.execute(insert(SearchPosting), postings)
+    return len(documents), len(postings)
+
+
+def _replace_document(connection, entity_type, entity_id, text, user_id, project_id, doc_date):
+    remove_document(connection, entity_type, entity_id)
+    document, postings = _entries(entity_type, entity_id, text, user_id, project_id, doc_date)
+    if document:
+        connection.execute(insert(SearchDocument), [document])
+        connection.execute(insert(SearchPosting), postings)
+
+
+def _has_phrase(document_tokens, phrase):
+    """Whether the phrase's tokens occur at its offsets from some start position"""
+    (_, first_token), rest = phrase[0], phrase[1:]
+    positions = {token: set(map(int, document_tokens[token][1].split(','))) for _, token in rest}
+    return any(
+        all(start + offset in positions[token] for offset, token in rest)
+        for start in map(int, document_tokens[first_token][1].split(','))
+    )
+
+
+def _hydrate(keys, tokens):
+    """Result dicts, in keys order, for the matched updates and tasks (one query per entity type)"""
+    update_ids = [entity_id for entity_type, entity_id in keys if entity_type == ENTITY_UPDATE]
+    task_ids = [entity_id for entity_type, entity_id in keys if entity_type == ENTITY_TASK]
+    found = {}
+
+    if update_ids:
+        for row in db.session.query(
+            DailyUpdate.id, DailyUpdate.update_text, DailyUpdate.update_date, DailyUpdate.is_general,
+            User.username, Project.name.label('project_name')
+        ).join(User, User.id == DailyUpdate.user_id).outerjoin(
+            Project, Project.id == DailyUpdate.project_id
+        ).filter(DailyUpdate.id.in_(update_ids)):
+            found[(ENTITY_UPDATE, row.id)] = {
+                'entity': ENTITY_UPDATE, 'id': row.id, 'date': row.update_date,
+                'title': row.project_name or 'General Update', 'user': row.username,
+                'project': row.project_name, 'snippet': _snippet(row.update_text, tokens)
+            }
+
+    if task_ids:
+        for row in db.session.query(
+            PromotorTask.id, PromotorTask.comments, PromotorTask.updated_at, PromotorTask.task_name,
+            TaskTemplate.name.label('template_name'), User.username, Project.name.label('project_name')
+        ).outerjoin(TaskTemplate, TaskTemplate.id == PromotorTask.template_id).join(
+            User, User.id == PromotorTask.promotor_id
+        ).outerjoin(Project, Project.id == PromotorTask.project_id).filter(PromotorTask.id.in_(task_ids)):
+            found[(ENTITY_TASK, row.id)] = {
+                'entity': ENTITY_TASK, 'id': row.id, 'date': row.updated_at.date(),
+                'title': row.task_name or row.template_name or 'Task', 'user': row.username,
+                'project': row.project_name, 'snippet': _snippet(row.comments, tokens)
+            }
+
+    # Index entries whose row has gone are skipped
+    return [found[key] for key in keys if key in found]
+
+
+def _snippet(text, tokens) -> Markup:
+    """Up to SNIPPET_LENGTH characters of text around the first match, matches in <mark>"""
+    text = text or ''
+    wanted = set(tokens)
+    spans = []
+    for match in _TOKEN_RE.finditer(text):
+        folded = unicodedata.normalize('NFKD', match.group().lower())
+        if ''.join(ch for ch in folded if not unicodedata.combining(ch)) in wanted:
+            spans.append(match.span())
+
+    start = max(0, spans[0][0] - SNIPPET_LENGTH // 3) if spans else 0
+    end = min(len(text), start + SNIPPET_LENGTH)
+    pieces = [Markup('&hellip;')] if start else []
+    position = start
+    for span_start, span_end in spans:
+        if span_start < start or span_end > end:
+            continue
+        pieces += [escape(text[position:span_start]), Markup('<mark>%s</mark>') % text[span_start:span_end]]
+        position = span_end
+    pieces.append(escape(text[position:end]))
+    if end < len(text):
+        pieces.append(Markup('&hellip;'))
+    return Markup('').join(pieces)
@@ -0,0 +1,342 @@
+"""
+Promotor Task Analytics
+Lag trends, completion and on-time rates and per-promotor throughput, read
+from promotor_week_stats (one row per promotor and ISO week) rather than
+from the task history. Rows are refreshed incrementally: only the
+(promotor, original week) groups holding a task changed since the
+watermark - the latest task updated_at already counted - are recomputed,
+each with one GROUP BY over its tasks. Lag percentiles come from per-row
+lag histograms, so reading a chart costs the same however long the
+history grows.
+"""
+
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, AnalyticsRefreshState, PromotorTask, PromotorWeekStats, User
+from utils.cache import TTLCache
+from utils.iso_weeks import WEEKS, current_week, week_id as get_week_id
+
+# Lower bounds of the lag histogram buckets: 0, 1, 2, 3, 4-5, 6-7, 8-12, 13-25, 26+ weeks
+LAG_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 13, 26)
+# Tasks changed up to this long before the watermark are looked at again,
+# covering transactions that committed after a later one was counted
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# (promotor, week) groups recomputed per statement and commit
+REFRESH_CHUNK_SIZE = 500
+# A refresh holds the refresh lease this long past its last chunk, so one
+# that dies part way blocks the next for no longer than this
+REFRESH_LEASE = timedelta(minutes=5)
+# Weeks shown when a chart doesn't ask for a number
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 104
+
+# Chart reads refresh the aggregates at most once per interval per process
+_refresh_gate = TTLCache(ttl=float(os.getenv('ANALYTICS_REFRESH_INTERVAL', '60')), max_entries=1)
+
+
+def bucket_labels():
+    """Display labels for LAG_BUCKETS, e.g. '4-5' and '26+'"""
+    labels = []
+    for lower, upper in zip(LAG_BUCKETS, LAG_BUCKETS[1:] + (None,)):
+        if upper is None:
+            labels.append(f'{lower}+')
+        elif upper - lower == 1:
+            labels.append(str(lower))
+        else:
+            labels.append(f'{lower}-{upper - 1}')
+    return labels
+
+
+def refresh_analytics(full=False) -> Dict:
+    """Bring promotor_week_stats up to date with promotor_tasks; returns counts
+
+    Incremental unless full (or nothing has been aggregated yet): the
+    groups of tasks whose updated_at passed the watermark are recomputed
+    in chunks, each chunk replacing its rows and committing on its own.
+    Groups left empty by deleted tasks, and the old group of a task moved
+    to another promotor, are only corrected by a full refresh.
+
+    Only one refresh runs at a time, across processes: the others (say the
+    parallel chart reads of one page load) find the lease taken and return
+    at once with 'skipped' set, reading the aggregates as they stand.
+    """
+    started = time.monotonic()
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+    if not _claim_refresh(owner):
+        return {'full': full, 'skipped': True, 'groups_refreshed': 0,
+                'elapsed_seconds': round(time.monotonic() - started, 3)}
+    try:
+        full, refreshed = _refresh(full, owner)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        _release_refresh(owner)
+
+    return {
+        'full': full,
+        'skipped': False,
+        'groups_refreshed': refreshed,
+        'elapsed_seconds': round(time.monotonic() - started, 3)
+    }
+
+
+def ensure_fresh():
+    """Refresh incrementally unless this process did so within ANALYTICS_REFRESH_INTERVAL"""
+    _refresh_gate.get('refresh', refresh_analytics)
+
+
+def weekly_trend(weeks=DEFAULT_WEEKS, promotor_id: Optional[int] = None) -> List[Dict]:
+    """Per-week totals for the last `weeks` weeks (everyone's, or one promotor's), oldest first"""
+    rows = _load_rows(weeks, promotor_id)
+    by_week = {}
+    for row in rows:
+        by_week.setdefault(row.week_id, []).append(row)
+
+    current = current_week()
+    trend = []
+    for week_id in range(current.week_id - weeks + 1, current.week_id + 1):
+        week = WEEKS[week_id]
+        trend.append({'week': f'{week.year}-W{week.week:02d}', 'start': week.start.isoformat(),
+                      **_summarise(by_week.get(week_id, []))})
+    return trend
+
+
+def promotor_summary(weeks=DEFAULT_WEEKS) -> List[Dict]:
+    """Per-promotor totals over the last `weeks` weeks, busiest first"""
+    by_promotor = {}
+    for row in _load_rows(weeks):
+        by_promotor.setdefault((row.promotor_id, row.username), []).append(row)
+
+    summary = [{'promotor_id': promotor_id, 'promotor': username or 'N/A', **_summarise(rows)}
+               for (promotor_id, username), rows in by_promotor.items()]
+    summary.sort(key=lambda entry: (-entry['assigned'], entry['promotor']))
+    return summary
+
+
+def lag_distribution(weeks=DEFAULT_WEEKS, promotor_id: Optional[int] = None) -> Dict:
+    """Task counts per lag bucket over the last `weeks` weeks, with percentiles"""
+    summary = _summarise(_load_rows(weeks, promotor_id))
+    return {
+        'buckets': [{'label': label, 'tasks': count}
+                    for label, count in zip(bucket_labels(), summary['lag_histogram'])],
+        'tasks': summary['assigned'],
+        'mean_lag': summary['mean_lag'],
+        'max_lag': summary['max_lag'],
+        'p50_lag': summary['p50_lag'],
+        'p90_lag': summary['p90_lag'],
+        'p99_lag': _percentile(summary['lag_histogram'], 0.99)
+    }
+
+
+def _refresh(full, owner):
+    """Recompute the stale groups while holding the lease; returns (full, groups refreshed)"""
+    watermark = None if full else db.session.scalar(select(func.max(PromotorWeekStats.source_updated_at)))
+
+    if watermark is None:
+        full = True
+        db.session.execute(delete(PromotorWeekStats))
+        keys = None
+    else:
+        keys = db.session.execute(
+            select(PromotorTask.promotor_id, PromotorTask.original_year, PromotorTask.original_week)
+            .where(PromotorTask.updated_at > watermark - WATERMARK_OVERLAP)
+            .distinct()
+        ).all()
+
+    refreshed = 0
+    if keys is None:
+        rows = db.session.execute(_group_query()).all()
+        chunks = [(rows[i:i + REFRESH_CHUNK_SIZE], []) for i in range(0, len(rows), REFRESH_CHUNK_SIZE)]
+    else:
+        chunks = [(None, [tuple(key) for key in keys[i:i + REFRESH_CHUNK_SIZE]])
+                  for i in range(0, len(keys), REFRESH_CHUNK_SIZE)]
+    for rows, chunk in chunks:
+        if rows is None:
+            rows = db.session.execute(_group_query().where(
+                tuple_(PromotorTask.promotor_id, PromotorTask.original_year, PromotorTask.original_week).in_(chunk)
+            )).all()
+        count = _replace_groups(rows, chunk)
+        # Each chunk commits with a lease renewal; if the lease was lost
+        # (expired and taken), the chunk is dropped and the refresh stops
+        if not _renew_refresh(owner):
+            db.session.rollback()
+            break
+        db.session.commit()
+        refreshed += count
+    db.session.commit()
+    return full, refreshed
+
+
+def _claim_refresh(owner) -> bool:
+    """Take the refresh lease unless another refresh holds it"""
+    state = AnalyticsRefreshState.__table__
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(state)
+        .where(state.c.id == 1, db.or_(state.c.lease_until.is_(None), state.c.lease_until < now))
+        .values(lease_owner=owner, lease_until=now + REFRESH_LEASE)
+    ).rowcount
+    if not claimed and db.session.scalar(select(state.c.id).where(state.c.id == 1)) is None:
+        # First refresh ever: create the row, holding the lease
+        try:
+            db.session.execute(insert(state).values(id=1, lease_owner=owner, lease_until=now + REFRESH_LEASE))
+            claimed = 1
+        except IntegrityError:
+            db.session.rollback()
+            return False
+    db.session.commit()
+    return bool(claimed)
+
+
+def _renew_refresh(owner) -> bool:
+    """Extend the lease we hold (in the current transaction); False if it is no longer ours"""
+    state = AnalyticsRefreshState.__table__
+    return bool(db.session.execute(
+        update(state)
+        .where(state.c.id == 1, state.c.lease_owner == owner)
+        .values(lease_until=datetime.utcnow() + REFRESH_LEASE)
+    ).rowcount)
+
+
+def _release_refresh(owner):
+    state = AnalyticsRefreshState.__table__
+    db.session.execute(
+        update(state)
+        .where(state.c.id == 1, state.c.lease_owner == owner)
+        .values(lease_owner=None, lease_until=None, refreshed_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def _group_query():
+    """(promotor, original week) aggregates over promotor_tasks"""
+    lag = func.coalesce(PromotorTask.lag_weeks, 0)
+    completed = PromotorTask.status == 'Completed'
+    moved = db.or_(PromotorTask.assigned_year != PromotorTask.original_year,
+                   PromotorTask.assigned_week != PromotorTask.original_week)
+    on_time = db.and_(completed, lag == 0, func.date(PromotorTask.completed_date) <= PromotorTask.due_date)
+
+    buckets = []
+    for lower, upper in zip(LAG_BUCKETS, LAG_BUCKETS[1:] + (None,)):
+        in_bucket = lag >= lower if upper is None else db.and_(lag >= lower, lag < upper)
+        buckets.append(func.sum(db.case((in_bucket, 1), else_=0)))
+
+    return select(
+        PromotorTask.promotor_id,
+        PromotorTask.original_year,
+        PromotorTask.original_week,
+        func.count(PromotorTask.id),
+        func.sum(db.case((completed, 1), else_=0)),
+        func.sum(db.case((moved, 1), else_=0)),
+        func.sum(db.case((on_time, 1), else_=0)),
+        func.sum(lag),
+        func.max(lag),
+        func.max(PromotorTask.updated_at),
+        *buckets
+    ).group_by(PromotorTask.promotor_id, PromotorTask.original_year, PromotorTask.original_week)
+
+
+def _replace_groups(rows, keys):
+    """Replace the stats rows for `keys` (promotor, year, week) with the aggregates in `rows`"""
+    week_ids = {}
+    for promotor_id, year, week in keys + [tuple(row[:3]) for row in rows]:
+        try:
+            week_ids[(year, week)] = get_week_id(year, week)
+        except ValueError:
+            pass
+
+    stale = [(promotor_id, week_ids[(year, week)]) for promotor_id, year, week in keys if (year, week) in week_ids]
+    if stale:
+        db.session.execute(delete(PromotorWeekStats).where(
+            tuple_(PromotorWeekStats.promotor_id, PromotorWeekStats.week_id).in_(stale)
+        ))
+
+    now = datetime.utcnow()
+    values = []
+    for row in rows:
+        promotor_id, year, week, assigned, completed, moved, on_time, lag_sum, lag_max, updated_at = row[:10]
+        if (year, week) not in week_ids:
+            continue
+        values.append({
+            'promotor_id': promotor_id,
+            'week_id': week_ids[(year, week)],
+            'iso_year': year,
+            'iso_week': week,
+            'assigned': assigned,
+            'completed': completed or 0,
+            'rolled_over': moved or 0,
+            'on_time': on_time or 0,
+            'lag_sum': lag_sum or 0,
+            'lag_max': lag_max or 0,
+            'lag_histogram': json.dumps([count or 0 for count in row[10:]]),
+            'source_updated_at': updated_at,
+            'refreshed_at': now
+        })
+    if values:
+        db.session.execute(insert(PromotorWeekStats), values)
+    return len(values)
+
+
+def _load_rows(weeks, promotor_id=None):
+    current = current_week()
+    query = select(
+        PromotorWeekStats, User.username
+    ).outerjoin(User, User.id == PromotorWeekStats.promotor_id).where(
+        PromotorWeekStats.week_id > current.week_id - weeks,
+        PromotorWeekStats.week_id <= current.week_id
+    )
+    if promotor_id is not None:
+        query = query.where(PromotorWeekStats.promotor_id == promotor_id)
+
+    rows = []
+    for stats, username in db.session.execute(query):
+        stats.username = username
+        rows.append(stats)
+    return rows
+
+
+def _summarise(rows):
+    assigned = sum(row.assigned for row in rows)
+    completed = sum(row.completed for row in rows)
+    on_time = sum(row.on_time for row in rows)
+    lag_sum = sum(row.lag_sum for row in rows)
+    histogram = [0] * len(LAG_BUCKETS)
+    for row in rows:
+        for i, count in enumerate(row.get_lag_histogram()[:len(LAG_BUCKETS)]):
+            histogram[i] += count
+
+    return {
+        'assigned': assigned,
+        'completed': completed,
+        'rolled_over': sum(row.rolled_over for row in rows),
+        'completion_rate': round(completed / assigned, 3) if assigned else None,
+        'on_time_rate': round(on_time / assigned, 3) if assigned else None,
+        'mean_lag': round(lag_sum / assigned, 2) if assigned else None,
+        'max_lag': max((row.lag_max for row in rows), default=None),
+        'p50_lag': _percentile(histogram, 0.5),
+        'p90_lag': _percentile(histogram, 0.9),
+        'lag_histogram': histogram
+    }
+
+
+def _percentile(histogram, fraction):
+    """Label of the bucket holding the given fraction of tasks, or None when empty"""
+    total = sum(histogram)
+    if not total:
+        return None
+    cumulative = 0
+    for label, count in zip(bucket_labels(), histogram):
+        cumulative += count
+        if cumulative >= fraction * total:
+            return label
+    return bucket_labels()[-1]
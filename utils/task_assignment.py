@@ -0,0 +1,182 @@
+"""
+Bulk Task Assignment
+Assigns every template in a set to every promotor in a set for every week
+in a set (optionally linked to one project) in a few statements whatever
+the size: one query validates the ids, then one INSERT ... SELECT crosses
+templates x promotors x weeks in SQL, skipping combinations that already
+have an identical open task with one anti-join. Tasks created with
+comments are then added to the search index.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import exists, insert, literal, select, true, tuple_, union_all
+
+from models import db, PromotorTask, Project, TaskTemplate, User
+from utils.dashboard_stats import invalidate_dashboard_stats
+from utils.iso_weeks import get_week
+from utils.lookups import invalidate_lookups
+from utils.search_index import index_tasks
+from utils.task_rollover import INCOMPLETE_STATUSES
+
+PRIORITIES = ('High', 'Medium', 'Low')
+# Largest templates x promotors x weeks accepted in one request
+MAX_BULK_ASSIGNMENTS = 20000
+# Projects tasks can be linked to
+OPEN_PROJECT_STATUSES = ('Not Started', 'In Progress')
+
+
+class BulkAssignmentError(ValueError):
+    """The requested assignment is invalid; nothing was created"""
+
+
+def assign_tasks(template_ids: Iterable[int], promotor_ids: Iterable[int], weeks: Iterable,
+                 created_by: int, project_id: Optional[int] = None, priority: str = 'Medium',
+                 task_name: Optional[str] = None, comments: Optional[str] = None,
+                 due_weekday: int = 6) -> Dict:
+    """Create a task for each template x promotor x week; returns counts
+
+    weeks are utils.iso_weeks.IsoWeek values. Each task is due on
+    due_weekday (0 = Monday ... 6 = Sunday) of its week. A combination is
+    skipped when the promotor already has an open task (Pending, In
+    Progress or Overdue) from the same template, in the same week, for the
+    same project. Raises BulkAssignmentError if any id is unknown or
+    inactive or the request is too large.
+    """
+    template_ids = sorted(set(template_ids))
+    promotor_ids = sorted(set(promotor_ids))
+    weeks = sorted(set(weeks))
+
+    if not template_ids or not promotor_ids or not weeks:
+        raise BulkAssignmentError('Choose at least one template, one user and one week')
+    if priority not in PRIORITIES:
+        raise BulkAssignmentError(f'Unknown priority: {priority}')
+    if not 0 <= due_weekday <= 6:
+        raise BulkAssignmentError('due_weekday must be 0 (Monday) to 6 (Sunday)')
+    requested = len(template_ids) * len(promotor_ids) * len(weeks)
+    if requested > MAX_BULK_ASSIGNMENTS:
+        raise BulkAssignmentError(
+            f'{requested:,} assignments requested; at most {MAX_BULK_ASSIGNMENTS:,} per request'
+        )
+
+    _validate(template_ids, promotor_ids, project_id)
+
+    now = datetime.utcnow()
+    week_rows = union_all(*[
+        select(
+            literal(week.year).label('year'),
+            literal(week.week).label('week'),
+            literal(week.start + timedelta(days=due_weekday)).label('due_date')
+        ) for week in weeks
+    ]).subquery('weeks')
+    templates = select(TaskTemplate.id).where(TaskTemplate.id.in_(template_ids)).subquery('templates')
+    promotors = select(User.id).where(User.id.in_(promotor_ids)).subquery('promotors')
+
+    already_open = exists().where(
+        PromotorTask.template_id == templates.c.id,
+        PromotorTask.promotor_id == promotors.c.id,
+        PromotorTask.assigned_year == week_rows.c.year,
+        PromotorTask.assigned_week == week_rows.c.week,
+        PromotorTask.project_id == project_id if project_id is not None else PromotorTask.project_id.is_(None),
+        PromotorTask.status.in_(INCOMPLETE_STATUSES)
+    )
+
+    created = db.session.execute(
+        insert(PromotorTask.__table__).from_select(
+            ['template_id', 'task_name', 'promotor_id', 'project_id', 'assigned_week', 'assigned_year',
+             'original_week', 'original_year', 'due_date', 'status', 'lag_weeks', 'priority', 'comments',
+             'created_by', 'created_at', 'updated_at'],
+            select(
+                templates.c.id,
+                literal(task_name or None),
+                promotors.c.id,
+                literal(project_id),
+                week_rows.c.week,
+                week_rows.c.year,
+                week_rows.c.week,
+                week_rows.c.year,
+                week_rows.c.due_date,
+                literal('Pending'),
+                literal(0),
+                literal(priority),
+                literal(comments or None),
+                literal(created_by),
+                literal(now),
+                literal(now)
+            ).select_from(templates).join(promotors, true()).join(week_rows, true()).where(
+                ~already_open
+            )
+        )
+    ).rowcount
+    db.session.commit()
+
+    if created:
+        invalidate_dashboard_stats(tasks=True)
+        if project_id is not None:
+            invalidate_lookups(promotor_ids=promotor_ids)
+        if comments:
+            # The INSERT bypasses the ORM events that index task comments. The
+            # new tasks are found by their natural key (created_at loses its
+            # microseconds in a DATETIME column, so can't be matched); an
+            # open duplicate it also picks up is just reindexed as it is.
+            index_tasks(db.session.scalars(select(PromotorTask.id).where(
+                PromotorTask.template_id.in_(template_ids),
+                PromotorTask.promotor_id.in_(promotor_ids),
+                tuple_(PromotorTask.assigned_year, PromotorTask.assigned_week).in_(
+                    [(week.year, week.week) for week in weeks]
+                ),
+                PromotorTask.project_id == project_id if project_id is not None else PromotorTask.project_id.is_(None),
+                PromotorTask.created_by == created_by,
+                PromotorTask.status.in_(INCOMPLETE_STATUSES)
+            )).all())
+
+    return {
+        'requested': requested,
+        'created': created,
+        'skipped_duplicates': requested - created,
+        'weeks': [f'{week.year}-W{week.week:02d}' for week in weeks]
+    }
+
+
+def parse_weeks(values):
+    """IsoWeeks from '2026-W43' strings or {'year': ..., 'week': ...} dicts"""
+    weeks = []
+    for value in values:
+        try:
+            if isinstance(value, dict):
+                year, week = int(value['year']), int(value['week'])
+            else:
+                year, week = (int(part) for part in str(value).upper().split('-W'))
+            weeks.append(get_week(year, week))
+        except (KeyError, TypeError, ValueError):
+            raise BulkAssignmentError(f'Not an ISO week: {value!r} (use "2026-W43")')
+    return weeks
+
+
+def _validate(template_ids, promotor_ids, project_id):
+    """Check every id in one query; raise BulkAssignmentError naming the bad ones"""
+    found = union_all(
+        select(literal('template').label('kind'), TaskTemplate.id.label('id')).where(
+            TaskTemplate.id.in_(template_ids), TaskTemplate.is_active == True
+        ),
+        select(literal('user'), User.id).where(User.id.in_(promotor_ids), User.is_active == True),
+        select(literal('project'), Project.id).where(
+            Project.id == (project_id or 0), Project.status.in_(OPEN_PROJECT_STATUSES)
+        )
+    )
+    valid = {}
+    for kind, id_ in db.session.execute(found):
+        valid.setdefault(kind, set()).add(id_)
+
+    problems = []
+    missing_templates = set(template_ids) - valid.get('template', set())
+    if missing_templates:
+        problems.append(f"unknown or inactive templates {sorted(missing_templates)}")
+    missing_users = set(promotor_ids) - valid.get('user', set())
+    if missing_users:
+        problems.append(f"unknown or inactive users {sorted(missing_users)}")
+    if project_id is not None and project_id not in valid.get('project', set()):
+        problems.append(f"project {project_id} is not open")
+    if problems:
+        raise BulkAssignmentError('Cannot assign: ' + '; '.join(problems))
@@ -0,0 +1,61 @@
+"""
+Weekly Task Board
+One week's tasks as a flat projection - the task fields the board shows
+plus the template, promotor and project names joined in - read with a
+single query and grouped into the board's status columns.
+"""
+
+from models import db, PromotorTask, TaskTemplate, User, Project
+from sqlalchemy import case
+
+# Board columns, left to right, with their header colours
+BOARD_COLUMNS = (
+    ('Pending', 'secondary'),
+    ('In Progress', 'primary'),
+    ('Overdue', 'danger'),
+    ('Completed', 'success'),
+)
+# Within a column: most urgent first
+PRIORITY_ORDER = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def get_weekly_board(iso_week, promotor_id=None):
+    """Tasks assigned to iso_week (one promotor's, if given), grouped by status
+
+    Returns {status: [task dict, ...]} with every board column present, in
+    column order, each sorted by priority, due date and id. Read through
+    idx_task_week_promotor_status.
+    """
+    query = db.session.query(
+        PromotorTask.id,
+        PromotorTask.status,
+        PromotorTask.priority,
+        PromotorTask.lag_weeks,
+        PromotorTask.due_date,
+        PromotorTask.comments,
+        TaskTemplate.name.label('template_name'),
+        User.username.label('promotor_name'),
+        Project.name.label('project_name')
+    ).outerjoin(TaskTemplate, TaskTemplate.id == PromotorTask.template_id).outerjoin(
+        User, User.id == PromotorTask.promotor_id
+    ).outerjoin(Project, Project.id == PromotorTask.project_id).filter(
+        PromotorTask.assigned_year == iso_week.year,
+        PromotorTask.assigned_week == iso_week.week
+    )
+    if promotor_id is not None:
+        query = query.filter(PromotorTask.promotor_id == promotor_id)
+
+    rows = query.order_by(
+        case(PRIORITY_ORDER, value=PromotorTask.priority, else_=len(PRIORITY_ORDER)),
+        PromotorTask.due_date,
+        PromotorTask.id
+    ).all()
+
+    board = {status: [] for status, _ in BOARD_COLUMNS}
+    for row in rows:
+        if row.status not in board:
+            continue
+        task = row._asdict()
+        task['lag_badge_class'] = PromotorTask.lag_badge_class(row.lag_weeks)
+        board[row.status].append(task)
+    return board
@@ -1,19 +1,33 @@
-from datetime import datetime, timedelta
-from models import db, PromotorTask
+from datetime import datetime
+from models import db, PromotorTask, TaskTemplate, User
+from sqlalchemy import case, update
+from utils.dashboard_stats import invalidate_dashboard_stats
+from utils.iso_weeks import current_week as get_current_week, get_week, lag_expr, lag_weeks
 
+INCOMPLETE_STATUSES = ('Pending', 'In Progress', 'Overdue')
+# Tasks moved per transaction; each chunk is committed on its own so a large
+# rollover never holds row locks for long
+ROLLOVER_CHUNK_SIZE = 1000
+# Rolled-over tasks listed in the summary (the count covers all of them)
+ROLLOVER_SUMMARY_LIMIT = 500
 
-def rollover_incomplete_tasks():
+
+def rollover_incomplete_tasks(chunk_size=ROLLOVER_CHUNK_SIZE, summary_limit=ROLLOVER_SUMMARY_LIMIT):
     """
     Rollover incomplete tasks from previous weeks to current week.
     Returns a summary of rolled-over tasks.
+    
+    Tasks are moved in chunks of chunk_size ids, one UPDATE per chunk
+    that works lag out in SQL from the ISO week calendar (utils.iso_weeks).
+    Each chunk commits on its own. Only tasks still assigned to an earlier
+    week match, so running it again in the same week (or after an
+    interrupted run) only moves what is left.
     """
-    current_date = datetime.now()
-    current_week = current_date.isocalendar()[1]
-    current_year = current_date.isocalendar()[0]
+    current = get_current_week()
+    current_week, current_year = current.week, current.year
     
-    # Get all incomplete tasks from previous weeks
-    incomplete_tasks = PromotorTask.query.filter(
-        PromotorTask.status.in_(['Pending', 'In Progress', 'Overdue']),
+    stale = db.and_(
+        PromotorTask.status.in_(INCOMPLETE_STATUSES),
         db.or_(
             PromotorTask.assigned_year < current_year,
             db.and_(
@@ -21,40 +35,45 @@ def rollover_incomplete_tasks():
                 PromotorTask.assigned_week < current_week
             )
         )
-    ).all()
+    )
+    lag = lag_expr(PromotorTask.original_year, PromotorTask.original_week, current)
     
     rollover_count = 0
     rollover_summary = []
+    last_id = 0
     
-    for task in incomplete_tasks:
-        # Update task to current week
-        task.assigned_week = current_week
-        task.assigned_year = current_year
-        
-        # Calculate and update lag
-        task.update_lag()
+    while True:
+        task_ids = db.session.scalars(
+            db.select(PromotorTask.id).filter(stale, PromotorTask.id > last_id).order_by(PromotorTask.id).limit(chunk_size)
+        ).all()
+        if not task_ids:
+            break
+        last_id = task_ids[-1]
         
-        # Update status to Overdue if it has lag
-        if task.lag_weeks > 0:
-            task.status = 'Overdue'
+        if len(rollover_summary) < summary_limit:
+            rollover_summary.extend(_rollover_summary(task_ids[:summary_limit - len(rollover_summary)], current))
         
-        # Update due date to end of current week
-        days_until_sunday = 6 - current_date.weekday()  # Sunday is end of week
-        task.due_date = (current_date + timedelta(days=days_until_sunday)).date()
-        
-        task.updated_at = datetime.utcnow()
-        
-        rollover_count += 1
-        rollover_summary.append({
-            'task_id': task.id,
-            'template_name': task.template.name if task.template else 'N/A',
-            'promotor': task.promotor.username if task.promotor else 'N/A',
-            'lag_weeks': task.lag_weeks,
-            'original_week': f"{task.original_week}/{task.original_year}"
-        })
+        # stale is re-checked: a task completed since the SELECT stays put
+        result = db.session.execute(
+            update(PromotorTask)
+            .where(PromotorTask.id.in_(task_ids), stale)
+            .values(
+                assigned_week=current_week,
+                assigned_year=current_year,
+                lag_weeks=lag,
+                # Update status to Overdue if it has lag
+                status=case((lag > 0, 'Overdue'), else_=PromotorTask.status),
+                # Due at the end of the current week (Sunday)
+                due_date=current.end,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rollover_count += result.rowcount
+        db.session.commit()
     
-    # Commit all changes
-    db.session.commit()
+    if rollover_count:
+        invalidate_dashboard_stats(tasks=True)
     
     return {
         'count': rollover_count,
@@ -64,27 +83,38 @@ def rollover_incomplete_tasks():
     }
 
 
+def _rollover_summary(task_ids, current):
+    """Summary rows for the given tasks from one joined query, without loading them"""
+    rows = db.session.query(
+        PromotorTask.id, PromotorTask.original_week, PromotorTask.original_year,
+        TaskTemplate.name.label('template_name'), User.username
+    ).outerjoin(TaskTemplate, TaskTemplate.id == PromotorTask.template_id).outerjoin(
+        User, User.id == PromotorTask.promotor_id
+    ).filter(PromotorTask.id.in_(task_ids)).order_by(PromotorTask.id).all()
+    
+    return [{
+        'task_id': row.id,
+        'template_name': row.template_name or 'N/A',
+        'promotor': row.username or 'N/A',
+        'lag_weeks': lag_weeks(row.original_year, row.original_week, current),
+        'original_week': f"{row.original_week}/{row.original_year}"
+    } for row in rows]
+
+
 def get_current_week_info():
     """Get current week number and year"""
-    current_date = datetime.now()
+    current = get_current_week()
     return {
-        'week': current_date.isocalendar()[1],
-        'year': current_date.isocalendar()[0],
-        'date': current_date.date()
+        'week': current.week,
+        'year': current.year,
+        'date': datetime.now().date()
     }
 
 
 def get_week_date_range(week, year):
-    """Get start and end dates for a given week"""
-    # Get first day of the year
-    jan_1 = datetime(year, 1, 1)
-    
-    # Calculate the start of the week
-    days_to_week = (week - 1) * 7
-    week_start = jan_1 + timedelta(days=days_to_week - jan_1.weekday())
-    week_end = week_start + timedelta(days=6)
-    
+    """Get start and end dates (Monday and Sunday) for a given ISO week"""
+    iso_week = get_week(year, week)
     return {
-        'start': week_start.date(),
-        'end': week_end.date()
+        'start': iso_week.start,
+        'end': iso_week.end
     }
@@ -4,11 +4,15 @@ Syncs products from vcore database to WordPress/WooCommerce
 """
 
 import os
-import requests
 import json
 from typing import Dict, List, Optional
 from datetime import datetime
 import base64
+import hashlib
+
+from utils.wordpress_sync_engine import SyncEngine, AdaptiveBatcher, get_http_session
+from utils.image_manifest import ensure_image_manifests, manifest_entries
+from utils.cache import TTLCache
 
 
 class WordPressSync:
@@ -27,11 +31,15 @@ class WordPressSync:
             'Authorization': f'Basic {token}',
             'Content-Type': 'application/json'
         }
+        
+        # Shared keep-alive session (connections are reused across calls)
+        self.session = get_http_session()
+        self.max_workers = int(os.getenv('WORDPRESS_SYNC_WORKERS', '4'))
     
     def test_connection(self) -> Dict:
         """Test WordPress API connection"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.wp_url}/wp-json/wc/v3/system_status",
                 headers=self.headers,
                 timeout=10
@@ -50,7 +58,7 @@ class WordPressSync:
     def create_categories(self) -> Dict:
         """Create category structure in WordPress"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_base}/create-categories",
                 headers=self.headers,
                 timeout=30
@@ -69,6 +77,10 @@ class WordPressSync:
     def sync_all_products(self, db_connection, incremental=True) -> Dict:
         """Sync all active products to WordPress
         
+        Batches are sent concurrently over the shared session and sized
+        adaptively; each finished batch is committed straight away, so an
+        interrupted sync keeps the progress it made.
+        
         Args:
             db_connection: Database session
             incremental: If True, only sync products that have changed since last sync
@@ -78,11 +90,10 @@ class WordPressSync:
         try:
             # Get products to sync
             if incremental:
-                # Only sync products that are new or have been updated since last sync
+                # Only sync products whose storefront payload changed since last sync
                 products = Product.query.filter(
                     Product.is_active == True,
-                    (Product.last_wordpress_sync == None) | 
-                    (Product.updated_at > Product.last_wordpress_sync)
+                    Product.wordpress_sync_pending()
                 ).all()
             else:
                 # Full sync - all active products
@@ -98,78 +109,89 @@ class WordPressSync:
                     'skipped': 0
                 }
             
-            # Prepare product data and keep track of product objects
-            products_data = []
-            product_map = {}  # Map product ID to product object
-            for product in products:
-                product_dict = self._prepare_product_data(product)
-                products_data.append(product_dict)
-                product_map[product.id] = product
-            
-            # Send to WordPress in batches (smaller batches to avoid timeout)
-            batch_size = 3  # Reduced from 10 to handle image uploads
-            total_success = 0
-            total_failed = 0
-            errors = []
-            synced_product_ids = []  # Track successfully synced products
-            
-            for i in range(0, len(products_data), batch_size):
-                batch = products_data[i:i + batch_size]
-                
-                response = requests.post(
-                    f"{self.api_base}/sync-products",
-                    headers=self.headers,
-                    json={'products': batch},
-                    timeout=120  # Increased from 60 to handle image downloads
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    total_success += result.get('success', 0)
-                    total_failed += result.get('failed', 0)
-                    errors.extend(result.get('errors', []))
-                    
-                    # Track successfully synced product IDs
-                    if result.get('product_ids'):
-                        synced_product_ids.extend(result.get('product_ids', []))
-                else:
-                    total_failed += len(batch)
-                    errors.append({
-                        'batch': f'{i}-{i+len(batch)}',
-                        'error': response.text
-                    })
-            
-            # Update database for successfully synced products
-            if synced_product_ids:
-                sync_timestamp = datetime.utcnow()
-                for product_id in synced_product_ids:
-                    if product_id in product_map:
-                        product = product_map[product_id]
-                        product.last_wordpress_sync = sync_timestamp
-                
-                # Commit the changes
-                db_connection.commit()
-            
-            return {
-                'success': True,
-                'total_products': len(products_data),
-                'synced': total_success,
-                'failed': total_failed,
-                'errors': errors
-            }
+            return self.sync_products(db_connection, products)
             
         except Exception as e:
+            db_connection.rollback()
             return {
                 'success': False,
                 'message': f'Sync failed: {str(e)}'
             }
     
+    def sync_products(self, db_connection, products, engine: Optional[SyncEngine] = None) -> Dict:
+        """Push the given products through the sync engine, recording each batch as it lands"""
+        # Snapshot time: products edited while the sync runs stay pending
+        sync_timestamp = datetime.utcnow()
+        products_data = self.prepare_payloads(db_connection, products)
+        hashes = {data['id']: payload_hash(data) for data in products_data}
+        
+        def on_batch(result):
+            self.record_synced(db_connection, result['synced'], sync_timestamp, hashes)
+        
+        return (engine or self.create_engine()).run(products_data, on_batch=on_batch)
+    
+    def sync_batch(self, db_connection, products) -> Dict:
+        """Sync a small list of products in one /sync-products request
+        
+        Round trips are constant per call: an image manifest request, one
+        sync request and one UPDATE, whatever the number of products.
+        """
+        size = max(1, len(products))
+        engine = self.create_engine(max_workers=1, batcher=AdaptiveBatcher(initial_size=size, max_size=size))
+        return self.sync_products(db_connection, products, engine=engine)
+    
+    def prepare_payloads(self, db_connection, products) -> List[Dict]:
+        """Build payloads for a list of products, describing any new images first"""
+        ensure_image_manifests(db_connection, products, session=self.session, max_workers=self.max_workers)
+        return [self._prepare_product_data(product) for product in products]
+    
+    def create_engine(self, **kwargs) -> SyncEngine:
+        """Create a sync engine bound to this site's API and credentials"""
+        kwargs.setdefault('max_workers', self.max_workers)
+        return SyncEngine(self.api_base, self.headers, session=self.session, **kwargs)
+    
+    @staticmethod
+    def record_synced(db_connection, synced: List[Dict], sync_timestamp: datetime, hashes: Dict, commit=True):
+        """Store WordPress IDs, sync time and synced hash for a batch in one UPDATE and commit
+        
+        hashes maps product ID to the hash of the payload that was sent, so a
+        product edited while the sync ran stays pending. updated_at is written
+        back unchanged. Pass commit=False to fold the UPDATE into a larger
+        transaction.
+        """
+        from models import Product
+        from sqlalchemy import update, case
+        
+        if not synced:
+            return
+        
+        # A single UPDATE ... CASE id statement: executemany would cost one
+        # round trip per row on pymysql
+        products_table = Product.__table__
+        wp_ids = {s['id']: s['product_id'] for s in synced}
+        synced_hashes = {s['id']: hashes.get(s['id']) for s in synced}
+        db_connection.execute(
+            update(products_table)
+            .where(products_table.c.id.in_(list(wp_ids)))
+            .values(
+                wordpress_id=case(wp_ids, value=products_table.c.id),
+                last_wordpress_sync=sync_timestamp,
+                wordpress_synced_hash=case(synced_hashes, value=products_table.c.id),
+                updated_at=products_table.c.updated_at
+            )
+        )
+        if commit:
+            db_connection.commit()
+        invalidate_sync_status()
+    
     def sync_single_product(self, product) -> Dict:
         """Sync a single product to WordPress"""
+        from models import db
+        
         try:
-            product_data = self._prepare_product_data(product)
+            product_data = self.prepare_payloads(db.session, [product])[0]
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_base}/sync-single-product",
                 headers=self.headers,
                 json=product_data,
@@ -183,6 +205,7 @@ class WordPressSync:
                 if result.get('success') and result.get('product_id'):
                     product.wordpress_id = result['product_id']
                     product.last_wordpress_sync = datetime.utcnow()
+                    product.wordpress_synced_hash = payload_hash(product_data)
                 
                 return result
             else:
@@ -199,60 +222,101 @@ class WordPressSync:
     
     def _prepare_product_data(self, product) -> Dict:
         """Prepare product data for WordPress"""
-        # Get all image URLs
-        images = []
-        for i in range(1, 5):
-            img_url = getattr(product, f'image_{i}_url', None)
-            if img_url:
-                images.append(img_url)
-        
-        # Parse specifications
-        specs = product.get_specifications() if hasattr(product, 'get_specifications') else {}
-        
-        return {
-            'id': product.id,
-            'product_name': product.product_name,
-            'category': product.category,
-            'description': product.description or '',
-            'price': product.price or '',
-            'images': images,
-            'material': product.material,
-            'brand': product.brand,
-            'usage_application': product.usage_application,
-            'thickness': product.thickness,
-            'shape': product.shape,
-            'pattern': product.pattern,
-            'specifications': json.dumps(specs) if specs else '',
-            'availability': product.availability or 'In Stock',
-            'product_url': product.product_url or ''
-        }
+        return prepare_product_payload(product)
     
-    def get_sync_status(self, db_connection) -> Dict:
-        """Get sync status statistics"""
-        from models import Product
+    def get_sync_status(self, db_connection, use_cache=True) -> Dict:
+        """Get sync status statistics
         
+        One conditional-aggregate query over active products, answered from
+        idx_wordpress_sync_status alone, and cached for
+        WORDPRESS_SYNC_STATUS_TTL seconds. Product writes and recorded syncs
+        invalidate the cache.
+        """
         try:
-            total_products = Product.query.filter_by(is_active=True).count()
-            synced_products = Product.query.filter(
-                Product.is_active == True,
-                Product.wordpress_id.isnot(None)
-            ).count()
-            
-            # Count products that need syncing (changed since last sync OR never synced)
-            pending_sync = Product.query.filter(
-                Product.is_active == True,
-                (Product.last_wordpress_sync == None) | 
-                (Product.updated_at > Product.last_wordpress_sync)
-            ).count()
-            
-            return {
-                'success': True,
-                'total_products': total_products,
-                'synced_products': synced_products,
-                'pending_sync': pending_sync
-            }
+            if not use_cache:
+                return _load_sync_status(db_connection)
+            return _status_cache.get('sync_status', lambda: _load_sync_status(db_connection))
         except Exception as e:
             return {
                 'success': False,
                 'message': f'Error: {str(e)}'
             }
+
+
+_status_cache = TTLCache(ttl=float(os.getenv('WORDPRESS_SYNC_STATUS_TTL', '30')))
+
+
+def invalidate_sync_status():
+    """Forget cached sync status; call after writes that bypass the ORM events"""
+    _status_cache.invalidate()
+
+
+def _load_sync_status(db_connection) -> Dict:
+    from models import db, Product
+    
+    total_products, synced_products, pending_sync, last_sync = db_connection.query(
+        db.func.count(Product.id),
+        db.func.sum(db.case((Product.wordpress_id.isnot(None), 1), else_=0)),
+        # Products whose storefront payload differs from the last sync
+        db.func.sum(db.case((Product.wordpress_sync_pending(), 1), else_=0)),
+        db.func.max(Product.last_wordpress_sync)
+    ).filter(Product.is_active == True).one()
+    
+    return {
+        'success': True,
+        'total_products': total_products or 0,
+        'synced_products': int(synced_products or 0),
+        'pending_sync': int(pending_sync or 0),
+        'last_sync': last_sync.strftime('%Y-%m-%d %H:%M UTC') if last_sync else None
+    }
+
+
+# Payload fields that don't affect whether a product needs syncing
+HASH_EXCLUDED_FIELDS = ('id', 'image_manifest')
+
+
+def prepare_product_payload(product) -> Dict:
+    """Build the payload the WordPress plugin receives for a product"""
+    # Get all image URLs
+    images = []
+    for i in range(1, 5):
+        img_url = getattr(product, f'image_{i}_url', None)
+        if img_url:
+            images.append(img_url)
+    
+    # Parse specifications
+    specs = product.get_specifications() if hasattr(product, 'get_specifications') else {}
+    
+    return {
+        'id': product.id,
+        'product_name': product.product_name,
+        'category': product.category,
+        'description': product.description or '',
+        'price': product.price or '',
+        'images': images,
+        'material': product.material,
+        'brand': product.brand,
+        'usage_application': product.usage_application,
+        'thickness': product.thickness,
+        'shape': product.shape,
+        'pattern': product.pattern,
+        'specifications': json.dumps(specs) if specs else '',
+        'availability': product.availability or 'In Stock',
+        'product_url': product.product_url or '',
+        # Hash and size per image, so the plugin can skip images it already holds
+        'image_manifest': manifest_entries(product) if hasattr(product, 'get_all_images') else []
+    }
+
+
+def payload_hash(payload: Dict) -> str:
+    """SHA-256 of a product payload, ignoring the (immutable) product ID
+    
+    The ID is left out so the hash can be computed before the row is
+    inserted and has an ID. The image manifest is left out because it is
+    filled in lazily at sync time and is determined by the image URLs,
+    which are hashed. None and '' hash the same, since form resaves
+    turn one into the other without changing what the storefront shows.
+    """
+    content = {k: ('' if v is None else v) for k, v in payload.items() if k not in HASH_EXCLUDED_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,321 @@
+"""
+WordPress Sync Engine
+Concurrent, keep-alive batch sync to the VCore WordPress plugin
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Responses worth retrying; anything else non-200 fails the batch immediately
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session(pool_size=8) -> requests.Session:
+    """Get the shared keep-alive session used for all WordPress calls
+
+    One session per process means TCP+TLS handshakes are paid once per
+    pooled connection instead of once per request.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class AdaptiveBatcher:
+    """Size batches from observed per-product latency and payload size
+
+    The target is a batch that completes in roughly target_seconds without
+    exceeding max_payload_bytes. Growth is capped at 2x per observation and
+    failures halve the size, so a slow or struggling site backs off quickly.
+    """
+
+    def __init__(self, initial_size=3, min_size=1, max_size=25,
+                 target_seconds=15.0, max_payload_bytes=512 * 1024, smoothing=0.3):
+        self.size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_payload_bytes = max_payload_bytes
+        self.smoothing = smoothing
+        self.seconds_per_product = None
+        self.bytes_per_product = None
+
+    def next_size(self, remaining: int) -> int:
+        """Get the size of the next batch"""
+        return max(1, min(remaining, self.size))
+
+    def record(self, count: int, elapsed: float, payload_bytes: int, ok: bool):
+        """Feed back the outcome of a completed batch"""
+        if not ok:
+            self.size = max(self.min_size, self.size // 2)
+            return
+
+        count = max(1, count)
+        self.seconds_per_product = self._smooth(self.seconds_per_product, elapsed / count)
+        self.bytes_per_product = self._smooth(self.bytes_per_product, payload_bytes / count)
+
+        by_latency = self.target_seconds / max(self.seconds_per_product, 1e-6)
+        by_payload = self.max_payload_bytes / max(self.bytes_per_product, 1)
+        target = int(min(by_latency, by_payload, self.size * 2))
+        self.size = max(self.min_size, min(self.max_size, target))
+
+    def _smooth(self, current, observed):
+        if current is None:
+            return observed
+        return (1 - self.smoothing) * current + self.smoothing * observed
+
+
+class SyncEngine:
+    """Push prepared product payloads to /sync-products with a bounded worker pool
+
+    HTTP calls run on worker threads; the on_batch callback always runs on
+    the calling thread, so it can safely use the SQLAlchemy session to commit
+    progress as each batch lands.
+    
+    With negotiate_images, each batch first asks /image-manifest which image
+    hashes the site already holds and tags those images with the existing
+    attachment ID, so the plugin skips downloading them. Plugins without the
+    endpoint (404) turn negotiation off for the rest of the run.
+    """
+
+    def __init__(self, api_base: str, headers: Dict, max_workers=4, batcher: Optional[AdaptiveBatcher] = None,
+                 max_retries=4, backoff_base=1.0, backoff_cap=30.0, max_retry_after=120.0,
+                 timeout=(5, 60), session: Optional[requests.Session] = None, negotiate_images=True):
+        self.api_base = api_base
+        self.headers = headers
+        self.max_workers = max_workers
+        self.batcher = batcher or AdaptiveBatcher()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.session = session or get_http_session(pool_size=max(max_workers, 2))
+        self.negotiate_images = negotiate_images
+
+    def run(self, payloads: List[Dict], on_batch: Optional[Callable[[Dict], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> Dict:
+        """Sync all payloads and return an aggregate report
+
+        on_batch receives one dict per finished batch with 'synced' (list of
+        {'id', 'product_id'}), 'errors', 'elapsed' and 'attempts'. When
+        should_stop returns True no new batches are dispatched; in-flight ones
+        finish and the report has 'stopped' set.
+        """
+        started = time.monotonic()
+        report = {
+            'success': True,
+            'total_products': len(payloads),
+            'synced': 0,
+            'failed': 0,
+            'errors': [],
+            'batches': 0,
+            'retries': 0,
+            'manifest_requests': 0,
+            'images_reused': 0,
+            'stopped': False,
+        }
+
+        position = 0
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while position < len(payloads) or in_flight:
+                if position < len(payloads) and should_stop and should_stop():
+                    report['stopped'] = True
+                    payloads = payloads[:position]
+                    if not in_flight:
+                        break
+
+                while position < len(payloads) and len(in_flight) < self.max_workers:
+                    size = self.batcher.next_size(len(payloads) - position)
+                    batch = payloads[position:position + size]
+                    position += size
+                    in_flight[executor.submit(self._send_batch, batch)] = batch
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    result = future.result()
+
+                    self.batcher.record(len(batch), result['elapsed'], result['payload_bytes'], result['ok'])
+                    report['batches'] += 1
+                    report['retries'] += result['attempts'] - 1
+                    report['manifest_requests'] += result['manifest_requests']
+                    report['images_reused'] += result['images_reused']
+                    report['synced'] += len(result['synced'])
+                    report['failed'] += len(result['errors'])
+                    report['errors'].extend(result['errors'])
+
+                    if on_batch:
+                        on_batch(result)
+
+        elapsed = time.monotonic() - started
+        report['elapsed_seconds'] = round(elapsed, 3)
+        report['products_per_second'] = round(report['synced'] / elapsed, 2) if elapsed > 0 else None
+        return report
+
+    def _send_batch(self, batch: List[Dict]) -> Dict:
+        """POST one batch with retries; runs on a worker thread"""
+        negotiation = {'manifest_requests': 0, 'images_reused': 0}
+        if self.negotiate_images:
+            batch = self._negotiate_images(batch, negotiation)
+        
+        body = json.dumps({'products': batch})
+        started = time.monotonic()
+        attempt = 0
+        error = None
+
+        while attempt <= self.max_retries:
+            attempt += 1
+            delay = None
+            try:
+                response = self.session.post(
+                    f"{self.api_base}/sync-products",
+                    headers=self.headers,
+                    data=body,
+                    timeout=self.timeout
+                )
+                if response.status_code == 200:
+                    synced, errors = _parse_batch_response(batch, response.json())
+                    return self._result(batch, body, started, attempt, True, synced, errors, negotiation)
+
+                error = f'HTTP {response.status_code}: {response.text[:500]}'
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+                delay = _retry_after_seconds(response.headers.get('Retry-After'))
+                if delay is not None:
+                    delay = min(delay, self.max_retry_after)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f'Error: {str(e)}'
+            except ValueError as e:
+                # 200 with a body that isn't JSON - treat as non-retryable
+                error = f'Invalid response: {str(e)}'
+                break
+
+            if attempt <= self.max_retries:
+                time.sleep(delay if delay is not None else self._backoff(attempt))
+
+        errors = [{'id': p['id'], 'product_name': p.get('product_name'), 'error': error} for p in batch]
+        return self._result(batch, body, started, attempt, False, [], errors, negotiation)
+    
+    def _negotiate_images(self, batch: List[Dict], negotiation: Dict) -> List[Dict]:
+        """Ask the site which image hashes it holds; return the batch with those tagged
+        
+        Any failure just sends the batch untagged - the plugin then falls back
+        to its own lookup or a download, so negotiation never fails a sync.
+        """
+        hashes = sorted({entry['hash'] for p in batch for entry in p.get('image_manifest') or []})
+        if not hashes:
+            return batch
+        
+        negotiation['manifest_requests'] += 1
+        try:
+            response = self.session.post(
+                f"{self.api_base}/image-manifest",
+                headers=self.headers,
+                data=json.dumps({'hashes': hashes}),
+                timeout=self.timeout
+            )
+            if response.status_code == 404:
+                self.negotiate_images = False
+                return batch
+            if response.status_code != 200:
+                return batch
+            present = response.json().get('present') or {}
+        except (requests.RequestException, ValueError):
+            return batch
+        
+        if not present:
+            return batch
+        
+        tagged = []
+        for payload in batch:
+            manifest = payload.get('image_manifest') or []
+            if any(entry['hash'] in present for entry in manifest):
+                manifest = [dict(entry, attachment_id=present[entry['hash']]) if entry['hash'] in present else entry
+                            for entry in manifest]
+                negotiation['images_reused'] += sum(1 for entry in manifest if 'attachment_id' in entry)
+                payload = dict(payload, image_manifest=manifest)
+            tagged.append(payload)
+        return tagged
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1))))
+
+    @staticmethod
+    def _result(batch, body, started, attempts, ok, synced, errors, negotiation):
+        return {
+            'ok': ok,
+            'synced': synced,
+            'errors': errors,
+            'elapsed': time.monotonic() - started,
+            'payload_bytes': len(body.encode('utf-8')),
+            'attempts': attempts,
+            'product_ids': [p['id'] for p in batch],
+            'manifest_requests': negotiation['manifest_requests'],
+            'images_reused': negotiation['images_reused'],
+        }
+
+
+def _parse_batch_response(batch: List[Dict], result: Dict):
+    """Map a /sync-products response back to VCore product IDs
+
+    Plugins that predate the 'synced' field only return WooCommerce IDs in
+    order of success, so those are matched against the batch minus the
+    products named in 'errors'.
+    """
+    errors = []
+    for error in result.get('errors', []):
+        errors.append({
+            'id': error.get('id'),
+            'product_name': error.get('product_name'),
+            'error': error.get('error', 'Unknown error')
+        })
+
+    if 'synced' in result:
+        synced = [{'id': s['id'], 'product_id': s['product_id']} for s in result['synced']]
+        return synced, errors
+
+    failed_names = {e['product_name'] for e in errors}
+    succeeded = [p for p in batch if p.get('product_name') not in failed_names]
+    wp_ids = result.get('product_ids', [])
+    synced = [{'id': p['id'], 'product_id': wp_id} for p, wp_id in zip(succeeded, wp_ids)]
+    return synced, errors
+
+
+def _retry_after_seconds(value) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.now(retry_at.tzinfo) if retry_at.tzinfo else datetime.utcnow()
+    return max(0.0, (retry_at - now).total_seconds())
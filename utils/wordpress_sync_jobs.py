@@ -0,0 +1,300 @@
+"""
+WordPress Sync Jobs
+Durable, resumable background syncs: the web request only enqueues a job,
+a worker (wordpress_sync_worker.py or the cron endpoint) drains it
+"""
+
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, update
+
+from utils.wordpress_sync import WordPressSync, payload_hash
+
+
+# A running job whose worker hasn't reported in this long is considered
+# abandoned and can be claimed by another worker
+STALE_AFTER = timedelta(minutes=5)
+
+# Products whose payloads (and new image manifests) are prepared between
+# heartbeats; describing a chunk's images must take well under STALE_AFTER
+PREPARE_CHUNK_SIZE = 50
+
+# Seconds a cron-triggered run syncs before requeueing the job. Batches
+# already in flight still finish after that, so the budget plus the longest
+# one batch can take must stay below the Lambda timeout (--timeout 120 in
+# deploy-lambda.sh). Runs with a deadline therefore use DEADLINE_ENGINE_OPTIONS:
+# an image negotiation and up to 2 sync attempts of at most 15s each, plus a
+# 2s backoff, is under 50s; 60 + 50 leaves room for the progress commits.
+DEFAULT_TIME_BUDGET = 60
+DEADLINE_ENGINE_OPTIONS = {
+    'timeout': (3, 12),
+    'max_retries': 1,
+    'backoff_cap': 2.0,
+    'max_retry_after': 2.0,
+}
+
+
+def default_worker_id() -> str:
+    """Identify this process in the job table"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def get_active_job():
+    """Get the queued or running job, if any"""
+    from models import WordPressSyncJob
+
+    return WordPressSyncJob.query.filter(
+        WordPressSyncJob.status.in_(WordPressSyncJob.ACTIVE_STATUSES)
+    ).order_by(WordPressSyncJob.id).first()
+
+
+def enqueue_sync_job(incremental=True, user_id=None):
+    """Queue a sync job, or return the one already in progress
+
+    Returns (job, created). Only one job runs at a time: two overlapping
+    full syncs would just push every product twice.
+    """
+    from models import db, WordPressSyncJob
+
+    job = get_active_job()
+    if job:
+        return job, False
+
+    job = WordPressSyncJob(incremental=incremental, created_by=user_id)
+    db.session.add(job)
+    db.session.commit()
+    return job, True
+
+
+def cancel_job(job) -> bool:
+    """Cancel a queued or running job; a running worker stops after its in-flight batches"""
+    from models import db
+
+    if not job.is_active:
+        return False
+    job.status = 'cancelled'
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+
+def claim_next_job(worker_id: str):
+    """Atomically take ownership of the oldest runnable job
+
+    The conditional UPDATE only matches if the job is still in the state we
+    read it in, so two workers racing for the same job can't both win.
+    """
+    from models import db, WordPressSyncJob
+
+    now = datetime.utcnow()
+    stale_before = now - STALE_AFTER
+
+    candidates = WordPressSyncJob.query.filter(
+        db.or_(
+            WordPressSyncJob.status == 'queued',
+            db.and_(WordPressSyncJob.status == 'running', WordPressSyncJob.heartbeat_at < stale_before)
+        )
+    ).order_by(WordPressSyncJob.id).limit(5).all()
+
+    for candidate in candidates:
+        conditions = [WordPressSyncJob.id == candidate.id, WordPressSyncJob.status == candidate.status]
+        if candidate.status == 'running':
+            conditions.append(WordPressSyncJob.heartbeat_at < stale_before)
+
+        claimed = db.session.execute(
+            update(WordPressSyncJob)
+            .where(*conditions)
+            .values(
+                status='running',
+                worker_id=worker_id,
+                heartbeat_at=now,
+                started_at=db.func.coalesce(WordPressSyncJob.started_at, now)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(WordPressSyncJob, candidate.id)
+
+    return None
+
+
+def run_job(job, worker_id: str, deadline: Optional[float] = None) -> Dict:
+    """Sync the products of a claimed job, recording each batch as it lands
+
+    Products that already have an outcome in this job are skipped, so a job
+    that was requeued (deadline reached) or taken over (worker died) picks up
+    where it left off. deadline is a time.monotonic() value; once it passes,
+    no new batches are sent and the job goes back to the queue.
+    """
+    from models import db, Product, WordPressSyncJob, WordPressSyncJobItem
+
+    jobs_table = WordPressSyncJob.__table__
+    items_table = WordPressSyncJobItem.__table__
+    job_id = job.id
+    state = {'lost': False}
+
+    try:
+        attempted = db.session.query(WordPressSyncJobItem.product_id).filter(
+            WordPressSyncJobItem.job_id == job_id
+        )
+        query = Product.query.filter(Product.is_active == True, ~Product.id.in_(attempted))
+        if job.incremental:
+            query = query.filter(Product.wordpress_sync_pending())
+        products = query.order_by(Product.id).all()
+
+        job.total = job.synced + job.failed + len(products)
+        db.session.commit()
+
+        if not products:
+            return _finish(job_id, worker_id, 'completed')
+
+        wp_sync = WordPressSync()
+        sync_timestamp = datetime.utcnow()
+
+        # Describing new images sends a request per image, which on a large
+        # catalog outlasts STALE_AFTER; prepare a chunk at a time and report
+        # in after each one, the last just before the first batch goes out
+        products_data = []
+        for start in range(0, len(products), PREPARE_CHUNK_SIZE):
+            if deadline is not None and time.monotonic() >= deadline:
+                # Manifests described so far are stored; the next run reuses them
+                return _finish(job_id, worker_id, 'queued')
+            products_data += wp_sync.prepare_payloads(db.session, products[start:start + PREPARE_CHUNK_SIZE])
+            if not _heartbeat(job_id, worker_id):
+                return _lost(job_id)
+        hashes = {data['id']: payload_hash(data) for data in products_data}
+
+        def on_batch(result):
+            now = datetime.utcnow()
+            WordPressSync.record_synced(db.session, result['synced'], sync_timestamp, hashes, commit=False)
+
+            items = [{
+                'job_id': job_id, 'product_id': s['id'], 'status': 'synced',
+                'wordpress_id': s['product_id'], 'error': None, 'created_at': now
+            } for s in result['synced']]
+            items.extend({
+                'job_id': job_id, 'product_id': e['id'], 'status': 'failed',
+                'wordpress_id': None, 'error': e['error'], 'created_at': now
+            } for e in result['errors'] if e.get('id') is not None)
+            if items:
+                db.session.execute(insert(items_table), items)
+
+            # Only counts while we still own the job; cancelled or taken over means stop
+            owned = db.session.execute(
+                update(jobs_table)
+                .where(jobs_table.c.id == job_id, jobs_table.c.status == 'running',
+                       jobs_table.c.worker_id == worker_id)
+                .values(
+                    synced=jobs_table.c.synced + len(result['synced']),
+                    failed=jobs_table.c.failed + len(result['errors']),
+                    heartbeat_at=now
+                )
+            ).rowcount
+            db.session.commit()
+            if not owned:
+                state['lost'] = True
+
+        def should_stop():
+            return state['lost'] or (deadline is not None and time.monotonic() >= deadline)
+
+        engine = wp_sync.create_engine(**(DEADLINE_ENGINE_OPTIONS if deadline is not None else {}))
+        report = engine.run(products_data, on_batch=on_batch, should_stop=should_stop)
+
+        if state['lost']:
+            return _lost(job_id)
+        if report['stopped']:
+            return _finish(job_id, worker_id, 'queued')
+        return _finish(job_id, worker_id, 'completed')
+
+    except Exception as e:
+        db.session.rollback()
+        return _finish(job_id, worker_id, 'failed', error_message=str(e))
+
+
+def drain_jobs(worker_id: Optional[str] = None, time_budget: Optional[float] = None) -> List[Dict]:
+    """Run queued jobs until the queue is empty or time_budget seconds have passed"""
+    worker_id = worker_id or default_worker_id()
+    deadline = time.monotonic() + time_budget if time_budget else None
+    results = []
+
+    while deadline is None or time.monotonic() < deadline:
+        job = claim_next_job(worker_id)
+        if not job:
+            break
+        summary = run_job(job, worker_id, deadline=deadline)
+        results.append(summary)
+        if summary['status'] == 'queued':
+            break
+
+    return results
+
+
+def recent_failures(job_id: int, limit=20) -> List[Dict]:
+    """Latest per-product failures for a job, newest first"""
+    from models import db, Product, WordPressSyncJobItem
+
+    rows = db.session.query(
+        WordPressSyncJobItem.product_id, Product.product_name, WordPressSyncJobItem.error
+    ).outerjoin(
+        Product, Product.id == WordPressSyncJobItem.product_id
+    ).filter(
+        WordPressSyncJobItem.job_id == job_id,
+        WordPressSyncJobItem.status == 'failed'
+    ).order_by(WordPressSyncJobItem.id.desc()).limit(limit).all()
+
+    return [{'id': r.product_id, 'product_name': r.product_name, 'error': r.error} for r in rows]
+
+
+def _finish(job_id: int, worker_id: str, status: str, error_message=None) -> Dict:
+    """Move a job we own to its next state and return its summary"""
+    from models import db, WordPressSyncJob
+
+    values = {'status': status, 'heartbeat_at': None, 'worker_id': None}
+    if status != 'queued':
+        values['finished_at'] = datetime.utcnow()
+    if error_message:
+        values['error_message'] = error_message[:2000]
+
+    db.session.execute(
+        update(WordPressSyncJob)
+        .where(WordPressSyncJob.id == job_id, WordPressSyncJob.status == 'running',
+               WordPressSyncJob.worker_id == worker_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return _summary(job_id)
+
+
+def _heartbeat(job_id: int, worker_id: str) -> bool:
+    """Report in on a job we own; False if it was cancelled or taken over"""
+    from models import db, WordPressSyncJob
+
+    owned = db.session.execute(
+        update(WordPressSyncJob)
+        .where(WordPressSyncJob.id == job_id, WordPressSyncJob.status == 'running',
+               WordPressSyncJob.worker_id == worker_id)
+        .values(heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(owned)
+
+
+def _lost(job_id: int) -> Dict:
+    summary = _summary(job_id)
+    summary['message'] = 'Job was cancelled or taken over by another worker'
+    return summary
+
+
+def _summary(job_id: int) -> Dict:
+    from models import db, WordPressSyncJob
+
+    db.session.expire_all()
+    return db.session.get(WordPressSyncJob, job_id).to_dict()
@@ -186,3 +186,4 @@ print(f"📝 URLs cleaned: {len(urls_updated)} products")
 print("="*60)
 print("\n✅ Versioned images watermarked and URLs cleaned!")
 print("All ?v= parameters removed from database.")
+print("ℹ️  Run `python migrate_add_wordpress_payload_hash.py` so WordPress sync picks up the new URLs")
@@ -3,7 +3,7 @@
  * Plugin Name: Glassy VCore Sync
  * Plugin URI: https://vcore.glassy.in
  * Description: Syncs product catalog from VCore database to WooCommerce
- * Version: 1.0.0
+ * Version: 1.1.0
  * Author: Glassy India
  * Author URI: https://glassy.in
  * Requires at least: 5.8
@@ -18,7 +18,7 @@ if (!defined('ABSPATH')) {
 
 class Glassy_VCore_Sync {
     
-    private $version = '1.0.0';
+    private $version = '1.1.0';
     private $category_mapping = array();
     
     public function __construct() {
@@ -52,6 +52,12 @@ class Glassy_VCore_Sync {
             'permission_callback' => array($this, 'check_permissions'),
         ));
         
+        register_rest_route('vcore/v1', '/image-manifest', array(
+            'methods' => 'POST',
+            'callback' => array($this, 'image_manifest'),
+            'permission_callback' => array($this, 'check_permissions'),
+        ));
+        
         register_rest_route('vcore/v1', '/create-categories', array(
             'methods' => 'POST',
             'callback' => array($this, 'create_category_structure'),
@@ -80,27 +86,76 @@ class Glassy_VCore_Sync {
             'success' => 0,
             'failed' => 0,
             'errors' => array(),
-            'product_ids' => array()
+            'product_ids' => array(),
+            'synced' => array()
         );
         
         foreach ($products as $product_data) {
             $result = $this->process_single_product($product_data);
+            $vcore_id = isset($product_data['id']) ? $product_data['id'] : null;
             
             if (is_wp_error($result)) {
                 $results['failed']++;
                 $results['errors'][] = array(
+                    'id' => $vcore_id,
                     'product_name' => $product_data['product_name'],
                     'error' => $result->get_error_message()
                 );
             } else {
                 $results['success']++;
                 $results['product_ids'][] = $result;
+                // Map VCore IDs to WooCommerce IDs so the caller can track each product
+                $results['synced'][] = array(
+                    'id' => $vcore_id,
+                    'product_id' => $result
+                );
             }
         }
         
         return rest_ensure_response($results);
     }
     
+    /**
+     * Report which image hashes already have an attachment, so VCore can
+     * tell us to reuse them instead of downloading the image again
+     */
+    public function image_manifest($request) {
+        $hashes = $request->get_param('hashes');
+        
+        if (!is_array($hashes)) {
+            return new WP_Error('invalid_data', 'Hashes are required', array('status' => 400));
+        }
+        
+        $hashes = array_values(array_filter(array_map('sanitize_key', $hashes)));
+        
+        return rest_ensure_response(array(
+            'present' => empty($hashes) ? new stdClass() : $this->find_attachments_by_hash($hashes)
+        ));
+    }
+    
+    /**
+     * Map image hash => attachment ID for hashes we hold (one meta query)
+     */
+    private function find_attachments_by_hash($hashes) {
+        global $wpdb;
+        
+        $placeholders = implode(',', array_fill(0, count($hashes), '%s'));
+        $rows = $wpdb->get_results($wpdb->prepare(
+            "SELECT pm.meta_value AS image_hash, MAX(pm.post_id) AS attachment_id
+             FROM {$wpdb->postmeta} pm
+             INNER JOIN {$wpdb->posts} p ON p.ID = pm.post_id AND p.post_type = 'attachment'
+             WHERE pm.meta_key = '_vcore_image_hash' AND pm.meta_value IN ($placeholders)
+             GROUP BY pm.meta_value",
+            $hashes
+        ));
+        
+        $present = array();
+        foreach ($rows as $row) {
+            $present[$row->image_hash] = (int) $row->attachment_id;
+        }
+        return $present;
+    }
+    
     /**
      * Sync single product
      */
@@ -190,7 +245,7 @@ class Glassy_VCore_Sync {
         
         // Handle images
         if (!empty($product_data['images'])) {
-            $this->process_product_images($product_id, $product_data['images']);
+            $this->process_product_images($product_id, $product_data['images'], $product_data['image_manifest'] ?? array());
         }
         
         // Assign categories
@@ -203,17 +258,36 @@ class Glassy_VCore_Sync {
     
     /**
      * Process product images (download from S3 and upload to WordPress)
+     *
+     * Images listed in the manifest with a hash we already hold reuse the
+     * existing attachment; only new images are downloaded.
      */
-    private function process_product_images($product_id, $image_urls) {
+    private function process_product_images($product_id, $image_urls, $manifest = array()) {
         require_once(ABSPATH . 'wp-admin/includes/file.php');
         require_once(ABSPATH . 'wp-admin/includes/media.php');
         require_once(ABSPATH . 'wp-admin/includes/image.php');
         
         $image_ids = array();
         
+        $manifest_by_url = array();
+        foreach ((array) $manifest as $entry) {
+            if (!empty($entry['url']) && !empty($entry['hash'])) {
+                $manifest_by_url[$entry['url']] = $entry;
+            }
+        }
+        
         foreach ($image_urls as $index => $image_url) {
             if (empty($image_url)) continue;
             
+            $entry = $manifest_by_url[$image_url] ?? null;
+            if ($entry) {
+                $existing_id = $this->find_image_attachment($entry);
+                if ($existing_id) {
+                    $image_ids[] = $existing_id;
+                    continue;
+                }
+            }
+            
             // Download image from S3
             $tmp_file = download_url($image_url);
             
@@ -240,6 +314,12 @@ class Glassy_VCore_Sync {
             // Set alt text
             update_post_meta($attachment_id, '_wp_attachment_image_alt', get_the_title($product_id));
             
+            // Remember the content hash so later syncs can reuse this attachment
+            if ($entry) {
+                update_post_meta($attachment_id, '_vcore_image_hash', sanitize_key($entry['hash']));
+                update_post_meta($attachment_id, '_vcore_image_size', (int) ($entry['size'] ?? 0));
+            }
+            
             $image_ids[] = $attachment_id;
         }
         
@@ -254,6 +334,25 @@ class Glassy_VCore_Sync {
         }
     }
     
+    /**
+     * Find the attachment holding a manifest image: the ID VCore negotiated
+     * if it still matches the hash, otherwise a lookup by hash
+     */
+    private function find_image_attachment($entry) {
+        $hash = sanitize_key($entry['hash']);
+        
+        if (!empty($entry['attachment_id'])) {
+            $attachment_id = (int) $entry['attachment_id'];
+            if (get_post_type($attachment_id) === 'attachment'
+                && get_post_meta($attachment_id, '_vcore_image_hash', true) === $hash) {
+                return $attachment_id;
+            }
+        }
+        
+        $present = $this->find_attachments_by_hash(array($hash));
+        return $present[$hash] ?? null;
+    }
+    
     /**
      * Assign product to categories based on mapping
      */
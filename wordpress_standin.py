@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Glassy VCore Sync WordPress plugin
+Speaks the same /wp-json/vcore/v1 REST API so syncs can be run and
+benchmarked offline. A second server stands in for S3, serving synthetic
+product images that the plugin emulation downloads ("sideloads") and counts.
+
+Usage:
+    python wordpress_standin.py --port 8090 --per-product-latency 0.2
+    WORDPRESS_URL=http://127.0.0.1:8090 python app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WordPressStandIn:
+    """In-process HTTP server emulating the plugin's sync endpoints"""
+
+    def __init__(self, host='127.0.0.1', port=0, per_product_latency=0.05, base_latency=0.02,
+                 throttle_rate=0.0, retry_after=1, image_size=200 * 1024):
+        self.per_product_latency = per_product_latency
+        self.base_latency = base_latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.image_size = image_size
+
+        self._lock = threading.Lock()
+        self._next_wp_id = 1000
+        self.products = {}  # vcore_id -> {'product_id', 'data'}
+        self._next_attachment_id = 5000
+        self.attachments = {}  # image hash -> attachment ID, like _vcore_image_hash meta
+        self.stats = {
+            'connections': 0,
+            'requests': 0,
+            'throttled': 0,
+            'bytes_received': 0,
+            'bytes_sent': 0,
+            'products_synced': 0,
+            'manifest_requests': 0,
+            'images_downloaded': 0,
+            'images_reused': 0,
+            'image_bytes_downloaded': 0,
+        }
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.image_server = ThreadingHTTPServer((host, 0), self._image_handler_class())
+        self.image_server.daemon_threads = True
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve in background threads and return the base URL"""
+        self._start_image_server()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self.url
+
+    def _start_image_server(self):
+        thread = threading.Thread(target=self.image_server.serve_forever, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        for server in (self.server, self.image_server):
+            server.shutdown()
+            server.server_close()
+
+    def image_url(self, name):
+        """URL of a synthetic image on the S3 stand-in"""
+        host, port = self.image_server.server_address[:2]
+        return f'http://{host}:{port}/images/{name}'
+
+    def image_bytes(self, name):
+        """Deterministic content for a synthetic image"""
+        block = hashlib.sha256(name.encode('utf-8')).digest()
+        return (block * (self.image_size // len(block) + 1))[:self.image_size]
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _upsert(self, product_data):
+        """Create or update a product, returning its WooCommerce-style ID"""
+        with self._lock:
+            vcore_id = product_data.get('id')
+            existing = self.products.get(vcore_id)
+            if existing:
+                wp_id = existing['product_id']
+            else:
+                wp_id = self._next_wp_id
+                self._next_wp_id += 1
+            self.products[vcore_id] = {'product_id': wp_id, 'data': product_data}
+            self.stats['products_synced'] += 1
+            return wp_id
+
+    def image_manifest(self, payload):
+        """Emulate POST /vcore/v1/image-manifest"""
+        self._count('manifest_requests')
+        with self._lock:
+            present = {h: self.attachments[h] for h in payload.get('hashes') or [] if h in self.attachments}
+        return {'present': present}
+
+    def _process_images(self, product_data):
+        """Reuse attachments for known hashes, download everything else"""
+        manifest = {e['url']: e for e in product_data.get('image_manifest') or [] if e.get('url')}
+        attachment_ids = []
+        for url in product_data.get('images') or []:
+            entry = manifest.get(url)
+            if entry:
+                with self._lock:
+                    existing = self.attachments.get(entry['hash'])
+                if existing:
+                    self._count('images_reused')
+                    attachment_ids.append(existing)
+                    continue
+
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    content = response.read()
+            except (OSError, ValueError):
+                continue  # the plugin skips images download_url can't fetch
+            self._count('images_downloaded')
+            self._count('image_bytes_downloaded', len(content))
+
+            with self._lock:
+                attachment_id = self._next_attachment_id
+                self._next_attachment_id += 1
+                if entry:
+                    self.attachments[entry['hash']] = attachment_id
+            attachment_ids.append(attachment_id)
+        return attachment_ids
+
+    def sync_products(self, payload):
+        """Emulate POST /vcore/v1/sync-products"""
+        products = payload.get('products') or []
+        time.sleep(self.base_latency + self.per_product_latency * len(products))
+
+        results = {'success': 0, 'failed': 0, 'errors': [], 'product_ids': [], 'synced': []}
+        for product_data in products:
+            if not product_data.get('product_name'):
+                results['failed'] += 1
+                results['errors'].append({
+                    'id': product_data.get('id'),
+                    'product_name': product_data.get('product_name'),
+                    'error': 'Product name is required'
+                })
+                continue
+            self._process_images(product_data)
+            wp_id = self._upsert(product_data)
+            results['success'] += 1
+            results['product_ids'].append(wp_id)
+            results['synced'].append({'id': product_data.get('id'), 'product_id': wp_id})
+        return results
+
+    def sync_single_product(self, payload):
+        """Emulate POST /vcore/v1/sync-single-product"""
+        time.sleep(self.base_latency + self.per_product_latency)
+        self._process_images(payload)
+        wp_id = self._upsert(payload)
+        return {'success': True, 'product_id': wp_id, 'message': 'Product synced successfully'}
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like a real WordPress host
+
+            def setup(self):
+                super().setup()
+                standin._count('connections')
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+                standin._count('bytes_sent', len(data))
+
+            def do_GET(self):
+                standin._count('requests')
+                if self.path.startswith('/wp-json/wc/v3/system_status'):
+                    self._send_json(200, {'environment': {'site_url': standin.url}})
+                else:
+                    self._send_json(404, {'code': 'rest_no_route'})
+
+            def do_POST(self):
+                standin._count('requests')
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                standin._count('bytes_received', len(raw))
+
+                if standin.throttle_rate and random.random() < standin.throttle_rate:
+                    standin._count('throttled')
+                    self._send_json(429, {'code': 'too_many_requests'},
+                                    headers={'Retry-After': str(standin.retry_after)})
+                    return
+
+                payload = json.loads(raw or b'{}')
+                route = self.path.split('/wp-json/vcore/v1', 1)[-1]
+                if route == '/sync-products':
+                    self._send_json(200, standin.sync_products(payload))
+                elif route == '/sync-single-product':
+                    self._send_json(200, standin.sync_single_product(payload))
+                elif route == '/image-manifest':
+                    self._send_json(200, standin.image_manifest(payload))
+                elif route == '/create-categories':
+                    self._send_json(200, {'success': True, 'created_categories': []})
+                else:
+                    self._send_json(404, {'code': 'rest_no_route'})
+
+        return Handler
+
+    def _image_handler_class(self):
+        standin = self
+
+        class ImageHandler(BaseHTTPRequestHandler):
+            """S3-style image host: ETag is the content MD5"""
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_image(self, include_body):
+                content = standin.image_bytes(self.path.rsplit('/', 1)[-1])
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('ETag', '"%s"' % hashlib.md5(content).hexdigest())
+                self.end_headers()
+                if include_body:
+                    self.wfile.write(content)
+
+            def do_HEAD(self):
+                self._send_image(include_body=False)
+
+            def do_GET(self):
+                self._send_image(include_body=True)
+
+        return ImageHandler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local WordPress sync stand-in')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--per-product-latency', type=float, default=0.05)
+    parser.add_argument('--base-latency', type=float, default=0.02)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--image-size', type=int, default=200 * 1024, help='Bytes per synthetic image')
+    args = parser.parse_args()
+
+    standin = WordPressStandIn(port=args.port, per_product_latency=args.per_product_latency,
+                               base_latency=args.base_latency, throttle_rate=args.throttle_rate,
+                               image_size=args.image_size)
+    standin._start_image_server()
+    print(f"🧪 WordPress stand-in listening on {standin.url}")
+    print(f"   Images served at {standin.image_url('<name>.jpg')}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {standin.stats}")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+WordPress sync worker
+Drains queued sync jobs (created from the admin WordPress Sync page) with
+the concurrent sync engine. Run it as a long-lived process, or with --once
+from cron; on Lambda the /api/wordpress/sync-jobs/run endpoint does the
+same on an EventBridge schedule.
+
+Usage:
+    python wordpress_sync_worker.py
+    python wordpress_sync_worker.py --once --time-budget 600
+"""
+import argparse
+import time
+
+from app import app
+from utils.wordpress_sync_jobs import drain_jobs, default_worker_id
+
+
+def print_job(summary):
+    print(f"   Job #{summary['id']}: {summary['status']} - "
+          f"{summary['synced']} synced, {summary['failed']} failed of {summary['total']}")
+
+
+def run_worker(once=False, poll_interval=5.0, time_budget=None):
+    """Poll for queued jobs and run them until interrupted"""
+    worker_id = default_worker_id()
+    print(f"🔄 WordPress sync worker {worker_id} started")
+
+    while True:
+        with app.app_context():
+            for summary in drain_jobs(worker_id=worker_id, time_budget=time_budget):
+                print_job(summary)
+
+        if once:
+            break
+        time.sleep(poll_interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run queued WordPress sync jobs')
+    parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between queue checks')
+    parser.add_argument('--time-budget', type=float,
+                        help='Requeue unfinished jobs after this many seconds (default: no limit)')
+    args = parser.parse_args()
+
+    try:
+        run_worker(once=args.once, poll_interval=args.poll_interval, time_budget=args.time_budget)
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped")